@@ -5,6 +5,11 @@ ecos_approval_manager.py - Approval Request Manager for ECOS
 Manages approval requests for operations that require authorization.
 Uses AI Maestro API for inter-agent communication and YAML files for state persistence.
 
+Operations covered by an active autonomous directive (issued by EAMA and
+stored in .claude/approvals/directives/) are approved by policy without
+a round trip: authorize_operation() records them as completed requests
+decided by "autonomous" and notifies EAMA after the fact.
+
 Part of the emasoft-chief-of-staff plugin.
 """
 
@@ -22,6 +27,7 @@ from typing import Any, Optional
 APPROVALS_DIR = ".claude/approvals"
 PENDING_DIR = f"{APPROVALS_DIR}/pending"
 COMPLETED_DIR = f"{APPROVALS_DIR}/completed"
+DIRECTIVES_DIR = f"{APPROVALS_DIR}/directives"
 
 
 def get_project_root() -> Path:
@@ -35,6 +41,7 @@ def ensure_directories() -> None:
     root = get_project_root()
     (root / PENDING_DIR).mkdir(parents=True, exist_ok=True)
     (root / COMPLETED_DIR).mkdir(parents=True, exist_ok=True)
+    (root / DIRECTIVES_DIR).mkdir(parents=True, exist_ok=True)
 
 
 def generate_request_id() -> str:
@@ -364,6 +371,170 @@ def create_approval_request(
     }
 
 
+def issue_autonomous_directive(
+    scope: list[str],
+    expires_at: str,
+    excluded: Optional[list[str]] = None,
+    max_concurrent_agents: Optional[int] = None,
+    notify_after: bool = True,
+    issued_by: str = "eama",
+) -> dict[str, Any]:
+    """
+    Store an autonomous operation directive.
+
+    Args:
+        scope: Operation types that may run without pre-approval
+        expires_at: ISO timestamp after which the directive no longer applies
+        excluded: Operation types that always need approval
+        max_concurrent_agents: Only applies while fewer agents are running
+        notify_after: Notify EAMA after each autonomous operation
+        issued_by: Who issued the directive
+
+    Returns:
+        Dictionary with directive_id and filepath
+    """
+    ensure_directories()
+    timestamp = get_timestamp()
+    directive_id = f"directive-{timestamp[:10]}-{uuid.uuid4().hex[:8]}"
+    directive = {
+        "directive_id": directive_id,
+        "type": "autonomous_operation",
+        "issued_by": issued_by,
+        "issued_at": timestamp,
+        "expires_at": expires_at,
+        "scope": scope,
+        "excluded": excluded or [],
+        "max_concurrent_agents": max_concurrent_agents,
+        "notify_after": notify_after,
+        "active": True,
+    }
+    filepath = get_project_root() / DIRECTIVES_DIR / f"{directive_id}.yaml"
+    filepath.write_text(dict_to_yaml(directive), encoding="utf-8")
+    return {"success": True, "directive_id": directive_id, "filepath": str(filepath)}
+
+
+def load_active_directives() -> list[dict[str, Any]]:
+    """Load autonomous directives that are active and not expired."""
+    directives_dir = get_project_root() / DIRECTIVES_DIR
+    if not directives_dir.exists():
+        return []
+
+    now = datetime.now(timezone.utc)
+    active = []
+    for filepath in sorted(directives_dir.glob("*.yaml")):
+        try:
+            directive = yaml_to_dict(filepath.read_text(encoding="utf-8"))
+            expires_at = datetime.fromisoformat(
+                str(directive.get("expires_at", "")).replace("Z", "+00:00")
+            )
+        except (OSError, ValueError):
+            continue
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if directive.get("active", True) and expires_at > now:
+            directive.setdefault("directive_id", filepath.stem)
+            active.append(directive)
+    return active
+
+
+def find_autonomous_directive(
+    operation_type: str, running_agents: Optional[int] = None
+) -> Optional[dict[str, Any]]:
+    """
+    Find an active directive that authorizes an operation without approval.
+
+    Args:
+        operation_type: Operation type (e.g., 'hibernate', 'wake')
+        running_agents: Agents running after the operation, checked against
+            the directive's max_concurrent_agents condition when given
+
+    Returns:
+        The directive, or None if the operation needs approval
+    """
+    for directive in load_active_directives():
+        if operation_type not in (directive.get("scope") or []):
+            continue
+        if operation_type in (directive.get("excluded") or []):
+            continue
+        limit = directive.get("max_concurrent_agents")
+        if limit is not None and running_agents is not None and running_agents > limit:
+            continue
+        return directive
+    return None
+
+
+def authorize_operation(
+    operation_type: str,
+    agent_name: str,
+    reason: str,
+    requester: str,
+    running_agents: Optional[int] = None,
+) -> dict[str, Any]:
+    """
+    Approve an operation by policy, or fall back to a pending approval request.
+
+    Args:
+        operation_type: Type of operation requiring approval
+        agent_name: Name of the agent(s) or resource involved
+        reason: Reason for the request
+        requester: Name of the requesting agent
+        running_agents: Agents running after the operation (for directive
+            conditions)
+
+    Returns:
+        Dictionary with request_id, status ('approved' or 'pending') and,
+        when approved by policy, the directive_reference
+    """
+    directive = find_autonomous_directive(operation_type, running_agents)
+    if directive is None:
+        return create_approval_request(operation_type, agent_name, reason, requester)
+
+    request_id = generate_request_id()
+    timestamp = get_timestamp()
+    directive_id = directive["directive_id"]
+    request_data = {
+        "request_id": request_id,
+        "operation_type": operation_type,
+        "agent_name": agent_name,
+        "reason": reason,
+        "requester": requester,
+        "status": "approved",
+        "created_at": timestamp,
+        "updated_at": timestamp,
+        "decision": "approved",
+        "decision_comment": f"Autonomous directive {directive_id}",
+        "decided_by": "autonomous",
+        "decided_at": timestamp,
+        "directive_reference": directive_id,
+    }
+    filepath = save_approval_request(request_id, request_data, pending=False)
+
+    message_sent = False
+    if directive.get("notify_after", True):
+        message_sent = send_aimaestro_message(
+            to="emasoft-assistant-manager-agent",
+            subject=f"[AUTONOMOUS] {operation_type}: {agent_name}",
+            content={
+                "type": "autonomous_notification",
+                "message": f"Operation approved under autonomous directive.\n\n"
+                f"Operation: {operation_type}\n"
+                f"Agent/Resource: {agent_name}\n"
+                f"Reason: {reason}\n"
+                f"Directive: {directive_id}",
+            },
+        )
+
+    return {
+        "success": True,
+        "request_id": request_id,
+        "status": "approved",
+        "decided_by": "autonomous",
+        "directive_reference": directive_id,
+        "filepath": str(filepath),
+        "message_sent": message_sent,
+    }
+
+
 def check_approval_status(request_id: str) -> dict[str, Any]:
     """
     Check the status of an approval request.
@@ -631,6 +802,8 @@ Examples:
   %(prog)s list --status pending
   %(prog)s respond --id 12345678-1234-1234-1234-123456789abc --decision approved --comment "Go ahead"
   %(prog)s wait --id 12345678-1234-1234-1234-123456789abc --timeout 120
+  %(prog)s directive --scope hibernate,wake --expires-at 2025-02-02T18:00:00Z
+  %(prog)s authorize --type hibernate --agent my-agent --reason "Idle 45 minutes"
         """,
     )
 
@@ -689,6 +862,58 @@ Examples:
         "--timeout", type=int, default=120, help="Timeout in seconds (default: 120)"
     )
 
+    # Directive command
+    directive_parser = subparsers.add_parser(
+        "directive", help="Issue an autonomous operation directive"
+    )
+    directive_parser.add_argument(
+        "--scope",
+        required=True,
+        help="Comma-separated operation types allowed without approval",
+    )
+    directive_parser.add_argument(
+        "--expires-at", required=True, help="ISO timestamp when the directive expires"
+    )
+    directive_parser.add_argument(
+        "--excluded", default="", help="Comma-separated operation types always gated"
+    )
+    directive_parser.add_argument(
+        "--max-concurrent-agents",
+        type=int,
+        default=None,
+        help="Only apply while at most this many agents would be running",
+    )
+    directive_parser.add_argument(
+        "--no-notify",
+        action="store_true",
+        help="Do not notify EAMA after autonomous operations",
+    )
+    directive_parser.add_argument(
+        "--issued-by", default="eama", help="Who issued the directive (default: eama)"
+    )
+
+    # Authorize command
+    authorize_parser = subparsers.add_parser(
+        "authorize",
+        help="Approve by autonomous directive, or create an approval request",
+    )
+    authorize_parser.add_argument("--type", required=True, help="Operation type")
+    authorize_parser.add_argument(
+        "--agent", required=True, help="Agent or resource name"
+    )
+    authorize_parser.add_argument(
+        "--reason", required=True, help="Reason for the request"
+    )
+    authorize_parser.add_argument(
+        "--requester", default="ecos", help="Requesting agent name (default: ecos)"
+    )
+    authorize_parser.add_argument(
+        "--running-agents",
+        type=int,
+        default=None,
+        help="Agents running after the operation (for directive conditions)",
+    )
+
     args = parser.parse_args()
 
     if args.command is None:
@@ -758,6 +983,25 @@ Examples:
     elif args.command == "wait":
         result = wait_for_approval(request_id=args.id, timeout_seconds=args.timeout)
 
+    elif args.command == "directive":
+        result = issue_autonomous_directive(
+            scope=[s.strip() for s in args.scope.split(",") if s.strip()],
+            expires_at=args.expires_at,
+            excluded=[s.strip() for s in args.excluded.split(",") if s.strip()],
+            max_concurrent_agents=args.max_concurrent_agents,
+            notify_after=not args.no_notify,
+            issued_by=args.issued_by,
+        )
+
+    elif args.command == "authorize":
+        result = authorize_operation(
+            operation_type=args.type,
+            agent_name=args.agent,
+            reason=args.reason,
+            requester=args.requester,
+            running_agents=args.running_agents,
+        )
+
     # Output JSON
     print(json.dumps(result, indent=2))
 
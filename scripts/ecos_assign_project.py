@@ -25,6 +25,8 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+from ecos_state_index import index_content
+
 
 def get_state_file_path(cwd: str | None = None) -> Path:
     """Get the chief-of-staff state file path.
@@ -81,8 +83,7 @@ def agent_exists(content: str, session_name: str) -> bool:
     Returns:
         True if agent exists, False otherwise
     """
-    pattern = rf"### {re.escape(session_name)}\s*\n"
-    return bool(re.search(pattern, content, re.IGNORECASE))
+    return index_content(content).block("Agents", session_name) is not None
 
 
 def project_exists(content: str, project_id: str) -> bool:
@@ -95,14 +96,7 @@ def project_exists(content: str, project_id: str) -> bool:
     Returns:
         True if project exists, False otherwise
     """
-    # Find projects section
-    pattern = r"## Projects\s*\n(.*?)(?=\n## |\Z)"
-    match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-    if not match:
-        return False
-
-    project_pattern = rf"### {re.escape(project_id)}\s*\n"
-    return bool(re.search(project_pattern, match.group(1), re.IGNORECASE))
+    return index_content(content).block("Projects", project_id) is not None
 
 
 def get_agent_current_project(content: str, session_name: str) -> str | None:
@@ -115,22 +109,10 @@ def get_agent_current_project(content: str, session_name: str) -> str | None:
     Returns:
         Project ID or None if not assigned
     """
-    # Find agents section
-    pattern = r"## Agents\s*\n(.*?)(?=\n## |\Z)"
-    match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-    if not match:
+    agent_body = index_content(content).block_body("Agents", session_name)
+    if agent_body is None:
         return None
 
-    agents_section = match.group(1)
-
-    # Find the specific agent
-    agent_pattern = rf"### {re.escape(session_name)}\s*\n(.*?)(?=\n### |\n## |\Z)"
-    agent_match = re.search(agent_pattern, agents_section, re.DOTALL | re.IGNORECASE)
-    if not agent_match:
-        return None
-
-    agent_body = agent_match.group(1)
-
     # Find project field
     project_match = re.search(r"\*\*Project\*\*:\s*(\S+)", agent_body, re.IGNORECASE)
     if project_match:
@@ -153,26 +135,12 @@ def update_agent_project(
     Returns:
         Updated state file content
     """
-    # Find agents section
-    pattern = r"(## Agents\s*\n)(.*?)(?=\n## |\Z)"
-    match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-    if not match:
-        return content
-
-    agents_section = match.group(2)
-    section_start = match.start(2)
-    section_end = match.end(2)
-
-    # Find the specific agent block
-    agent_pattern = rf"(### {re.escape(session_name)}\s*\n)(.*?)(?=\n### |\n## |\Z)"
-    agent_match = re.search(agent_pattern, agents_section, re.DOTALL | re.IGNORECASE)
-    if not agent_match:
+    index = index_content(content)
+    span = index.block("Agents", session_name)
+    if span is None:
         return content
 
-    agent_header = agent_match.group(1)
-    agent_body = agent_match.group(2)
-    agent_start = agent_match.start()
-    agent_end = agent_match.end()
+    agent_body = content[span.body_start : span.end]
 
     # Update or add project field
     project_value = project_id if project_id else "none"
@@ -191,18 +159,8 @@ def update_agent_project(
         lines.append(f"- **Project**: {project_value}")
         updated_body = "\n".join(lines) + "\n"
 
-    # Reconstruct agents section
-    updated_agents = (
-        agents_section[:agent_start]
-        + agent_header
-        + updated_body
-        + agents_section[agent_end:]
-    )
-
-    # Reconstruct full content
-    updated_content = content[:section_start] + updated_agents + content[section_end:]
-
-    return updated_content
+    # Splice the block body in place; the index shifts following spans
+    return index.replace(span.body_start, span.end, updated_body).content
 
 
 def register_agent_if_missing(content: str, session_name: str) -> str:
@@ -228,11 +186,10 @@ def register_agent_if_missing(content: str, session_name: str) -> str:
 """
 
     # Find agents section
-    pattern = r"(## Agents\s*\n)"
-    match = re.search(pattern, content, re.IGNORECASE)
+    section = index_content(content).section("Agents")
 
-    if match:
-        insert_pos = match.end()
+    if section:
+        insert_pos = section.body_start
         # Remove placeholder if present
         placeholder = "_No agents registered yet._"
         rest = content[insert_pos:]
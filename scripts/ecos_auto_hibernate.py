@@ -0,0 +1,616 @@
+#!/usr/bin/env python3
+"""
+ecos_auto_hibernate.py - Hibernate idle agents and pre-wake them before demand.
+
+Each run looks at every agent in the chief-of-staff state file and
+combines three signals:
+
+- heartbeat activity (agent blocks and the Active Agents table)
+- per-agent resource use (CPU/RSS of the agent's tmux session tree)
+- project assignment (unassigned agents use a shorter idle limit)
+
+An agent idle longer than its role's policy limit, and below the idle
+CPU threshold, is hibernated. Hibernated agents whose project expects
+demand within the pre-wake lead time are woken. Demand comes from
+explicit project working hours in the policy or, when a project has
+none, from the hours of the week its agents were seen active before.
+
+Operations are authorized through ecos_approval_manager.authorize_operation,
+so an active autonomous directive approves them immediately; otherwise
+an approval request is created and its operations run on a later pass
+once approved. Hibernations run before wakes, in batches through
+ecos_lifecycle_executor, and wakes never take the number of running
+agents past MAX_CONCURRENT_AGENTS.
+
+Policy file (JSON, default ~/.ecos/auto-hibernate-policy.json):
+    {
+      "roles": {"orchestrator": {"idle_minutes": null},
+                "programmer": {"idle_minutes": 20}},
+      "unassigned_idle_minutes": 10,
+      "idle_cpu_percent": 2.0,
+      "pre_wake_minutes": 15,
+      "wake_grace_minutes": 30,
+      "batch_size": 4,
+      "projects": {"svgbbox": {"days": [0, 1, 2, 3, 4], "hours": [9, 18]}}
+    }
+An idle_minutes of null means the role is never auto-hibernated.
+
+Dependencies: Python 3.8+ stdlib only
+
+Usage:
+    python ecos_auto_hibernate.py plan [--policy FILE] [--cwd DIR]
+    python ecos_auto_hibernate.py run [--policy FILE] [--cwd DIR] [--batch-size N]
+        [--skip-resource-check]
+
+Exit codes:
+    0 - Success (including nothing to do, or operations awaiting approval)
+    1 - Error, or at least one operation failed
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from ecos_approval_manager import (
+    authorize_operation,
+    check_approval_status,
+    respond_to_approval,
+)
+from ecos_assign_project import write_file_safely
+from ecos_capacity_plan import schedule_active
+from ecos_heartbeat_check import parse_agents_heartbeats, parse_timestamp
+from ecos_lifecycle_executor import execute_manifest, validate_manifest
+from ecos_staff_status import (
+    QUIET_STATUSES,
+    get_state_file_path,
+    parse_agents_from_state,
+    read_file_safely,
+    sample_session_resources,
+)
+from ecos_state_index import index_content
+from ecos_team_registry import ROLE_CONSTRAINTS
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "shared"))
+from thresholds import (  # noqa: E402
+    APPROVAL_TIMEOUT_SECONDS,
+    MAX_AGENTS_PER_PROJECT,
+    MAX_CONCURRENT_AGENTS,
+)
+
+ECOS_STATE_DIR = Path.home() / ".ecos"
+POLICY_FILE = ECOS_STATE_DIR / "auto-hibernate-policy.json"
+SCHEDULER_STATE_FILE = ECOS_STATE_DIR / "auto-hibernate-state.json"
+
+DEFAULT_POLICY: dict[str, Any] = {
+    "roles": {
+        "orchestrator": {"idle_minutes": None},
+        "architect": {"idle_minutes": 60},
+        "integrator": {"idle_minutes": 30},
+        "programmer": {"idle_minutes": 20},
+    },
+    "default_idle_minutes": 30,
+    "unassigned_idle_minutes": 10,
+    "idle_cpu_percent": 2.0,
+    "pre_wake_minutes": 15,
+    "wake_grace_minutes": 30,
+    "batch_size": 4,
+    "projects": {},
+}
+
+HIBERNATED_STATUSES = frozenset({"hibernated", "sleeping"})
+
+# State file status written after each successful operation
+RESULT_STATUS = {"hibernate": "hibernated", "wake": "active"}
+
+# Learned demand: weeks of history kept, and weeks active to predict demand
+DEMAND_HISTORY_WEEKS = 4
+DEMAND_MIN_WEEKS = 2
+
+
+def load_policy(path: Path) -> dict[str, Any]:
+    """Load the idle policy, filling unset keys from DEFAULT_POLICY."""
+    policy = json.loads(json.dumps(DEFAULT_POLICY))
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            overrides = json.load(f)
+        roles = {**policy["roles"], **overrides.pop("roles", {})}
+        policy.update(overrides)
+        policy["roles"] = roles
+    return policy
+
+
+def load_scheduler_state() -> dict[str, Any]:
+    """Load learned demand, wake times and approvals awaiting a decision."""
+    try:
+        with open(SCHEDULER_STATE_FILE, encoding="utf-8") as f:
+            state: dict[str, Any] = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        state = {}
+    state.setdefault("demand", {})
+    state.setdefault("woken_at", {})
+    state.setdefault("pending_approvals", {})
+    return state
+
+
+def save_scheduler_state(state: dict[str, Any]) -> None:
+    """Atomically write the scheduler state."""
+    ECOS_STATE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_file = SCHEDULER_STATE_FILE.with_name(
+        f".{SCHEDULER_STATE_FILE.name}.{uuid.uuid4().hex}.tmp"
+    )
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_file, SCHEDULER_STATE_FILE)
+
+
+def role_key(role: str) -> str | None:
+    """Map a free-form role from the state file to a ROLE_CONSTRAINTS key."""
+    lowered = role.lower()
+    for key in ROLE_CONSTRAINTS:
+        if key in lowered:
+            return key
+    return None
+
+
+def idle_limit_minutes(agent: dict[str, Any], policy: dict[str, Any]) -> float | None:
+    """Minutes of inactivity after which an agent may be hibernated.
+
+    Returns:
+        The limit, or None if the agent's role is never auto-hibernated
+    """
+    key = role_key(agent["role"])
+    role_policy = policy["roles"].get(key or "", {})
+    limit = role_policy.get("idle_minutes", policy["default_idle_minutes"])
+    if limit is None:
+        return None
+    if not agent.get("project"):
+        return min(limit, policy["unassigned_idle_minutes"])
+    return float(limit)
+
+
+def collect_agents(content: str, now: datetime) -> list[dict[str, Any]]:
+    """Agents from the state file with their newest heartbeat age in minutes."""
+    table = {a["name"]: a["heartbeat_dt"] for a in parse_agents_heartbeats(content)}
+    agents = parse_agents_from_state(content)
+    for agent in agents:
+        stamps = [table.get(agent["session"])]
+        if agent.get("heartbeat"):
+            stamps.append(parse_timestamp(agent["heartbeat"]))
+        known = [s for s in stamps if s is not None]
+        agent["idle_minutes"] = (
+            (now - max(known)).total_seconds() / 60 if known else None
+        )
+    return agents
+
+
+def record_demand(
+    state: dict[str, Any], agents: list[dict[str, Any]], now: datetime
+) -> None:
+    """Remember the hour of the week in which each project had working agents.
+
+    Stores, per project and hour of the week, the ISO week dates on which
+    agents were seen working; entries older than DEMAND_HISTORY_WEEKS
+    are dropped.
+    """
+    hour_of_week = str(now.weekday() * 24 + now.hour)
+    today = now.date().isoformat()
+    cutoff = (now - timedelta(weeks=DEMAND_HISTORY_WEEKS)).date().isoformat()
+    for agent in agents:
+        project = agent.get("project")
+        status = agent["status"].lower()
+        if not project or status in QUIET_STATUSES or status in HIBERNATED_STATUSES:
+            continue
+        if agent["idle_minutes"] is None or agent["idle_minutes"] > 60:
+            continue
+        dates = state["demand"].setdefault(project, {}).setdefault(hour_of_week, [])
+        if today not in dates:
+            dates.append(today)
+        dates[:] = [d for d in dates if d >= cutoff]
+
+
+def expects_demand(
+    project: str,
+    policy: dict[str, Any],
+    state: dict[str, Any],
+    when: datetime,
+) -> bool:
+    """Whether a project is expected to need its agents at a given time."""
+    schedule = policy["projects"].get(project)
+    if schedule is not None:
+        return schedule_active(schedule, when.weekday(), when.hour * 60 + when.minute)
+    cutoff = (when - timedelta(weeks=DEMAND_HISTORY_WEEKS)).date().isoformat()
+    dates = state["demand"].get(project, {}).get(
+        str(when.weekday() * 24 + when.hour), []
+    )
+    return len([d for d in dates if d >= cutoff]) >= DEMAND_MIN_WEEKS
+
+
+def plan_actions(
+    agents: list[dict[str, Any]],
+    resources: dict[str, dict[str, float]],
+    policy: dict[str, Any],
+    state: dict[str, Any],
+    now: datetime,
+) -> dict[str, Any]:
+    """Decide which agents to hibernate and which to pre-wake.
+
+    Returns:
+        {"hibernate": [...], "wake": [...], "skipped": [...], "running": n}
+    """
+    hibernate: list[dict[str, Any]] = []
+    wake_candidates: list[dict[str, Any]] = []
+    skipped: list[dict[str, Any]] = []
+    lead = timedelta(minutes=policy["pre_wake_minutes"])
+    running = 0
+    running_per_project: dict[str, int] = {}
+
+    for agent in agents:
+        status = agent["status"].lower()
+        project = agent.get("project")
+        usage = resources.get(agent["session"], {})
+        if status in HIBERNATED_STATUSES:
+            if project and (
+                expects_demand(project, policy, state, now)
+                or expects_demand(project, policy, state, now + lead)
+            ):
+                wake_candidates.append(
+                    {
+                        "session_name": agent["session"],
+                        "project": project,
+                        "role": agent["role"],
+                        "reason": "demand expected",
+                    }
+                )
+            continue
+        if status == "terminated":
+            continue
+        running += 1
+        if project:
+            running_per_project[project] = running_per_project.get(project, 0) + 1
+
+        limit = idle_limit_minutes(agent, policy)
+        idle = agent["idle_minutes"]
+        # Quiet statuses (idle, done, ...) stop heartbeating; treat as idle
+        if idle is None and status in QUIET_STATUSES:
+            idle = float("inf")
+        woken_at = state["woken_at"].get(agent["session"])
+        if limit is None or idle is None or idle < limit:
+            continue
+        if usage.get("cpu_percent", 0.0) >= policy["idle_cpu_percent"]:
+            skipped.append(
+                {"session_name": agent["session"], "reason": "busy (CPU)"}
+            )
+            continue
+        if woken_at and now - datetime.fromisoformat(woken_at) < timedelta(
+            minutes=policy["wake_grace_minutes"]
+        ):
+            skipped.append(
+                {"session_name": agent["session"], "reason": "recently woken"}
+            )
+            continue
+        if project and expects_demand(project, policy, state, now):
+            skipped.append(
+                {"session_name": agent["session"], "reason": "within working hours"}
+            )
+            continue
+        hibernate.append(
+            {
+                "session_name": agent["session"],
+                "project": project,
+                "role": agent["role"],
+                "idle_minutes": None if idle == float("inf") else round(idle, 1),
+                "rss_mb": usage.get("rss_mb"),
+                "reason": f"idle beyond {limit:g} minutes",
+            }
+        )
+
+    # Wakes fill the slots left after hibernation, orchestrators first
+    running_after = running - len(hibernate)
+    for op in hibernate:
+        if op["project"]:
+            running_per_project[op["project"]] -= 1
+    wake: list[dict[str, Any]] = []
+    role_order = list(ROLE_CONSTRAINTS)
+
+    def wake_rank(candidate: dict[str, Any]) -> int:
+        key = role_key(candidate["role"])
+        return role_order.index(key) if key is not None else len(role_order)
+
+    wake_candidates.sort(key=wake_rank)
+    for candidate in wake_candidates:
+        project = candidate["project"]
+        if running_after >= MAX_CONCURRENT_AGENTS:
+            skipped.append({**candidate, "reason": "MAX_CONCURRENT_AGENTS reached"})
+        elif running_per_project.get(project, 0) >= MAX_AGENTS_PER_PROJECT:
+            skipped.append({**candidate, "reason": "MAX_AGENTS_PER_PROJECT reached"})
+        else:
+            running_after += 1
+            running_per_project[project] = running_per_project.get(project, 0) + 1
+            wake.append(candidate)
+
+    return {
+        "hibernate": hibernate,
+        "wake": wake,
+        "skipped": skipped,
+        "running": running,
+    }
+
+
+def _approved_pending_operations(
+    state: dict[str, Any], now: datetime
+) -> list[dict[str, Any]]:
+    """Operations from earlier approval requests that have since been approved.
+
+    Following the approval timeout policy, a request left undecided beyond
+    APPROVAL_TIMEOUT_SECONDS is auto-rejected (decided by "timeout") and
+    dropped along with rejected ones; if its operations are still needed,
+    a later run plans them again and submits a new request. Other
+    undecided requests stay pending.
+    """
+    approved: list[dict[str, Any]] = []
+    for request_id, operations in list(state["pending_approvals"].items()):
+        request = check_approval_status(request_id)
+        status = request.get("status")
+        if status == "pending":
+            created_at = datetime.fromisoformat(request["created_at"])
+            age = now.astimezone(created_at.tzinfo) - created_at
+            if age.total_seconds() < APPROVAL_TIMEOUT_SECONDS:
+                continue
+            respond_to_approval(
+                request_id,
+                "rejected",
+                f"No decision within {APPROVAL_TIMEOUT_SECONDS}s; "
+                "auto-rejected on timeout, resubmitted if still needed",
+                decided_by="timeout",
+            )
+            status = "rejected"
+        if status == "approved":
+            approved.extend(operations)
+        del state["pending_approvals"][request_id]
+    return approved
+
+
+def set_agent_status(content: str, session_name: str, status: str) -> str:
+    """Set an agent's status in its Agents block and Active Agents table row."""
+    index = index_content(content)
+    span = index.block("Agents", session_name)
+    if span is not None:
+        body = content[span.body_start : span.end]
+        updated_body = re.sub(
+            r"(\*\*Status\*\*:\s*)\S+",
+            rf"\g<1>{status}",
+            body,
+            count=1,
+            flags=re.IGNORECASE,
+        )
+        content = index.replace(span.body_start, span.end, updated_body).content
+    # | name | role | status | heartbeat |
+    return re.sub(
+        rf"^(\|\s*{re.escape(session_name)}\s*\|[^|\n]*\|)[^|\n]*\|",
+        rf"\g<1> {status} |",
+        content,
+        count=1,
+        flags=re.MULTILINE,
+    )
+
+
+def authorize_batches(
+    kind: str,
+    operations: list[dict[str, Any]],
+    batch_size: int,
+    running: int,
+    state: dict[str, Any],
+) -> tuple[list[list[dict[str, Any]]], list[dict[str, Any]]]:
+    """Authorize operations batch by batch.
+
+    Returns:
+        (approved batches, approval records for the report)
+    """
+    approved: list[list[dict[str, Any]]] = []
+    records: list[dict[str, Any]] = []
+    for start in range(0, len(operations), batch_size):
+        batch = operations[start : start + batch_size]
+        running += len(batch) if kind == "wake" else -len(batch)
+        sessions = ", ".join(op["session_name"] for op in batch)
+        reasons = "; ".join(f"{op['session_name']}: {op['reason']}" for op in batch)
+        decision = authorize_operation(
+            operation_type=kind,
+            agent_name=sessions,
+            reason=f"Auto-{kind}: {reasons}",
+            requester="ecos",
+            running_agents=running,
+        )
+        records.append(
+            {
+                "operation": kind,
+                "sessions": [op["session_name"] for op in batch],
+                "request_id": decision.get("request_id"),
+                "status": decision.get("status"),
+                "decided_by": decision.get("decided_by"),
+            }
+        )
+        if decision.get("status") == "approved":
+            approved.append(batch)
+        elif decision.get("request_id"):
+            state["pending_approvals"][decision["request_id"]] = [
+                {"op": kind, "session_name": op["session_name"]} for op in batch
+            ]
+    return approved, records
+
+
+def run_batches(
+    batches: list[list[dict[str, Any]]], check_resources: bool
+) -> list[dict[str, Any]]:
+    """Validate and execute batches of lifecycle operations in order."""
+    results: list[dict[str, Any]] = []
+    for batch in batches:
+        manifest = [
+            {"op": op["op"], "session_name": op["session_name"]} for op in batch
+        ]
+        validation = validate_manifest(manifest, check_resources=check_resources)
+        if not validation["valid"]:
+            results.extend(
+                {
+                    "op": op["op"],
+                    "session_name": op["session_name"],
+                    "status": "skipped",
+                    "result": {"errors": validation["errors"]},
+                }
+                for op in manifest
+            )
+            continue
+        results.extend(execute_manifest(manifest, max_parallel=len(manifest)))
+    return results
+
+
+def main() -> int:
+    """Main entry point.
+
+    Returns:
+        Exit code: 0 for success, 1 for error
+    """
+    parser = argparse.ArgumentParser(
+        description="Hibernate idle agents and pre-wake agents before demand"
+    )
+    parser.add_argument(
+        "command",
+        choices=["plan", "run"],
+        help="plan: show decisions only; run: authorize and execute them",
+    )
+    parser.add_argument(
+        "--policy",
+        type=Path,
+        default=POLICY_FILE,
+        help=f"Idle policy file (default: {POLICY_FILE})",
+    )
+    parser.add_argument(
+        "--cwd",
+        type=str,
+        default=None,
+        help="Workspace with the state file (defaults to current directory)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Operations per approval and execution batch (default: from policy)",
+    )
+    parser.add_argument(
+        "--skip-resource-check",
+        action="store_true",
+        help="Do not check resource headroom before waking agents",
+    )
+
+    args = parser.parse_args()
+
+    try:
+        policy = load_policy(args.policy)
+    except (OSError, json.JSONDecodeError) as e:
+        print(json.dumps({"success": False, "error": f"Bad policy: {e}"}, indent=2))
+        return 1
+    batch_size = max(1, args.batch_size or policy["batch_size"])
+
+    state_file = get_state_file_path(args.cwd)
+    content = read_file_safely(state_file)
+    if not content:
+        result = {"success": False, "error": f"State file not found: {state_file}"}
+        print(json.dumps(result, indent=2))
+        return 1
+
+    now = datetime.now()
+    state = load_scheduler_state()
+    agents = collect_agents(content, now)
+    resources = sample_session_resources()
+    record_demand(state, agents, now)
+    actions = plan_actions(agents, resources, policy, state, now)
+
+    output: dict[str, Any] = {
+        "success": True,
+        "timestamp": now.isoformat(),
+        "command": args.command,
+        "running_agents": actions["running"],
+        "max_concurrent_agents": MAX_CONCURRENT_AGENTS,
+        "hibernate": actions["hibernate"],
+        "wake": actions["wake"],
+        "skipped": actions["skipped"],
+    }
+
+    if args.command == "plan":
+        save_scheduler_state(state)
+        print(json.dumps(output, indent=2))
+        return 0
+
+    # Earlier requests approved since the last pass run first, if still valid
+    planned = {
+        (kind, op["session_name"])
+        for kind in ("hibernate", "wake")
+        for op in actions[kind]
+    }
+    carried = [
+        op
+        for op in _approved_pending_operations(state, now)
+        if (op["op"], op["session_name"]) in planned
+    ]
+    carried_sessions = {op["session_name"] for op in carried}
+
+    approvals: list[dict[str, Any]] = []
+    batches: list[list[dict[str, Any]]] = [
+        [op for op in carried if op["op"] == kind] for kind in ("hibernate", "wake")
+    ]
+    batches = [b for b in batches if b]
+    running = actions["running"]
+    for kind in ("hibernate", "wake"):
+        fresh = [
+            {**op, "op": kind}
+            for op in actions[kind]
+            if op["session_name"] not in carried_sessions
+            and not any(
+                op["session_name"] == pending["session_name"]
+                for ops in state["pending_approvals"].values()
+                for pending in ops
+            )
+        ]
+        approved, records = authorize_batches(kind, fresh, batch_size, running, state)
+        approvals.extend(records)
+        batches.extend(approved)
+        running += len(actions[kind]) if kind == "wake" else -len(actions[kind])
+
+    # Hibernations free slots before any wake runs
+    batches.sort(key=lambda b: b[0]["op"] != "hibernate")
+    results = run_batches(batches, check_resources=not args.skip_resource_check)
+    succeeded = [r for r in results if r["status"] == "success"]
+    for entry in succeeded:
+        if entry["op"] == "wake":
+            state["woken_at"][entry["session_name"]] = now.isoformat()
+    save_scheduler_state(state)
+
+    if succeeded:
+        # Re-read so edits made while operations ran are kept
+        content = read_file_safely(state_file)
+        for entry in succeeded:
+            content = set_agent_status(
+                content, entry["session_name"], RESULT_STATUS[entry["op"]]
+            )
+        if not write_file_safely(state_file, content):
+            output["error"] = f"Failed to update state file: {state_file}"
+
+    output["approvals"] = approvals
+    output["awaiting_approval"] = sorted(state["pending_approvals"])
+    output["results"] = results
+    output["success"] = "error" not in output and all(
+        r["status"] != "error" for r in results
+    )
+    print(json.dumps(output, indent=2))
+    return 0 if output["success"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""
+ecos_capacity_plan.py - Simulate staffing plans against ECOS capacity limits.
+
+Combines the agent limits and resource thresholds from shared/thresholds.py
+with the team role limits (ecos_team_registry.ROLE_CONSTRAINTS) and
+per-agent resource footprints, then simulates each plan over a horizon
+(default one week in 15-minute steps). For every plan it reports:
+
+- whether every team composition satisfies ROLE_CONSTRAINTS
+- peak concurrency (total, per project), memory and CPU, and when
+- the bottleneck (limit with the highest peak utilization)
+- whether the plan fits when agents run around the clock and when they
+  are hibernated outside their working windows
+- a hibernate/wake schedule that respects every limit: agents are woken
+  a lead time before their window, by role priority (orchestrator,
+  architect, integrator, programmer), and demand that cannot be admitted
+  is reported as deferred agent-hours
+
+Agents that share a team, role and schedule are simulated as one group,
+so hundreds of agents over a week take well under a second.
+
+Plan file format (JSON):
+    {
+      "horizon_hours": 168, "step_minutes": 15, "wake_lead_minutes": 15,
+      "host": {"memory_gb": 32, "base_memory_gb": 6, "base_cpu_percent": 10},
+      "footprints": {"default": {"memory_gb": 1.2, "cpu_percent": 4},
+                     "programmer": {"memory_gb": 1.8, "cpu_percent": 6}},
+      "plans": [
+        {"name": "q3-staffing",
+         "teams": [
+           {"name": "svgbbox-library-team", "project": "svgbbox",
+            "schedule": {"days": [0, 1, 2, 3, 4], "hours": [9, 18]},
+            "agents": {"orchestrator": 1, "architect": 1, "programmer": 3}},
+           {"name": "docs-site-team", "project": "docs",
+            "agents": [{"role": "orchestrator"}, {"role": "architect"},
+                       {"role": "programmer", "count": 2,
+                        "schedule": {"days": [5, 6], "hours": [22, 6]}}]}]}
+      ]
+    }
+
+Schedules use local wall-clock days (0 = Monday) and hours [start, end);
+an end before the start wraps past midnight. A missing schedule means
+always on. The simulation starts Monday 00:00.
+
+Dependencies: Python 3.8+ stdlib only
+
+Usage:
+    python ecos_capacity_plan.py PLAN_FILE [--observe] [--schedule] [--plan NAME]
+
+Exit codes:
+    0 - Every simulated plan fits (with hibernation)
+    1 - Error, or at least one plan does not fit
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+from ecos_resource_monitor import get_memory_usage
+from ecos_staff_status import sample_session_resources
+from ecos_team_registry import ROLE_CONSTRAINTS
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "shared"))
+
+from thresholds import (  # noqa: E402
+    CPU_THRESHOLD_PERCENT,
+    MAX_AGENTS_PER_PROJECT,
+    MAX_CONCURRENT_AGENTS,
+    MEMORY_THRESHOLD_PERCENT,
+)
+
+DEFAULT_FOOTPRINT = {"memory_gb": 1.0, "cpu_percent": 5.0}
+DEFAULT_HOST_MEMORY_GB = 16.0
+
+# Admission order when demand exceeds a limit (lower wakes first)
+ROLE_PRIORITY = {"orchestrator": 0, "architect": 1, "integrator": 2, "programmer": 3}
+
+DAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+def observe_footprints(host: dict[str, Any]) -> dict[str, Any]:
+    """Derive host memory and a default agent footprint from live samples.
+
+    Uses the resource monitor for total memory and the per-tmux-session
+    process trees for the average agent CPU/RSS.
+
+    Returns:
+        {"host": {...}, "footprints": {"default": {...}}, "sampled_sessions": n}
+    """
+    observed_host = dict(host)
+    memory = get_memory_usage()
+    if memory.get("total_gb"):
+        observed_host.setdefault("memory_gb", memory["total_gb"])
+
+    sessions = sample_session_resources()
+    footprints: dict[str, Any] = {}
+    if sessions:
+        cores = os.cpu_count() or 1
+        cpu_total = sum(s["cpu_percent"] for s in sessions.values())
+        footprints["default"] = {
+            "memory_gb": round(
+                sum(s["rss_mb"] for s in sessions.values()) / len(sessions) / 1024, 3
+            ),
+            # ps reports per-core percent; limits are whole-machine percent
+            "cpu_percent": round(cpu_total / len(sessions) / cores, 2),
+        }
+    return {
+        "host": observed_host,
+        "footprints": footprints,
+        "sampled_sessions": len(sessions),
+    }
+
+
+def expand_groups(plan: dict[str, Any]) -> list[dict[str, Any]]:
+    """Turn a plan's teams into agent groups sharing team, role and schedule."""
+    groups = []
+    for team in plan["teams"]:
+        agents = team["agents"]
+        if isinstance(agents, dict):
+            specs = [{"role": role, "count": count} for role, count in agents.items()]
+        else:
+            specs = agents
+        for spec in specs:
+            groups.append(
+                {
+                    "team": team["name"],
+                    "project": team.get("project", team["name"]),
+                    "role": spec["role"],
+                    "count": int(spec.get("count", 1)),
+                    "schedule": spec.get("schedule", team.get("schedule")),
+                }
+            )
+    return groups
+
+
+def check_role_constraints(groups: list[dict[str, Any]]) -> list[str]:
+    """Check every team's composition against ROLE_CONSTRAINTS."""
+    counts: dict[str, dict[str, int]] = {}
+    for group in groups:
+        team_counts = counts.setdefault(group["team"], {})
+        team_counts[group["role"]] = team_counts.get(group["role"], 0) + group["count"]
+
+    errors = []
+    for team, roles in counts.items():
+        for role in roles:
+            if role not in ROLE_CONSTRAINTS:
+                errors.append(f"{team}: unknown role '{role}'")
+        for role, constraint in ROLE_CONSTRAINTS.items():
+            count = roles.get(role, 0)
+            if count < constraint.min:
+                errors.append(f"{team}: too few '{role}' ({count} < {constraint.min})")
+            if count > constraint.max:
+                errors.append(f"{team}: too many '{role}' ({count} > {constraint.max})")
+    return errors
+
+
+def schedule_active(
+    schedule: dict[str, Any] | None, day: int, minute_of_day: int
+) -> bool:
+    """Return whether a schedule wants agents working at a day and minute.
+
+    Args:
+        schedule: {"days": [0-6], "hours": [start, end]} (None means always)
+        day: Day of week, 0 = Monday
+        minute_of_day: Minutes since midnight
+    """
+    if not schedule:
+        return True
+    days = schedule.get("days", range(7))
+    start_hour, end_hour = schedule.get("hours", [0, 24])
+    start, end = start_hour * 60, end_hour * 60
+    if start <= end:
+        return day in days and start <= minute_of_day < end
+    if minute_of_day >= start:
+        return day in days
+    # Early-morning part of a window that started the previous day
+    return minute_of_day < end and (day - 1) % 7 in days
+
+
+def demand_mask(
+    schedule: dict[str, Any] | None, steps: int, step_minutes: int
+) -> list[bool]:
+    """Return, per simulation step, whether a schedule wants agents working."""
+    if not schedule:
+        return [True] * steps
+    schedule = {**schedule, "days": set(schedule.get("days", range(7)))}
+    mask = []
+    for step in range(steps):
+        minute = step * step_minutes
+        mask.append(schedule_active(schedule, (minute // 1440) % 7, minute % 1440))
+    return mask
+
+
+def with_lead(mask: list[bool], lead_steps: int) -> list[bool]:
+    """Extend each demand window backwards by the wake lead time."""
+    if lead_steps <= 0:
+        return mask
+    awake = list(mask)
+    for step, on in enumerate(mask):
+        if on and (step == 0 or not mask[step - 1]):
+            for back in range(max(0, step - lead_steps), step):
+                awake[back] = True
+    return awake
+
+
+def _footprint(footprints: dict[str, Any], role: str) -> dict[str, float]:
+    """Per-agent footprint for a role (role entry, else default)."""
+    return {
+        **DEFAULT_FOOTPRINT,
+        **footprints.get("default", {}),
+        **footprints.get(role, {}),
+    }
+
+
+def _step_label(step: int, step_minutes: int) -> str:
+    """Format a simulation step as 'Mon 09:15'."""
+    minute = step * step_minutes
+    return (
+        f"{DAY_NAMES[(minute // 1440) % 7]} "
+        f"{(minute % 1440) // 60:02d}:{minute % 60:02d}"
+    )
+
+
+def simulate_load(
+    groups: list[dict[str, Any]],
+    masks: list[list[bool]],
+    footprints: dict[str, Any],
+    host: dict[str, Any],
+    steps: int,
+    step_minutes: int,
+) -> dict[str, Any]:
+    """Peak concurrency and resource use for groups awake per their masks."""
+    total = [0] * steps
+    memory = [float(host.get("base_memory_gb", 0.0))] * steps
+    cpu = [float(host.get("base_cpu_percent", 0.0))] * steps
+    per_project: dict[str, list[int]] = {}
+    for group, mask in zip(groups, masks):
+        fp = _footprint(footprints, group["role"])
+        project_total = per_project.setdefault(group["project"], [0] * steps)
+        n = group["count"]
+        for step, on in enumerate(mask):
+            if on:
+                total[step] += n
+                project_total[step] += n
+                memory[step] += n * fp["memory_gb"]
+                cpu[step] += n * fp["cpu_percent"]
+
+    host_memory = float(host.get("memory_gb", DEFAULT_HOST_MEMORY_GB))
+    memory_percent = [m / host_memory * 100 for m in memory]
+
+    def peak(series: Sequence[float]) -> tuple[float, int]:
+        step = max(range(steps), key=series.__getitem__)
+        return series[step], step
+
+    peaks: dict[str, Any] = {}
+    utilization: dict[str, float] = {}
+    for name, series, limit in (
+        ("concurrent_agents", total, MAX_CONCURRENT_AGENTS),
+        ("memory_percent", memory_percent, MEMORY_THRESHOLD_PERCENT),
+        ("cpu_percent", cpu, CPU_THRESHOLD_PERCENT),
+    ):
+        value, step = peak(series)
+        peaks[name] = {
+            "peak": round(value, 1),
+            "limit": limit,
+            "at": _step_label(step, step_minutes),
+        }
+        utilization[name] = value / limit
+    for project, series in per_project.items():
+        value, step = peak(series)
+        peaks[f"project:{project}"] = {
+            "peak": value,
+            "limit": MAX_AGENTS_PER_PROJECT,
+            "at": _step_label(step, step_minutes),
+        }
+        utilization[f"project:{project}"] = value / MAX_AGENTS_PER_PROJECT
+
+    bottleneck = max(utilization, key=utilization.__getitem__)
+    return {
+        "fits": all(u <= 1.0 for u in utilization.values()),
+        "bottleneck": bottleneck,
+        "bottleneck_utilization": round(utilization[bottleneck], 2),
+        "peaks": peaks,
+    }
+
+
+def plan_schedule(
+    groups: list[dict[str, Any]],
+    masks: list[list[bool]],
+    footprints: dict[str, Any],
+    host: dict[str, Any],
+    steps: int,
+    step_minutes: int,
+) -> dict[str, Any]:
+    """Greedy wake/hibernate schedule that never exceeds a limit.
+
+    At each step the demanded agents are admitted by role priority, then
+    by how long they have been awake (to avoid churn), while the total,
+    per-project, memory and CPU limits allow. Everything else stays (or
+    goes) hibernated and counts as deferred demand.
+    """
+    host_memory = float(host.get("memory_gb", DEFAULT_HOST_MEMORY_GB))
+    memory_limit = host_memory * MEMORY_THRESHOLD_PERCENT / 100
+    order = sorted(
+        range(len(groups)), key=lambda i: ROLE_PRIORITY.get(groups[i]["role"], 99)
+    )
+    footprint = [_footprint(footprints, g["role"]) for g in groups]
+    awake_prev = [0] * len(groups)
+    schedule: list[list[dict[str, Any]]] = [[] for _ in groups]
+    deferred = [0] * len(groups)
+    transitions = 0
+
+    for step in range(steps):
+        total = 0
+        memory = float(host.get("base_memory_gb", 0.0))
+        cpu = float(host.get("base_cpu_percent", 0.0))
+        project_load: dict[str, int] = {}
+        awake_now = [0] * len(groups)
+        # Already-awake agents keep their slot ahead of new wakes
+        for i in sorted(order, key=lambda i: awake_prev[i] == 0):
+            if not masks[i][step]:
+                continue
+            group, fp = groups[i], footprint[i]
+            project = group["project"]
+            n = 0
+            while n < group["count"]:
+                if (
+                    total + 1 > MAX_CONCURRENT_AGENTS
+                    or project_load.get(project, 0) + 1 > MAX_AGENTS_PER_PROJECT
+                    or memory + fp["memory_gb"] > memory_limit
+                    or cpu + fp["cpu_percent"] > CPU_THRESHOLD_PERCENT
+                ):
+                    break
+                n += 1
+                total += 1
+                memory += fp["memory_gb"]
+                cpu += fp["cpu_percent"]
+                project_load[project] = project_load.get(project, 0) + 1
+            awake_now[i] = n
+            deferred[i] += group["count"] - n
+
+        for i in range(len(groups)):
+            if awake_now[i] != awake_prev[i]:
+                transitions += abs(awake_now[i] - awake_prev[i])
+                schedule[i].append(
+                    {"at": _step_label(step, step_minutes), "awake": awake_now[i]}
+                )
+        awake_prev = awake_now
+
+    hours_per_step = step_minutes / 60
+    deferred_by_role: dict[str, float] = {}
+    for i, group in enumerate(groups):
+        deferred_by_role[group["role"]] = (
+            deferred_by_role.get(group["role"], 0) + deferred[i] * hours_per_step
+        )
+    return {
+        "fits": not any(deferred),
+        "deferred_agent_hours": round(sum(deferred) * hours_per_step, 2),
+        "deferred_by_role": {r: round(h, 2) for r, h in deferred_by_role.items() if h},
+        "wake_hibernate_transitions": transitions,
+        "groups": [
+            {
+                "team": g["team"],
+                "role": g["role"],
+                "count": g["count"],
+                "changes": schedule[i],
+            }
+            for i, g in enumerate(groups)
+        ],
+    }
+
+
+def simulate_plan(
+    plan: dict[str, Any], settings: dict[str, Any], include_schedule: bool
+) -> dict[str, Any]:
+    """Simulate one plan: role checks, always-on load, hibernated load, schedule."""
+    steps = int(settings["horizon_hours"] * 60 // settings["step_minutes"])
+    step_minutes = int(settings["step_minutes"])
+    lead_steps = -(-int(settings["wake_lead_minutes"]) // step_minutes)
+    groups = expand_groups(plan)
+
+    # Identical schedules are expanded once
+    mask_cache: dict[str, list[bool]] = {}
+    masks = []
+    for group in groups:
+        key = json.dumps(group["schedule"], sort_keys=True)
+        if key not in mask_cache:
+            mask_cache[key] = with_lead(
+                demand_mask(group["schedule"], steps, step_minutes), lead_steps
+            )
+        masks.append(mask_cache[key])
+
+    always_on = [[True] * steps for _ in groups]
+    footprints, host = settings["footprints"], settings["host"]
+    role_errors = check_role_constraints(groups)
+    hibernated = simulate_load(groups, masks, footprints, host, steps, step_minutes)
+    schedule = plan_schedule(groups, masks, footprints, host, steps, step_minutes)
+    if not include_schedule:
+        schedule.pop("groups")
+
+    return {
+        "name": plan.get("name", "plan"),
+        "agents": sum(g["count"] for g in groups),
+        "fits": not role_errors and hibernated["fits"],
+        "role_errors": role_errors,
+        "always_on": simulate_load(
+            groups, always_on, footprints, host, steps, step_minutes
+        ),
+        "with_hibernation": hibernated,
+        "schedule": schedule,
+    }
+
+
+def main() -> int:
+    """Main entry point.
+
+    Returns:
+        Exit code: 0 if every plan fits, 1 otherwise or on error
+    """
+    parser = argparse.ArgumentParser(
+        description="Simulate staffing plans against ECOS capacity limits"
+    )
+    parser.add_argument("plan_file", help="Plan JSON file ('-' for stdin)")
+    parser.add_argument(
+        "--observe",
+        action="store_true",
+        help="Fill in host memory and agent footprints from live measurements",
+    )
+    parser.add_argument(
+        "--schedule",
+        action="store_true",
+        help="Include the per-group wake/hibernate changes in the output",
+    )
+    parser.add_argument("--plan", help="Only simulate the plan with this name")
+
+    args = parser.parse_args()
+
+    try:
+        if args.plan_file == "-":
+            config = json.load(sys.stdin)
+        else:
+            with open(args.plan_file, encoding="utf-8") as f:
+                config = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(json.dumps({"success": False, "error": str(e)}, indent=2))
+        return 1
+
+    settings = {
+        "horizon_hours": config.get("horizon_hours", 168),
+        "step_minutes": config.get("step_minutes", 15),
+        "wake_lead_minutes": config.get("wake_lead_minutes", 15),
+        "host": config.get("host", {}),
+        "footprints": config.get("footprints", {}),
+    }
+    observed = None
+    if args.observe:
+        observed = observe_footprints(settings["host"])
+        settings["host"] = observed["host"]
+        # Explicit footprints in the plan file win over observations
+        settings["footprints"] = {**observed["footprints"], **settings["footprints"]}
+
+    plans = config.get("plans") or [config]
+    if args.plan:
+        plans = [p for p in plans if p.get("name") == args.plan]
+        if not plans:
+            print(
+                json.dumps(
+                    {"success": False, "error": f"No plan named '{args.plan}'"},
+                    indent=2,
+                )
+            )
+            return 1
+
+    try:
+        results = [simulate_plan(p, settings, args.schedule) for p in plans]
+    except (KeyError, TypeError, ValueError) as e:
+        print(json.dumps({"success": False, "error": f"Invalid plan: {e}"}, indent=2))
+        return 1
+
+    output = {
+        "success": True,
+        "limits": {
+            "max_concurrent_agents": MAX_CONCURRENT_AGENTS,
+            "max_agents_per_project": MAX_AGENTS_PER_PROJECT,
+            "memory_threshold_percent": MEMORY_THRESHOLD_PERCENT,
+            "cpu_threshold_percent": CPU_THRESHOLD_PERCENT,
+        },
+        "settings": settings,
+        "observed": observed,
+        "all_fit": all(r["fits"] for r in results),
+        "plans": results,
+    }
+    print(json.dumps(output, indent=2))
+    return 0 if output["all_fit"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
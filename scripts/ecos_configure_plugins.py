@@ -26,6 +26,8 @@ import json
 import subprocess
 import sys
 
+from ecos_plugin_store import get_plugin_index_entry, load_cache_index
+
 
 def run_claude_command(args: list[str], timeout: int = 30) -> tuple[bool, str, str]:
     """
@@ -51,6 +53,16 @@ def run_claude_command(args: list[str], timeout: int = 30) -> tuple[bool, str, s
         return False, "", str(e)
 
 
+def cached_plugin_version(plugin_name: str) -> str | None:
+    """Return the latest cached marketplace version of a plugin, if any.
+
+    Accepts 'name' or 'name@marketplace' and resolves via the plugin cache
+    index (semantic version order).
+    """
+    entry = get_plugin_index_entry(plugin_name.split("@", 1)[0])
+    return entry["latest"] if entry else None
+
+
 def list_plugins() -> dict:
     """
     List currently installed/enabled plugins.
@@ -75,10 +87,18 @@ def list_plugins() -> dict:
             # Try to extract plugin name from the line
             plugins.append(line)
 
+    # Latest cached marketplace version per plugin, from the saved cache
+    # index (listing never re-indexes or ingests plugin trees)
+    index = load_cache_index()
+    marketplace_cache = {
+        name: entry["latest"] for name, entry in index.get("plugins", {}).items()
+    }
+
     return {
         "success": True,
         "operation": "list",
         "plugins": plugins,
+        "marketplace_cache": marketplace_cache,
         "raw_output": stdout,
     }
 
@@ -124,6 +144,7 @@ def add_plugin(plugin_name: str, scope: str) -> dict:
             "plugin": plugin_name,
             "scope": scope,
             "message": f"Plugin '{plugin_name}' enabled (was already installed)",
+            "cached_version": cached_plugin_version(plugin_name),
         }
 
     return {
@@ -132,6 +153,7 @@ def add_plugin(plugin_name: str, scope: str) -> dict:
         "plugin": plugin_name,
         "scope": scope,
         "message": f"Plugin '{plugin_name}' installed and enabled",
+        "cached_version": cached_plugin_version(plugin_name),
     }
 
 
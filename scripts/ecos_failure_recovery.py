@@ -24,12 +24,19 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import shutil
 import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, cast
 
+from ecos_spawn_agent import install_marketplace_plugin
+from ecos_standby_pool import claim_standby, has_standby
+from ecos_team_registry import ROLE_CONSTRAINTS
+
 # aimaestro-agent.sh CLI path
 AIMAESTRO_CLI = os.environ.get(
     "AIMAESTRO_CLI", os.path.expanduser("~/.local/bin/aimaestro-agent.sh")
@@ -42,6 +49,12 @@ RECOVERABLE_THRESHOLD = 1800  # 30 minutes
 # Ping timeout (seconds)
 PING_TIMEOUT = 30
 
+# Agent directories (FLAT structure, same as ecos_spawn_agent.py).
+# Replacements are pre-staged under STAGING_DIR on the same filesystem so
+# committing a stage is an atomic rename.
+AGENTS_DIR = Path.home() / "agents"
+STAGING_DIR = AGENTS_DIR / ".staging"
+
 
 def iso_now() -> str:
     """Return current UTC timestamp in ISO format."""
@@ -355,8 +368,6 @@ def execute_recovery(agent: str, strategy: str) -> dict[str, Any]:
             return result
 
         # Wait a moment then wake
-        import time
-
         time.sleep(2)
 
         w_code, w_stdout, w_stderr = run_cli("wake", agent)
@@ -384,24 +395,220 @@ def execute_recovery(agent: str, strategy: str) -> dict[str, Any]:
     return result
 
 
+def _default_plugins_for_role(role: str) -> list[str]:
+    """Return the marketplace plugin required by a team role, if any."""
+    constraint = ROLE_CONSTRAINTS.get(role)
+    return [constraint.plugin] if constraint else []
+
+
+def _request_replacement_approval(
+    failed_agent: str, new_name: str, timeout_seconds: int
+) -> dict[str, Any]:
+    """Request EAMA approval for a replacement and block until it is decided.
+
+    Uses ecos_approval_manager.py 'create' followed by 'wait'. Runs in a
+    worker thread so the replacement can be pre-staged meanwhile.
+
+    Args:
+        failed_agent: Name of the failed agent
+        new_name: Name for the replacement agent
+        timeout_seconds: How long to wait for a decision
+
+    Returns:
+        Dict with 'approval' ('granted', 'denied', 'timeout', 'error',
+        'skipped' or 'assumed_granted') plus any error/reason details
+    """
+    approval_script = Path(__file__).parent / "ecos_approval_manager.py"
+    if not approval_script.exists():
+        return {
+            "approval": "skipped",
+            "approval_warning": "Approval manager not found",
+        }
+
+    try:
+        create_result = subprocess.run(
+            [
+                sys.executable,
+                str(approval_script),
+                "create",
+                "--type",
+                "agent_replacement",
+                "--agent",
+                failed_agent,
+                "--reason",
+                f"Replacing failed agent {failed_agent} with {new_name}",
+            ],
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        if create_result.returncode != 0:
+            return {"approval": "denied", "approval_error": create_result.stderr}
+
+        try:
+            request_id = json.loads(create_result.stdout)["request_id"]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            # Assume approval granted if script ran successfully
+            return {"approval": "assumed_granted"}
+
+        wait_result = subprocess.run(
+            [
+                sys.executable,
+                str(approval_script),
+                "wait",
+                "--id",
+                request_id,
+                "--timeout",
+                str(timeout_seconds),
+            ],
+            capture_output=True,
+            text=True,
+            timeout=timeout_seconds + 30,
+        )
+        try:
+            decision = json.loads(wait_result.stdout)
+        except json.JSONDecodeError:
+            return {
+                "approval": "error",
+                "approval_request_id": request_id,
+                "approval_error": wait_result.stderr or "Invalid approval response",
+            }
+
+        if decision.get("status") == "timeout":
+            return {
+                "approval": "timeout",
+                "approval_request_id": request_id,
+                "approval_error": "Approval request timed out",
+            }
+        if decision.get("decision") != "approved":
+            return {
+                "approval": "denied",
+                "approval_request_id": request_id,
+                "approval_reason": decision.get("decision_comment")
+                or decision.get("error"),
+            }
+        return {"approval": "granted", "approval_request_id": request_id}
+
+    except subprocess.TimeoutExpired:
+        return {"approval": "timeout", "approval_error": "Approval request timed out"}
+    except Exception as e:
+        return {"approval": "error", "approval_error": str(e)}
+
+
+def _stage_replacement(new_name: str, plugins: list[str]) -> dict[str, Any]:
+    """Pre-stage the replacement agent directory and its plugins.
+
+    Plugins are copied into STAGING_DIR/<new_name>/ which lives on the same
+    filesystem as AGENTS_DIR, so committing the stage is a cheap rename.
+
+    Args:
+        new_name: Name for the replacement agent
+        plugins: Marketplace plugin names to install
+
+    Returns:
+        Dict with staging_dir, plugins_staged and plugins_failed
+    """
+    staging_dir = STAGING_DIR / new_name
+    if staging_dir.exists():
+        shutil.rmtree(staging_dir)
+    staging_dir.mkdir(parents=True)
+
+    staged: list[str] = []
+    failed: list[str] = []
+    for plugin in plugins:
+        if install_marketplace_plugin(plugin, staging_dir):
+            staged.append(plugin)
+        else:
+            failed.append(plugin)
+
+    return {
+        "staging_dir": str(staging_dir),
+        "plugins_staged": staged,
+        "plugins_failed": failed,
+    }
+
+
+def _safe_stage_replacement(new_name: str, plugins: list[str]) -> dict[str, Any]:
+    """Pre-stage a replacement, reporting filesystem errors instead of raising."""
+    try:
+        return _stage_replacement(new_name, plugins)
+    except OSError as e:
+        return {"staging_error": str(e), "plugins_staged": []}
+
+
+def _commit_staged_replacement(new_name: str) -> Path:
+    """Move a pre-staged replacement into its final agent directory.
+
+    Args:
+        new_name: Name for the replacement agent
+
+    Returns:
+        Path to the committed agent directory
+    """
+    staging_dir = STAGING_DIR / new_name
+    agent_dir = AGENTS_DIR / new_name
+
+    if not agent_dir.exists():
+        staging_dir.rename(agent_dir)
+        return agent_dir
+
+    # Agent directory already exists - swap in only the staged plugins
+    staged_plugins = staging_dir / ".claude" / "plugins"
+    if staged_plugins.is_dir():
+        dest_plugins = agent_dir / ".claude" / "plugins"
+        dest_plugins.mkdir(parents=True, exist_ok=True)
+        for plugin_dir in staged_plugins.iterdir():
+            dest = dest_plugins / plugin_dir.name
+            if dest.exists():
+                shutil.rmtree(dest)
+            plugin_dir.rename(dest)
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    return agent_dir
+
+
+def _rollback_staged_replacement(new_name: str) -> None:
+    """Discard a pre-staged replacement that will not be committed."""
+    shutil.rmtree(STAGING_DIR / new_name, ignore_errors=True)
+
+
 def replace_agent(
-    failed_agent: str, new_name: str, role: str, project: str, work_dir: str
+    failed_agent: str,
+    new_name: str,
+    role: str,
+    project: str,
+    work_dir: str | None,
+    plugins: list[str] | None = None,
+    approval_timeout: int = 120,
+    use_standby: bool = False,
 ) -> dict[str, Any]:
     """Replace a failed agent with a new one.
 
-    Steps:
-    1. Request approval from EAMA (uses ecos_approval_manager.py)
-    2. Create new agent via aimaestro-agent.sh create
-    3. Notify EOA to generate handoff
-    4. Notify EOA to update GitHub Project kanban
-    5. Send message to new agent with handoff instructions
+    The workflow is pipelined to shorten time to recovery:
+    1. Request approval from EAMA (uses ecos_approval_manager.py) in the
+       background while the replacement directory and plugins are
+       pre-staged under STAGING_DIR
+    2. On approval, commit the stage and create the new agent via
+       aimaestro-agent.sh create; otherwise roll the stage back. With
+       use_standby and no work_dir, a matching warm standby from
+       ecos_standby_pool.py is claimed instead and its session name becomes
+       'new_agent' (standbys run in their own agent directory, so a
+       requested work_dir always gets a newly created agent)
+    3. In parallel: notify EOA to generate handoff, notify EOA to update
+       GitHub Project kanban, and message the new agent with handoff
+       instructions
+
+    Per-stage wall-clock durations are recorded in 'timings'.
 
     Args:
         failed_agent: Name of the failed agent
         new_name: Name for the replacement agent
         role: Role for the new agent
         project: Project ID to assign
-        work_dir: Working directory for the new agent
+        work_dir: Working directory for the new agent (None: its agent
+            directory)
+        plugins: Marketplace plugins to install (default: the role's plugin)
+        approval_timeout: Seconds to wait for the approval decision
+        use_standby: Prefer a warm standby over creating a new agent
 
     Returns:
         Replacement result:
@@ -409,6 +616,7 @@ def replace_agent(
             success: bool,
             new_agent: str,
             handoff_sent: bool,
+            timings: {stage: seconds},
             details: {...}
         }
     """
@@ -418,134 +626,155 @@ def replace_agent(
         "success": False,
         "handoff_sent": False,
         "timestamp": iso_now(),
+        "timings": {},
         "details": {},
     }
+    timings: dict[str, float] = result["timings"]
+    pipeline_start = time.monotonic()
+
+    if plugins is None:
+        plugins = _default_plugins_for_role(role)
+
+    # A pooled standby needs no staging; it is claimed once approval lands
+    standby_expected = use_standby and not work_dir and has_standby(role, plugins)
+    result["details"]["standby_expected"] = standby_expected
+    if use_standby and work_dir:
+        result["details"]["standby_skipped"] = (
+            "work_dir given; standbys run in their own agent directory"
+        )
 
-    # 1. Request approval from EAMA
-    # Check if approval manager exists
-    script_dir = Path(__file__).parent
-    approval_script = script_dir / "ecos_approval_manager.py"
-
-    if approval_script.exists():
-        try:
-            approval_result = subprocess.run(
-                [
-                    sys.executable,
-                    str(approval_script),
-                    "request",
-                    "--type",
-                    "agent_replacement",
-                    "--agent",
-                    failed_agent,
-                    "--replacement",
-                    new_name,
-                    "--reason",
-                    f"Replacing failed agent {failed_agent}",
-                ],
-                capture_output=True,
-                text=True,
-                timeout=60,
-            )
-
-            if approval_result.returncode != 0:
-                result["details"]["approval"] = "denied"
-                result["details"]["approval_error"] = approval_result.stderr
-                return result
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        # 1. Request approval and pre-stage concurrently
+        approval_future = pool.submit(
+            _request_replacement_approval, failed_agent, new_name, approval_timeout
+        )
 
-            try:
-                approval_data = json.loads(approval_result.stdout)
-                if not approval_data.get("approved", False):
-                    result["details"]["approval"] = "denied"
-                    result["details"]["approval_reason"] = approval_data.get("reason")
-                    return result
-                result["details"]["approval"] = "granted"
-            except json.JSONDecodeError:
-                # Assume approval granted if script ran successfully
-                result["details"]["approval"] = "assumed_granted"
-
-        except subprocess.TimeoutExpired:
-            result["details"]["approval"] = "timeout"
-            result["details"]["approval_error"] = "Approval request timed out"
-            return result
-        except Exception as e:
-            result["details"]["approval"] = "error"
-            result["details"]["approval_error"] = str(e)
+        staging: dict[str, Any] | None = None
+        if not standby_expected:
+            stage_start = time.monotonic()
+            staging = _safe_stage_replacement(new_name, plugins)
+            timings["staging"] = round(time.monotonic() - stage_start, 3)
+            result["details"].update(staging)
+
+        approval = approval_future.result()
+        timings["approval"] = round(time.monotonic() - pipeline_start, 3)
+        result["details"].update(approval)
+
+        if approval["approval"] not in ("granted", "assumed_granted", "skipped"):
+            if staging is not None:
+                _rollback_staged_replacement(new_name)
+                result["details"]["staging_rolled_back"] = True
+            timings["total"] = round(time.monotonic() - pipeline_start, 3)
             return result
-    else:
-        # No approval manager - proceed with warning
-        result["details"]["approval"] = "skipped"
-        result["details"]["approval_warning"] = "Approval manager not found"
-
-    # 2. Create new agent via CLI
-    create_args = ["create", new_name, "--role", role]
-    if project:
-        create_args.extend(["--project", project])
-    if work_dir:
-        create_args.extend(["--cwd", work_dir])
 
-    code, stdout, stderr = run_cli(*create_args)
+        # 2. Claim a standby, or commit the stage and create the new agent
+        commit_start = time.monotonic()
+        claim = claim_standby(role, project, plugins) if standby_expected else None
+        if claim is not None and claim["status"] == "success":
+            # Standbys keep their session name (AI Maestro cannot rename)
+            new_name = claim["session_name"]
+            result["new_agent"] = new_name
+            result["details"]["from_pool"] = True
+        else:
+            if claim is not None:
+                result["details"]["standby_error"] = claim.get("error")
+            if staging is None:
+                # Standby vanished or failed to wake - stage late
+                staging = _safe_stage_replacement(new_name, plugins)
+                result["details"].update(staging)
+
+            create_args = ["create", new_name, "--role", role]
+            if project:
+                create_args.extend(["--project", project])
+            if work_dir:
+                create_args.extend(["--cwd", work_dir])
+
+            if "staging_error" not in staging:
+                agent_dir = _commit_staged_replacement(new_name)
+                if staging["plugins_staged"]:
+                    create_args.append("--")
+                    for plugin in staging["plugins_staged"]:
+                        create_args.extend(
+                            [
+                                "--plugin-dir",
+                                str(agent_dir / ".claude" / "plugins" / plugin),
+                            ]
+                        )
+
+            code, stdout, stderr = run_cli(*create_args)
+            if code != 0:
+                timings["commit"] = round(time.monotonic() - commit_start, 3)
+                result["details"]["create_error"] = stderr or stdout
+                timings["total"] = round(time.monotonic() - pipeline_start, 3)
+                return result
+        timings["commit"] = round(time.monotonic() - commit_start, 3)
 
-    if code != 0:
-        result["details"]["create_error"] = stderr or stdout
-        return result
+        result["details"]["agent_created"] = True
 
-    result["details"]["agent_created"] = True
+        # 3. Send all notifications in parallel via AMP CLI
+        notify_start = time.monotonic()
+        handoff_msg = (
+            f"Please generate handoff document for agent replacement. "
+            f"Failed agent: {failed_agent}, New agent: {new_name}, "
+            f"Role: {role}, Project: {project}"
+        )
+        kanban_msg = (
+            f"Update GitHub Project kanban for agent replacement. "
+            f"Mark {failed_agent} as failed, assign tasks to {new_name}"
+        )
+        base_dir = Path(work_dir) if work_dir else AGENTS_DIR / new_name
+        handoff_path = base_dir / "thoughts" / "shared" / "handoffs" / failed_agent
+        handoff_file = handoff_path / "current.md"
+        handoff_instructions = (
+            f"You are replacing agent {failed_agent}. "
+            f"Your role is: {role}. Project: {project}. "
+            f"Check for handoff document at: {handoff_file}"
+        )
 
-    # 3. Notify EOA to generate handoff via AMP CLI
-    handoff_msg = (
-        f"Please generate handoff document for agent replacement. "
-        f"Failed agent: {failed_agent}, New agent: {new_name}, "
-        f"Role: {role}, Project: {project}"
-    )
-    if _amp_send(
-        recipient="orchestrator-master",
-        subject=f"Handoff request: {failed_agent} -> {new_name}",
-        message=handoff_msg,
-        priority="high",
-        msg_type="handoff_request",
-    ):
-        result["details"]["eoa_handoff_notified"] = True
-    else:
-        result["details"]["eoa_handoff_error"] = "amp-send failed"
+        eoa_handoff = pool.submit(
+            _amp_send,
+            "orchestrator-master",
+            f"Handoff request: {failed_agent} -> {new_name}",
+            handoff_msg,
+            "high",
+            "handoff_request",
+        )
+        eoa_kanban = pool.submit(
+            _amp_send,
+            "orchestrator-master",
+            f"Kanban update: agent replacement {new_name}",
+            kanban_msg,
+            "normal",
+            "kanban_update",
+        )
+        new_agent_handoff = pool.submit(
+            _amp_send,
+            new_name,
+            f"Handoff from {failed_agent}",
+            handoff_instructions,
+            "high",
+            "handoff",
+        )
 
-    # 4. Notify EOA to update GitHub Project kanban via AMP CLI
-    kanban_msg = (
-        f"Update GitHub Project kanban for agent replacement. "
-        f"Mark {failed_agent} as failed, assign tasks to {new_name}"
-    )
-    if _amp_send(
-        recipient="orchestrator-master",
-        subject=f"Kanban update: agent replacement {new_name}",
-        message=kanban_msg,
-        priority="normal",
-        msg_type="kanban_update",
-    ):
-        result["details"]["eoa_kanban_notified"] = True
-    else:
-        result["details"]["eoa_kanban_error"] = "amp-send failed"
+        if eoa_handoff.result():
+            result["details"]["eoa_handoff_notified"] = True
+        else:
+            result["details"]["eoa_handoff_error"] = "amp-send failed"
 
-    # 5. Send message to new agent with handoff instructions via AMP CLI
-    handoff_path = Path(work_dir) / "thoughts" / "shared" / "handoffs" / failed_agent
-    handoff_file = handoff_path / "current.md"
+        if eoa_kanban.result():
+            result["details"]["eoa_kanban_notified"] = True
+        else:
+            result["details"]["eoa_kanban_error"] = "amp-send failed"
 
-    handoff_instructions = (
-        f"You are replacing agent {failed_agent}. "
-        f"Your role is: {role}. Project: {project}. "
-        f"Check for handoff document at: {handoff_file}"
-    )
-    if _amp_send(
-        recipient=new_name,
-        subject=f"Handoff from {failed_agent}",
-        message=handoff_instructions,
-        priority="high",
-        msg_type="handoff",
-    ):
-        result["handoff_sent"] = True
-    else:
-        result["details"]["handoff_error"] = "amp-send failed"
+        if new_agent_handoff.result():
+            result["handoff_sent"] = True
+        else:
+            result["details"]["handoff_error"] = "amp-send failed"
+        timings["notify"] = round(time.monotonic() - notify_start, 3)
 
     # Success if agent was created and at least handoff was sent
     result["success"] = result["details"].get("agent_created", False)
+    timings["total"] = round(time.monotonic() - pipeline_start, 3)
 
     return result
 
@@ -640,12 +869,27 @@ def cmd_recover(args: argparse.Namespace) -> int:
 
 def cmd_replace(args: argparse.Namespace) -> int:
     """Handle 'replace' command."""
+    if not args.dir and not args.from_pool:
+        print(
+            json.dumps(
+                {"success": False, "error": "--dir is required without --from-pool"},
+                indent=2,
+            )
+        )
+        return 1
     result = replace_agent(
         failed_agent=args.failed,
         new_name=args.new,
         role=args.role,
         project=args.project,
         work_dir=args.dir,
+        plugins=(
+            [p.strip() for p in args.plugins.split(",") if p.strip()]
+            if args.plugins is not None
+            else None
+        ),
+        approval_timeout=args.approval_timeout,
+        use_standby=args.from_pool,
     )
     print(json.dumps(result, indent=2))
     return 0 if result["success"] else 1
@@ -687,6 +931,10 @@ Examples:
     python ecos_failure_recovery.py replace --failed dev-agent-01 --new dev-agent-02 \\
         --role developer --project myproj --dir /path/to/project
 
+    # Replace a failed agent with a warm standby (runs in its agent directory)
+    python ecos_failure_recovery.py replace --failed dev-agent-01 --new dev-agent-02 \\
+        --role developer --project myproj --from-pool
+
     # Transfer work to another agent
     python ecos_failure_recovery.py transfer --from dev-agent-01 --to dev-agent-02 \\
         --handoff /path/to/handoff.md
@@ -737,7 +985,27 @@ Examples:
     replace_parser.add_argument("--role", required=True, help="Role for the new agent")
     replace_parser.add_argument("--project", required=True, help="Project ID to assign")
     replace_parser.add_argument(
-        "--dir", required=True, help="Working directory for the new agent"
+        "--dir",
+        help=(
+            "Working directory for the new agent (required without --from-pool; "
+            "a standby is only claimed when no --dir is given)"
+        ),
+    )
+    replace_parser.add_argument(
+        "--plugins",
+        default=None,
+        help="Comma-separated marketplace plugins to pre-stage (default: role plugin)",
+    )
+    replace_parser.add_argument(
+        "--approval-timeout",
+        type=int,
+        default=120,
+        help="Seconds to wait for the replacement approval (default: 120)",
+    )
+    replace_parser.add_argument(
+        "--from-pool",
+        action="store_true",
+        help="Use a warm standby from ecos_standby_pool.py if one matches",
     )
     replace_parser.set_defaults(func=cmd_replace)
 
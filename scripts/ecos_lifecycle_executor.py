@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+ecos_lifecycle_executor.py - Run a batch of agent lifecycle operations in parallel.
+
+Takes a manifest of spawn/hibernate/wake/terminate operations, validates the
+whole batch up front (team role constraints, per-project limits and
+resource headroom), then runs the operations with bounded parallelism.
+Each operation is delegated to the existing single-agent script
+(ecos_spawn_agent.py, ecos_hibernate_agent.py, ecos_wake_agent.py,
+ecos_terminate_agent.py). Operations on the same session run in manifest
+order; operations on different sessions run concurrently.
+
+Manifest format (JSON):
+    {
+      "max_parallel": 4,
+      "operations": [
+        {"op": "spawn", "session_name": "svgbbox-orchestrator", "role": "orchestrator",
+         "project": "svgbbox", "plugins": ["emasoft-orchestrator-agent"],
+         "agent": "eoa-orchestrator-main-agent"},
+        {"op": "spawn", "session_name": "svgbbox-prog-01", "role": "programmer",
+         "project": "svgbbox", "plugins": ["emasoft-programmer-agent"], "from_pool": true},
+        {"op": "hibernate", "session_name": "old-agent"},
+        {"op": "wake", "session_name": "sleeping-agent"},
+        {"op": "terminate", "session_name": "dead-agent", "force": true}
+      ]
+    }
+
+Dependencies: Python 3.8+ stdlib only
+
+Usage:
+    python ecos_lifecycle_executor.py MANIFEST [--max-parallel N] [--registry-file PATH]
+        [--dry-run] [--skip-resource-check]
+
+Exit codes:
+    0 - All operations succeeded (or dry run validated)
+    1 - Validation failed or at least one operation failed
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from ecos_metrics_store import record_event
+from ecos_resource_monitor import (
+    can_spawn_agent,
+    get_claude_processes,
+    get_cpu_usage,
+    get_disk_usage,
+    get_memory_usage,
+)
+from ecos_team_registry import ROLE_CONSTRAINTS
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "shared"))
+from thresholds import MAX_AGENTS_PER_PROJECT, MAX_CONCURRENT_AGENTS  # noqa: E402
+
+SCRIPT_DIR = Path(__file__).parent
+
+OPERATION_SCRIPTS = {
+    "spawn": SCRIPT_DIR / "ecos_spawn_agent.py",
+    "hibernate": SCRIPT_DIR / "ecos_hibernate_agent.py",
+    "wake": SCRIPT_DIR / "ecos_wake_agent.py",
+    "terminate": SCRIPT_DIR / "ecos_terminate_agent.py",
+}
+
+# Change in running agents caused by each operation
+ACTIVE_DELTA = {"spawn": 1, "wake": 1, "hibernate": -1, "terminate": -1}
+
+DEFAULT_MAX_PARALLEL = 4
+
+# Per-operation subprocess timeout (seconds); spawn creates with a 120s timeout
+OPERATION_TIMEOUT = 300
+
+
+def iso_now() -> str:
+    """Return current UTC timestamp in ISO format."""
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def load_manifest(path: str) -> dict[str, Any]:
+    """Load a manifest from a JSON file, or from stdin when path is '-'."""
+    if path == "-":
+        data = json.load(sys.stdin)
+    else:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    if isinstance(data, list):
+        data = {"operations": data}
+    if not isinstance(data, dict) or not isinstance(data.get("operations"), list):
+        raise ValueError("Manifest must be a list or an object with 'operations'")
+    return data
+
+
+def _registry_counts(
+    registry_file: str | None,
+) -> tuple[dict[str, int], dict[str, str], str | None]:
+    """Return (active role counts, agent name -> role, project) from a registry."""
+    if not registry_file:
+        return {}, {}, None
+    with open(registry_file, encoding="utf-8") as f:
+        registry = json.load(f)
+    counts: dict[str, int] = {}
+    roles: dict[str, str] = {}
+    for agent in registry.get("agents", []):
+        roles[agent["name"]] = agent["role"]
+        if agent.get("status") != "terminated":
+            counts[agent["role"]] = counts.get(agent["role"], 0) + 1
+    return counts, roles, registry.get("team", {}).get("name")
+
+
+def validate_manifest(
+    operations: list[dict[str, Any]],
+    registry_file: str | None = None,
+    check_resources: bool = True,
+) -> dict[str, Any]:
+    """Validate a batch of operations before anything is executed.
+
+    Checks:
+    - Every operation is well formed (known op, session_name, role for spawn)
+    - Per project, final counts of constrained roles stay within
+      ROLE_CONSTRAINTS max (and min for the registry team's project, when
+      the team registry is given)
+    - Per project, agents after the batch (the registry team's existing
+      agents plus spawns, minus terminations) stay within
+      MAX_AGENTS_PER_PROJECT
+    - Net running agents stay within MAX_CONCURRENT_AGENTS and the resource
+      monitor allows spawning when the batch adds running agents
+
+    Returns:
+        {valid: bool, errors: [...], warnings: [...], net_active_delta: int}
+    """
+    errors: list[str] = []
+    warnings: list[str] = []
+
+    for i, op in enumerate(operations):
+        kind = op.get("op")
+        if kind not in OPERATION_SCRIPTS:
+            errors.append(
+                f"Operation {i}: unknown op '{kind}'. Valid: {list(OPERATION_SCRIPTS)}"
+            )
+            continue
+        if not op.get("session_name"):
+            errors.append(f"Operation {i}: missing session_name")
+        if kind == "spawn" and not op.get("role"):
+            errors.append(f"Operation {i}: spawn requires a role")
+
+    if errors:
+        return {"valid": False, "errors": errors, "warnings": warnings}
+
+    # Role and per-project limits on the final state of the batch
+    team_counts, team_roles, team_name = _registry_counts(registry_file)
+    project_roles: dict[str, dict[str, int]] = {}
+    project_agents: dict[str, int] = {}
+    for op in operations:
+        project = op.get("project") or team_name or "(none)"
+        counts = project_roles.setdefault(project, {})
+        if op["op"] == "spawn":
+            counts[op["role"]] = counts.get(op["role"], 0) + 1
+            project_agents[project] = project_agents.get(project, 0) + 1
+        elif op["op"] == "terminate" and op["session_name"] in team_roles:
+            role = team_roles[op["session_name"]]
+            counts[role] = counts.get(role, 0) - 1
+            project_agents[project] = project_agents.get(project, 0) - 1
+
+    # The registry describes one team: only its project starts from its agents
+    if registry_file and team_name in project_roles:
+        counts = project_roles[team_name]
+        for role, count in team_counts.items():
+            counts[role] = counts.get(role, 0) + count
+        project_agents[team_name] = project_agents.get(team_name, 0) + sum(
+            team_counts.values()
+        )
+
+    for project, counts in project_roles.items():
+        for role, count in counts.items():
+            constraint = ROLE_CONSTRAINTS.get(role)
+            if constraint is None:
+                continue
+            if count > constraint.max:
+                errors.append(
+                    f"Project '{project}': too many '{role}' agents: "
+                    f"{count} > {constraint.max} (max)"
+                )
+        if registry_file and project == team_name:
+            for role, constraint in ROLE_CONSTRAINTS.items():
+                if counts.get(role, 0) < constraint.min:
+                    errors.append(
+                        f"Project '{project}': too few '{role}' agents: "
+                        f"{counts.get(role, 0)} < {constraint.min} (min)"
+                    )
+        agents = project_agents.get(project, 0)
+        if project != "(none)" and agents > MAX_AGENTS_PER_PROJECT:
+            errors.append(
+                f"Project '{project}': {agents} agents after the batch exceed "
+                f"MAX_AGENTS_PER_PROJECT ({MAX_AGENTS_PER_PROJECT})"
+            )
+
+    # Resource headroom for the net change in running agents
+    net_delta = sum(ACTIVE_DELTA[op["op"]] for op in operations)
+    adds_agents = any(op["op"] in ("spawn", "wake") for op in operations)
+    if check_resources and adds_agents:
+        cpu = get_cpu_usage()
+        memory = get_memory_usage()
+        disk = get_disk_usage()
+        processes = get_claude_processes()
+        can_spawn, reasons = can_spawn_agent(cpu, memory, disk, processes)
+        if not can_spawn:
+            errors.extend(reasons)
+        running = int(processes.get("count", 0))
+        if running + net_delta > MAX_CONCURRENT_AGENTS:
+            errors.append(
+                f"Batch would run {running + net_delta} agents, exceeding "
+                f"MAX_CONCURRENT_AGENTS ({MAX_CONCURRENT_AGENTS})"
+            )
+    elif not check_resources:
+        warnings.append("Resource headroom check skipped")
+
+    return {
+        "valid": not errors,
+        "errors": errors,
+        "warnings": warnings,
+        "net_active_delta": net_delta,
+    }
+
+
+def _build_command(op: dict[str, Any]) -> list[str]:
+    """Build the single-agent script invocation for an operation."""
+    cmd = [sys.executable, str(OPERATION_SCRIPTS[op["op"]])]
+    if op["op"] == "spawn":
+        cmd.extend([op["role"], op["session_name"]])
+        if op.get("project"):
+            cmd.extend(["--project", op["project"]])
+        if op.get("plugins"):
+            plugins = op["plugins"]
+            if isinstance(plugins, list):
+                plugins = ",".join(plugins)
+            cmd.extend(["--plugins", plugins])
+        if op.get("agent"):
+            cmd.extend(["--agent", op["agent"]])
+        if op.get("from_pool"):
+            cmd.append("--from-pool")
+    else:
+        cmd.append(op["session_name"])
+        if op["op"] == "terminate" and op.get("force"):
+            cmd.append("--force")
+    return cmd
+
+
+def run_operation(index: int, op: dict[str, Any]) -> dict[str, Any]:
+    """Run one operation and capture its JSON result and duration."""
+    start = time.monotonic()
+    entry: dict[str, Any] = {
+        "index": index,
+        "op": op["op"],
+        "session_name": op["session_name"],
+        "started_at": iso_now(),
+    }
+    try:
+        proc = subprocess.run(
+            _build_command(op),
+            capture_output=True,
+            text=True,
+            timeout=OPERATION_TIMEOUT,
+        )
+        entry["exit_code"] = proc.returncode
+        # Single-agent scripts print their JSON result on stdout or stderr
+        output = proc.stdout.strip() or proc.stderr.strip()
+        try:
+            entry["result"] = json.loads(output)
+        except json.JSONDecodeError:
+            entry["result"] = {"raw_output": output}
+        entry["status"] = "success" if proc.returncode == 0 else "error"
+    except subprocess.TimeoutExpired:
+        entry["exit_code"] = 124
+        entry["status"] = "error"
+        entry["result"] = {"error": f"Operation timed out after {OPERATION_TIMEOUT}s"}
+    entry["duration_seconds"] = round(time.monotonic() - start, 3)
+    if entry["status"] == "error":
+        record_event(
+            "error",
+            op["session_name"],
+            op.get("project"),
+            detail=f"{op['op']} failed (exit {entry['exit_code']})",
+        )
+    return entry
+
+
+def _run_chain(chain: list[tuple[int, dict[str, Any]]]) -> list[dict[str, Any]]:
+    """Run the operations of one session in order, stopping at the first failure."""
+    results: list[dict[str, Any]] = []
+    for position, (index, op) in enumerate(chain):
+        entry = run_operation(index, op)
+        results.append(entry)
+        if entry["status"] != "success":
+            for skipped_index, skipped_op in chain[position + 1 :]:
+                results.append(
+                    {
+                        "index": skipped_index,
+                        "op": skipped_op["op"],
+                        "session_name": skipped_op["session_name"],
+                        "status": "skipped",
+                        "result": {"reason": f"Operation {index} failed"},
+                        "duration_seconds": 0.0,
+                    }
+                )
+            break
+    return results
+
+
+def execute_manifest(
+    operations: list[dict[str, Any]], max_parallel: int
+) -> list[dict[str, Any]]:
+    """Execute validated operations with bounded parallelism.
+
+    Returns:
+        Per-operation results in manifest order
+    """
+    chains: dict[str, list[tuple[int, dict[str, Any]]]] = {}
+    for index, op in enumerate(operations):
+        chains.setdefault(op["session_name"], []).append((index, op))
+
+    results: list[dict[str, Any]] = []
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as pool:
+        for chain_results in pool.map(_run_chain, chains.values()):
+            results.extend(chain_results)
+
+    results.sort(key=lambda r: int(r["index"]))
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Run a batch of agent lifecycle operations in parallel.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    # Stand up a new team from a manifest
+    python ecos_lifecycle_executor.py team-svgbbox.json --max-parallel 4
+
+    # Validate a manifest against the team registry without executing it
+    python ecos_lifecycle_executor.py team-svgbbox.json \\
+        --registry-file .emasoft/team-registry.json --dry-run
+
+    # Read the manifest from stdin
+    cat ops.json | python ecos_lifecycle_executor.py -
+        """,
+    )
+    parser.add_argument("manifest", help="Path to manifest JSON ('-' for stdin)")
+    parser.add_argument(
+        "--max-parallel",
+        type=int,
+        default=None,
+        help=f"Maximum concurrent operations (default: manifest or {DEFAULT_MAX_PARALLEL})",
+    )
+    parser.add_argument(
+        "--registry-file",
+        default=None,
+        help="Team registry whose agents count toward role min/max constraints",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Validate only, do not execute"
+    )
+    parser.add_argument(
+        "--skip-resource-check",
+        action="store_true",
+        help="Do not check resource headroom before executing",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    """Main entry point."""
+    args = parse_args()
+    start = time.monotonic()
+
+    try:
+        manifest = load_manifest(args.manifest)
+    except (OSError, json.JSONDecodeError, ValueError) as e:
+        print(json.dumps({"status": "error", "error": str(e)}, indent=2), file=sys.stderr)
+        return 1
+
+    operations: list[dict[str, Any]] = manifest["operations"]
+    max_parallel = args.max_parallel or manifest.get(
+        "max_parallel", DEFAULT_MAX_PARALLEL
+    )
+
+    try:
+        validation = validate_manifest(
+            operations, args.registry_file, not args.skip_resource_check
+        )
+    except (OSError, json.JSONDecodeError, KeyError) as e:
+        validation = {"valid": False, "errors": [f"Registry error: {e}"], "warnings": []}
+
+    result: dict[str, Any] = {
+        "status": "validated",
+        "timestamp": iso_now(),
+        "validation": validation,
+        "max_parallel": max_parallel,
+        "operations": [],
+    }
+
+    if not validation["valid"]:
+        result["status"] = "invalid"
+    elif not args.dry_run:
+        result["operations"] = execute_manifest(operations, max_parallel)
+        failed = sum(1 for r in result["operations"] if r["status"] != "success")
+        result["succeeded"] = len(result["operations"]) - failed
+        result["failed"] = failed
+        if failed == 0:
+            result["status"] = "success"
+        elif failed < len(result["operations"]):
+            result["status"] = "partial"
+        else:
+            result["status"] = "error"
+
+    result["total_seconds"] = round(time.monotonic() - start, 3)
+    print(json.dumps(result, indent=2))
+    return 0 if result["status"] in ("success", "validated") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -26,6 +26,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+from ecos_state_index import index_content
+
 
 def get_state_file_path(cwd: str | None = None) -> Path:
     """Get the chief-of-staff state file path.
@@ -60,20 +62,8 @@ def parse_projects_from_state(content: str) -> list[dict[str, Any]]:
     """
     projects: list[dict[str, Any]] = []
 
-    # Find projects section
-    pattern = r"## Projects\s*\n(.*?)(?=\n## |\Z)"
-    match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-    if not match:
-        return projects
-
-    projects_section = match.group(1)
-
     # Parse each project entry
-    project_pattern = r"### ([^\n]+)\n(.*?)(?=\n### |\n## |\Z)"
-    for project_match in re.finditer(project_pattern, projects_section, re.DOTALL):
-        project_id = project_match.group(1).strip()
-        body = project_match.group(2)
-
+    for project_id, body in index_content(content).iter_blocks("Projects"):
         project: dict[str, Any] = {
             "id": project_id,
             "repo_url": None,
@@ -127,13 +117,10 @@ def count_agents_per_project(content: str) -> dict[str, int]:
     counts: dict[str, int] = {}
 
     # Find agents section
-    pattern = r"## Agents\s*\n(.*?)(?=\n## |\Z)"
-    match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-    if not match:
+    agents_section = index_content(content).section_body("Agents")
+    if agents_section is None:
         return counts
 
-    agents_section = match.group(1)
-
     # Parse each agent's project
     for line in agents_section.split("\n"):
         if "**Project**:" in line or "**project**:" in line:
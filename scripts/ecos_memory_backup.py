@@ -0,0 +1,292 @@
+"""
+ecos_memory_backup.py - Deduplicated backups of Emasoft Chief of Staff memory files.
+
+Backups live in a content-addressed store under the memory backup
+directory:
+
+    backups/objects/<h[:2]>/<h>.gz   gzip-compressed chunk, named by its sha256
+    backups/snapshots.json           snapshot list: file, time, sha256, chunks
+
+A file is split into content-defined chunks at line boundaries (a line
+whose CRC ends a chunk once the chunk has reached CHUNK_MIN bytes), so an
+edit only changes the chunks around it. A snapshot stores only the chunks
+not already in the store: taking another backup of a memory file that
+grew by a few entries costs those entries, wherever in the file they were
+inserted. A snapshot identical to the file's latest one is not recorded
+again.
+
+Retention keeps the newest keep_last snapshots of each file plus the
+newest snapshot of each of the last keep_daily days and keep_weekly ISO
+weeks; chunks no longer referenced are deleted.
+
+Used by ecos_memory_operations.py (backup_file) and the `backups` /
+`restore` commands of ecos_memory_manager.py.
+
+Dependencies: Python 3.8+ stdlib only
+"""
+
+from __future__ import annotations
+
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import uuid
+import zlib
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+__all__ = [
+    "KEEP_LAST",
+    "KEEP_DAILY",
+    "KEEP_WEEKLY",
+    "chunk_content",
+    "take_snapshot",
+    "list_snapshots",
+    "find_snapshot",
+    "read_snapshot",
+    "write_restored",
+]
+
+STORE_VERSION = 1
+
+# Chunk boundaries: after a line whose CRC has the low CHUNK_BITS bits zero,
+# once the chunk holds CHUNK_MIN bytes; never longer than CHUNK_MAX
+CHUNK_MIN = 8192
+CHUNK_MAX = 65536
+CHUNK_BITS = 5
+
+# Default retention per file
+KEEP_LAST = 10
+KEEP_DAILY = 7
+KEEP_WEEKLY = 4
+
+# Microseconds, so that backups taken within the same second stay ordered
+# and restore --at can pick between them
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+def chunk_content(data: bytes) -> list[bytes]:
+    """
+    Split content into content-defined chunks at line boundaries.
+
+    Args:
+        data: File content
+
+    Returns:
+        Chunks whose concatenation is data
+    """
+    chunks = []
+    start = end = 0
+    mask = (1 << CHUNK_BITS) - 1
+    while end < len(data):
+        newline = data.find(b"\n", end)
+        line_end = len(data) if newline < 0 else newline + 1
+        boundary = zlib.crc32(data[end:line_end]) & mask == 0
+        end = line_end
+        size = end - start
+        if size >= CHUNK_MAX or (size >= CHUNK_MIN and boundary):
+            chunks.append(data[start:end])
+            start = end
+    if start < len(data):
+        chunks.append(data[start:])
+    return chunks
+
+
+def _object_path(backup_dir: Path, digest: str) -> Path:
+    """Store path of a chunk."""
+    return backup_dir / "objects" / digest[:2] / f"{digest}.gz"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write a file via a temporary file and rename."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp_file.write_bytes(data)
+    os.replace(tmp_file, path)
+
+
+@contextmanager
+def _locked(backup_dir: Path) -> Iterator[None]:
+    """Hold the backup store's exclusive lock."""
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    with open(backup_dir / ".lock", "a", encoding="utf-8") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _load(backup_dir: Path) -> list[dict[str, Any]]:
+    """Snapshots in the store, in the order they were taken."""
+    try:
+        store = json.loads((backup_dir / "snapshots.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    if not isinstance(store, dict) or store.get("version") != STORE_VERSION:
+        return []
+    return store.get("snapshots", [])
+
+
+def _save(backup_dir: Path, snapshots: list[dict[str, Any]]) -> None:
+    """Replace the snapshot list."""
+    store = {"version": STORE_VERSION, "snapshots": snapshots}
+    _write_atomic(backup_dir / "snapshots.json", json.dumps(store, indent=1).encode())
+
+
+def _day(ts: str) -> str:
+    """Retention bucket: calendar day of a snapshot time."""
+    return ts[:10]
+
+
+def _week(ts: str) -> tuple[int, int]:
+    """Retention bucket: ISO (year, week) of a snapshot time."""
+    year, week, _ = datetime.strptime(ts[:10], "%Y-%m-%d").isocalendar()
+    return year, week
+
+
+def _retained(
+    snapshots: list[dict[str, Any]], keep_last: int, keep_daily: int, keep_weekly: int
+) -> list[dict[str, Any]]:
+    """Snapshots kept by the retention policy (applied per file)."""
+    keep: set[int] = set()
+    by_file: dict[str, list[int]] = {}
+    for position, snapshot in enumerate(snapshots):
+        by_file.setdefault(snapshot["file"], []).append(position)
+    for positions in by_file.values():
+        newest_first = positions[::-1]
+        keep.update(newest_first[:keep_last])
+        for limit, bucket in ((keep_daily, _day), (keep_weekly, _week)):
+            seen: list[Any] = []
+            # Newest snapshot of each of the newest `limit` buckets
+            for position in newest_first:
+                key = bucket(snapshots[position]["ts"])
+                if key in seen:
+                    continue
+                if len(seen) == limit:
+                    break
+                seen.append(key)
+                keep.add(position)
+    return [s for position, s in enumerate(snapshots) if position in keep]
+
+
+def _collect_garbage(backup_dir: Path, snapshots: list[dict[str, Any]]) -> int:
+    """Delete chunks no snapshot references; returns how many."""
+    referenced = {digest for snapshot in snapshots for digest in snapshot["chunks"]}
+    removed = 0
+    for path in (backup_dir / "objects").glob("*/*.gz"):
+        if path.name[: -len(".gz")] not in referenced:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def take_snapshot(
+    backup_dir: Path,
+    name: str,
+    data: bytes,
+    keep_last: int = KEEP_LAST,
+    keep_daily: int = KEEP_DAILY,
+    keep_weekly: int = KEEP_WEEKLY,
+) -> dict[str, Any]:
+    """
+    Record a snapshot of a file's content, then apply retention.
+
+    Args:
+        backup_dir: Backup store directory
+        name: File name the snapshot belongs to
+        data: File content
+        keep_last: Newest snapshots kept per file
+        keep_daily: Days for which the newest snapshot is kept
+        keep_weekly: ISO weeks for which the newest snapshot is kept
+
+    Returns:
+        The snapshot record (the file's latest one if content is unchanged),
+        with "new_bytes": compressed bytes added to the store
+
+    Raises:
+        OSError: If the store cannot be written
+    """
+    sha256 = hashlib.sha256(data).hexdigest()
+    with _locked(backup_dir):
+        snapshots = _load(backup_dir)
+        latest = next((s for s in reversed(snapshots) if s["file"] == name), None)
+        if latest is not None and latest["sha256"] == sha256:
+            return {**latest, "new_bytes": 0}
+
+        chunks = []
+        new_bytes = 0
+        for chunk in chunk_content(data):
+            digest = hashlib.sha256(chunk).hexdigest()
+            path = _object_path(backup_dir, digest)
+            if not path.exists():
+                compressed = gzip.compress(chunk)
+                _write_atomic(path, compressed)
+                new_bytes += len(compressed)
+            chunks.append(digest)
+        snapshot = {
+            "file": name,
+            "ts": datetime.now().strftime(TIMESTAMP_FORMAT),
+            "sha256": sha256,
+            "size": len(data),
+            "chunks": chunks,
+        }
+        snapshots.append(snapshot)
+        snapshots = _retained(snapshots, keep_last, keep_daily, keep_weekly)
+        _save(backup_dir, snapshots)
+        _collect_garbage(backup_dir, snapshots)
+    return {**snapshot, "new_bytes": new_bytes}
+
+
+def list_snapshots(backup_dir: Path, name: str | None = None) -> list[dict[str, Any]]:
+    """
+    Snapshots in the store, newest first.
+
+    Args:
+        backup_dir: Backup store directory
+        name: Only snapshots of this file
+    """
+    return [
+        s for s in reversed(_load(backup_dir)) if name is None or s["file"] == name
+    ]
+
+
+def find_snapshot(backup_dir: Path, name: str, at: datetime) -> dict[str, Any] | None:
+    """
+    Latest snapshot of a file taken at or before a time (None if none).
+
+    Snapshot times compare as strings; times recorded without
+    microseconds (older stores) sort as the start of their second.
+    """
+    cutoff = at.strftime(TIMESTAMP_FORMAT)
+    for snapshot in list_snapshots(backup_dir, name):
+        if snapshot["ts"] <= cutoff:
+            return snapshot
+    return None
+
+
+def read_snapshot(backup_dir: Path, snapshot: dict[str, Any]) -> bytes:
+    """
+    Reassemble a snapshot's content.
+
+    Raises:
+        OSError: If a chunk is missing or unreadable
+        ValueError: If the content does not match the snapshot's sha256
+    """
+    data = b"".join(
+        gzip.decompress(_object_path(backup_dir, digest).read_bytes())
+        for digest in snapshot["chunks"]
+    )
+    if hashlib.sha256(data).hexdigest() != snapshot["sha256"]:
+        raise ValueError(f"Backup of {snapshot['file']} at {snapshot['ts']} is corrupt")
+    return data
+
+
+def write_restored(target: Path, data: bytes) -> None:
+    """Atomically replace a file with content read by read_snapshot."""
+    _write_atomic(target, data)
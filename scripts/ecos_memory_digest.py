@@ -0,0 +1,331 @@
+"""
+ecos_memory_digest.py - Resume digest of Emasoft Chief of Staff memory files.
+
+The resume digest (<memory_root>/.resume-digest.json) is a small cached
+summary of activeContext.md and progress.md for session start: current
+focus, the latest decisions, open in-flight errors and recent progress.
+
+It is kept current incrementally. For each source the digest records the
+markdown file's size/mtime/inode and how far into the file's journal
+(ecos_memory_journal.py) it has read:
+
+- memory writers append a journal record, then fold the journal tail
+  into the digest, which costs O(record)
+- when a markdown file has been rewritten (materialisation, compaction,
+  manual edits), only that source's part is rebuilt, from the head of the
+  markdown plus its journal
+
+Loading an up-to-date digest costs a few stat calls and one small read,
+however large the memory files are.
+
+Used by ecos_memory_operations.py, ecos_memory_manager.py (`digest`) and
+ecos_session_start.py.
+
+Dependencies: Python 3.8+ stdlib only
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+
+from ecos_memory_index import parse_active_context, parse_progress
+from ecos_memory_journal import MARKER_PATTERN, journal_path
+
+if TYPE_CHECKING:
+    from ecos_memory_manager import MemoryConfig
+
+__all__ = [
+    "DIGEST_VERSION",
+    "DIGEST_DECISIONS",
+    "DIGEST_ERRORS",
+    "DIGEST_PROGRESS",
+    "refresh_digest",
+]
+
+DIGEST_VERSION = 1
+
+# Entries kept in the digest, newest first
+DIGEST_DECISIONS = 5
+DIGEST_ERRORS = 10
+DIGEST_PROGRESS = 10
+
+
+def _empty_digest() -> dict[str, Any]:
+    """Digest with no sources read yet."""
+    return {
+        "version": DIGEST_VERSION,
+        "generated": "",
+        "sources": {},
+        "focus": None,
+        "decisions": [],
+        "errors": [],
+        "error_count": 0,
+        "progress": [],
+    }
+
+
+def _stamp(path: Path) -> list[int] | None:
+    """Size, mtime and inode of a file (None if missing)."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+
+def _prepend(items: list[Any], item: Any, limit: int) -> list[Any]:
+    """Put item first, keeping at most limit items."""
+    return [item] + items[: limit - 1]
+
+
+def _fold(digest: dict[str, Any], record: dict[str, Any]) -> None:
+    """Apply one journal record to the digest (mirrors the markdown appliers)."""
+    op, ts = record.get("op"), record.get("ts", "")
+    if op == "focus":
+        digest["focus"] = {"text": record.get("text", ""), "updated": ts}
+    elif op == "decision":
+        decision = {
+            "timestamp": ts,
+            "category": record.get("category", ""),
+            "text": record.get("text", ""),
+        }
+        digest["decisions"] = _prepend(digest["decisions"], decision, DIGEST_DECISIONS)
+    elif op == "error":
+        error = {"timestamp": ts}
+        error.update(
+            (key, record.get(key, "")) for key in ("step", "agent", "error", "impact")
+        )
+        digest["errors"] = _prepend(digest["errors"], error, DIGEST_ERRORS)
+        digest["error_count"] += 1
+    elif op == "clear_errors":
+        digest["errors"] = []
+        digest["error_count"] = 0
+    elif op == "progress":
+        progress = {
+            "timestamp": ts,
+            "category": record.get("category", ""),
+            "workflow": record.get("workflow", ""),
+            "text": record.get("text", ""),
+        }
+        digest["progress"] = _prepend(digest["progress"], progress, DIGEST_PROGRESS)
+
+
+def _read_active_context(digest: dict[str, Any], path: Path) -> str | None:
+    """
+    Reset the activeContext.md part of the digest from the markdown.
+
+    Returns:
+        ID of the last journal record already applied to the markdown
+    """
+    try:
+        text = path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        text = ""
+    marker = MARKER_PATTERN.search(text)
+    digest.update(focus=None, decisions=[], errors=[], error_count=0)
+    for entry in parse_active_context(MARKER_PATTERN.sub("\n", text)):
+        if entry["kind"] == "focus":
+            digest["focus"] = {"text": entry["body"], "updated": entry["timestamp"]}
+        elif entry["kind"] == "decision":
+            if len(digest["decisions"]) < DIGEST_DECISIONS:
+                digest["decisions"].append(
+                    {
+                        "timestamp": entry["timestamp"],
+                        "category": entry["category"],
+                        "text": entry["body"],
+                    }
+                )
+        elif entry["kind"] == "error":
+            digest["error_count"] += 1
+            if len(digest["errors"]) < DIGEST_ERRORS:
+                error = {"timestamp": entry["timestamp"]}
+                for line in entry["body"].splitlines():
+                    key, _, value = line.partition(": ")
+                    if key in ("step", "agent", "error", "impact"):
+                        error[key] = value
+                digest["errors"].append(error)
+    return marker.group(1) if marker else None
+
+
+def _read_progress(digest: dict[str, Any], path: Path) -> str | None:
+    """
+    Reset the progress.md part of the digest from the head of the markdown.
+
+    Only the first DIGEST_PROGRESS entries are read; the file is newest
+    first.
+
+    Returns:
+        ID of the last journal record already applied to the markdown
+    """
+    lines: list[str] = []
+    entries = 0
+    marker = None
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                lines.append(line)
+                if line.startswith("- ["):
+                    entries += 1
+                    if entries == DIGEST_PROGRESS:
+                        break
+                elif line.startswith("<!-- ecos-journal:"):
+                    marker = MARKER_PATTERN.search("\n" + line)
+    except (OSError, UnicodeDecodeError):
+        lines = []
+    digest["progress"] = [
+        {
+            "timestamp": entry["timestamp"],
+            "category": entry["category"],
+            "workflow": entry["workflow"],
+            "text": entry["body"],
+        }
+        for entry in parse_progress("".join(lines))
+    ]
+    if marker is None and entries == DIGEST_PROGRESS:
+        # Stopped early: the marker, if any, is in the file's last bytes
+        try:
+            with open(path, "rb") as f:
+                f.seek(max(0, path.stat().st_size - 128))
+                tail = f.read().decode("utf-8", "replace")
+            marker = MARKER_PATTERN.search(tail)
+        except OSError:
+            pass
+    return marker.group(1) if marker else None
+
+
+def _journal_intact(state: dict[str, Any], journal: Path) -> bool:
+    """Whether the journal still holds what the digest read of it."""
+    try:
+        size = journal.stat().st_size
+    except OSError:
+        size = 0
+    if size < state["offset"]:
+        return False
+    if not state["last_id"]:
+        return state["offset"] == 0
+    try:
+        with open(journal, "rb") as f:
+            f.seek(state["last_at"])
+            record = json.loads(f.readline())
+    except (OSError, ValueError):
+        return False
+    return isinstance(record, dict) and record.get("id") == state["last_id"]
+
+
+def _fold_journal(
+    digest: dict[str, Any],
+    state: dict[str, Any],
+    journal: Path,
+    applied_id: str | None = None,
+) -> None:
+    """
+    Fold the complete journal records past state's offset into the digest.
+
+    Args:
+        digest: Digest to update
+        state: The source's digest state (offset, last record)
+        journal: Journal file
+        applied_id: Skip records up to this one (already in the markdown)
+    """
+    try:
+        with open(journal, "rb") as f:
+            f.seek(state["offset"])
+            data = f.read()
+    except OSError:
+        return
+    records: list[dict[str, Any]] = []
+    position = state["offset"]
+    # A line without its newline is still being written: leave it for later
+    for raw in data.split(b"\n")[:-1]:
+        start, position = position, position + len(raw) + 1
+        try:
+            record = json.loads(raw)
+        except ValueError:
+            continue
+        if isinstance(record, dict) and "id" in record and "op" in record:
+            records.append(record)
+            state["last_id"], state["last_at"] = record["id"], start
+    state["offset"] = position
+    ids = [record["id"] for record in records]
+    if applied_id in ids:
+        records = records[ids.index(applied_id) + 1 :]
+    for record in records:
+        _fold(digest, record)
+
+
+@contextmanager
+def _locked(config: MemoryConfig) -> Iterator[None]:
+    """Hold the digest's exclusive lock."""
+    config.memory_root.mkdir(parents=True, exist_ok=True)
+    with open(config.digest_path.with_suffix(".lock"), "a", encoding="utf-8") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def refresh_digest(config: MemoryConfig) -> dict[str, Any]:
+    """
+    Load the resume digest, bringing it up to date with its sources.
+
+    Sources whose markdown is unchanged only have their journal tail
+    folded in; rewritten sources are rebuilt. The digest is saved only
+    when something changed.
+
+    Args:
+        config: Memory configuration
+
+    Returns:
+        The digest: {"focus", "decisions", "errors", "error_count",
+        "progress", "generated", "sources", "version"}
+
+    Raises:
+        OSError: If the digest cannot be saved
+    """
+    sources: list[tuple[Path, Callable[[dict[str, Any], Path], str | None]]] = [
+        (config.active_context_path, _read_active_context),
+        (config.progress_path, _read_progress),
+    ]
+    with _locked(config):
+        try:
+            digest = json.loads(config.digest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            digest = None
+        if not isinstance(digest, dict) or digest.get("version") != DIGEST_VERSION:
+            digest = _empty_digest()
+
+        changed = False
+        for markdown, rebuild in sources:
+            journal = journal_path(markdown, config.journal_path)
+            stamp = _stamp(markdown)
+            state = digest["sources"].get(markdown.name)
+            if (
+                state is None
+                or state["markdown"] != stamp
+                or not _journal_intact(state, journal)
+            ):
+                state = {"markdown": stamp, "offset": 0, "last_id": None, "last_at": 0}
+                _fold_journal(digest, state, journal, rebuild(digest, markdown))
+                digest["sources"][markdown.name] = state
+                changed = True
+            elif (_stamp(journal) or [0])[0] != state["offset"]:
+                _fold_journal(digest, state, journal)
+                changed = True
+
+        if changed:
+            digest["generated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            tmp_file = config.digest_path.with_name(
+                f".{config.digest_path.name}.{uuid.uuid4().hex}.tmp"
+            )
+            tmp_file.write_text(json.dumps(digest, indent=2), encoding="utf-8")
+            os.replace(tmp_file, config.digest_path)
+    return digest
@@ -0,0 +1,440 @@
+"""
+ecos_memory_index.py - Full-text index over Emasoft Chief of Staff memory files.
+
+Parses activeContext.md, progress.md and patterns.md into typed entries
+(focus, decision, error, progress, pattern) and keeps them in a SQLite
+database next to the memory files. Entries are searched with FTS5 and
+ranked with bm25; builds without FTS5 fall back to substring matching,
+newest first.
+
+The index is refreshed incrementally: each source file's size and
+modification time are recorded, and only files that changed since the
+last refresh are re-parsed. Gzip archive segments written by compaction
+(archive/<kind>-YYYY-MM.md.gz) are indexed like the hot files, so
+archived entries stay searchable.
+
+Used by ecos_memory_operations.py and the `search` / `reindex` commands
+of ecos_memory_manager.py. Pending journal entries (ecos_memory_journal.py)
+are not visible until the markdown is materialised; callers materialise
+first.
+
+Dependencies: Python 3.8+ stdlib only
+"""
+
+from __future__ import annotations
+
+import gzip
+import re
+import sqlite3
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+
+from ecos_memory_journal import MARKER_PATTERN
+
+if TYPE_CHECKING:
+    from ecos_memory_manager import MemoryConfig
+
+__all__ = [
+    "ENTRY_KINDS",
+    "ARCHIVE_PARSERS",
+    "parse_active_context",
+    "parse_progress",
+    "parse_patterns",
+    "open_index",
+    "refresh_index",
+    "search_memory",
+]
+
+ENTRY_KINDS = ("focus", "decision", "error", "progress", "pattern")
+
+# Columns of an indexed entry, in table order
+ENTRY_COLUMNS = (
+    "title",
+    "body",
+    "kind",
+    "category",
+    "workflow",
+    "date",
+    "timestamp",
+    "source",
+)
+
+DATE_HEADER = re.compile(r"## (\d{4}-\d{2}-\d{2})\s*$")
+# "- [2026-01-05 10:00] [workflow] **Category**: text" (workflow optional)
+TAGGED_LINE = re.compile(r"- \[([^\]]+)\] (?:\[([^\]]+)\] )?\*\*([^*]+)\*\*: (.*)")
+FIELD_LINE = re.compile(r"- \*\*(\w+)\*\*: (.*)")
+META_LINE = re.compile(r"\*\*(\w+)\*\*: (.*)")
+SEARCH_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _entry(kind: str, source: str, **values: str) -> dict[str, str]:
+    """Build an entry with every column present."""
+    entry = {column: "" for column in ENTRY_COLUMNS}
+    entry.update(values, kind=kind, source=source)
+    if not entry["date"] and re.match(r"\d{4}-\d{2}-\d{2}", entry["timestamp"]):
+        entry["date"] = entry["timestamp"][:10]
+    return entry
+
+
+def parse_progress(text: str, source: str = "progress.md") -> list[dict[str, str]]:
+    """Parse progress.md date sections into progress entries."""
+    entries = []
+    date = ""
+    for line in text.splitlines():
+        header = DATE_HEADER.match(line)
+        if header:
+            date = header.group(1)
+            continue
+        match = TAGGED_LINE.match(line)
+        if match:
+            timestamp, workflow, category, body = match.groups()
+            entries.append(
+                _entry(
+                    "progress",
+                    source,
+                    title=category,
+                    body=body,
+                    category=category,
+                    workflow=workflow or "",
+                    date=date,
+                    timestamp=timestamp,
+                )
+            )
+        elif line.startswith("- [") and "] " in line:
+            timestamp, _, body = line[3:].partition("] ")
+            entries.append(
+                _entry("progress", source, body=body, date=date, timestamp=timestamp)
+            )
+    return entries
+
+
+def parse_active_context(
+    text: str, source: str = "activeContext.md"
+) -> list[dict[str, str]]:
+    """Parse activeContext.md into focus, decision and error entries."""
+    entries: list[dict[str, str]] = []
+    section = ""
+    focus: list[str] = []
+    focus_updated = ""
+    error: dict[str, str] | None = None
+
+    def close_error() -> None:
+        nonlocal error
+        if error is not None:
+            entries.append(
+                _entry(
+                    "error",
+                    source,
+                    title=error.get("step", ""),
+                    body="\n".join(
+                        f"{k}: {v}" for k, v in error.items() if k != "timestamp"
+                    ),
+                    category=error.get("impact", ""),
+                    workflow=error.get("agent", ""),
+                    timestamp=error["timestamp"],
+                )
+            )
+            error = None
+
+    for line in text.splitlines():
+        if line.startswith("## "):
+            close_error()
+            section = line[3:].strip()
+            continue
+        if section == "Current Focus":
+            meta = META_LINE.match(line)
+            if meta and meta.group(1) == "Updated":
+                focus_updated = meta.group(2).strip()
+            elif line.strip():
+                focus.append(line.strip())
+        elif section == "Active Decisions":
+            match = TAGGED_LINE.match(line)
+            if match:
+                timestamp, _, category, body = match.groups()
+                entries.append(
+                    _entry(
+                        "decision",
+                        source,
+                        title=category,
+                        body=body,
+                        category=category,
+                        timestamp=timestamp,
+                    )
+                )
+        elif section == "In-Flight Errors":
+            if line.startswith("### In-Flight Error:"):
+                close_error()
+                error = {"timestamp": line.split(":", 1)[1].strip()}
+            elif error is not None:
+                match = FIELD_LINE.match(line)
+                if match:
+                    error[match.group(1).lower()] = match.group(2)
+    close_error()
+
+    if focus:
+        entries.append(
+            _entry(
+                "focus",
+                source,
+                title="Current Focus",
+                body="\n".join(focus),
+                timestamp=focus_updated,
+            )
+        )
+    return entries
+
+
+def parse_patterns(text: str, source: str = "patterns.md") -> list[dict[str, str]]:
+    """Parse patterns.md "### Name" blocks into pattern entries."""
+    entries = []
+    section = ""
+    pattern: dict[str, Any] | None = None
+
+    def close_pattern() -> None:
+        nonlocal pattern
+        if pattern is not None:
+            entries.append(
+                _entry(
+                    "pattern",
+                    source,
+                    title=pattern["name"],
+                    body="\n".join(pattern["lines"]).strip(),
+                    category=pattern.get("category") or section,
+                    timestamp=pattern.get("discovered", ""),
+                )
+            )
+            pattern = None
+
+    for line in text.splitlines():
+        if line.startswith("### "):
+            close_pattern()
+            pattern = {"name": line[4:].strip(), "lines": []}
+        elif line.startswith("## ") or line.startswith("# "):
+            close_pattern()
+            section = line.lstrip("#").strip()
+        elif pattern is not None:
+            meta = META_LINE.match(line)
+            if meta and meta.group(1) in ("Category", "Discovered"):
+                pattern[meta.group(1).lower()] = meta.group(2).strip()
+            else:
+                pattern["lines"].append(line)
+    close_pattern()
+    return entries
+
+
+# Parser of each archive segment kind (archive/<kind>-YYYY-MM.md.gz)
+ARCHIVE_PARSERS: dict[str, Callable[..., list]] = {
+    "progress": parse_progress,
+    "decisions": parse_active_context,
+    "errors": parse_active_context,
+}
+
+
+def _sources(config: MemoryConfig) -> list[tuple[Path, Callable[..., list]]]:
+    """Files indexed for a memory root, with their parsers."""
+    sources = [
+        (config.active_context_path, parse_active_context),
+        (config.progress_path, parse_progress),
+        (config.patterns_path, parse_patterns),
+    ]
+    for segment in sorted(config.archive_path.glob("*.md.gz")):
+        parser = ARCHIVE_PARSERS.get(segment.name.rsplit("-", 2)[0])
+        if parser is not None:
+            sources.append((segment, parser))
+    return sources
+
+
+def _read_source(path: Path) -> str:
+    """Text of a memory file or gzip archive segment."""
+    if path.suffix == ".gz":
+        return gzip.decompress(path.read_bytes()).decode("utf-8")
+    return path.read_text(encoding="utf-8")
+
+
+def _has_fts5(conn: sqlite3.Connection) -> bool:
+    """Whether this SQLite build provides FTS5."""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def open_index(config: MemoryConfig) -> sqlite3.Connection:
+    """
+    Open (creating if needed) the memory index database.
+
+    Args:
+        config: Memory configuration
+
+    Returns:
+        Connection with row access by column name
+    """
+    config.index_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(config.index_path), timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS files ("
+        "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER)"
+    )
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'entries'"
+    ).fetchone()
+    if not exists:
+        if _has_fts5(conn):
+            unindexed = ", ".join(f"{c} UNINDEXED" for c in ENTRY_COLUMNS[2:])
+            conn.execute(
+                "CREATE VIRTUAL TABLE entries USING fts5("
+                f"title, body, {unindexed}, tokenize='porter unicode61')"
+            )
+            fts = "1"
+        else:
+            conn.execute(f"CREATE TABLE entries ({', '.join(ENTRY_COLUMNS)})")
+            fts = "0"
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('fts5', ?)", (fts,))
+        conn.commit()
+    return conn
+
+
+def _uses_fts(conn: sqlite3.Connection) -> bool:
+    """Whether the entries table of an open index is an FTS5 table."""
+    row = conn.execute("SELECT value FROM meta WHERE key = 'fts5'").fetchone()
+    return row is not None and row["value"] == "1"
+
+
+def refresh_index(
+    config: MemoryConfig,
+    force: bool = False,
+    conn: sqlite3.Connection | None = None,
+) -> dict[str, Any]:
+    """
+    Re-parse memory files that changed since the last refresh.
+
+    Args:
+        config: Memory configuration
+        force: Re-parse every file regardless of size/mtime
+        conn: Open index (default: open and close one)
+
+    Returns:
+        {"reindexed": [file names], "unchanged": n, "removed": [file names]}
+    """
+    own = conn is None
+    conn = conn or open_index(config)
+    result: dict[str, Any] = {"reindexed": [], "unchanged": 0, "removed": []}
+    try:
+        known = {
+            row["path"]: (row["size"], row["mtime_ns"])
+            for row in conn.execute("SELECT path, size, mtime_ns FROM files")
+        }
+        seen = set()
+        for path, parser in _sources(config):
+            key = path.relative_to(config.memory_root).as_posix()
+            seen.add(key)
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if not force and known.get(key) == (stat.st_size, stat.st_mtime_ns):
+                result["unchanged"] += 1
+                continue
+            try:
+                text = _read_source(path)
+            except (OSError, EOFError, UnicodeDecodeError):
+                continue
+            entries = parser(MARKER_PATTERN.sub("\n", text), key)
+            with conn:
+                conn.execute("DELETE FROM entries WHERE source = ?", (key,))
+                conn.executemany(
+                    f"INSERT INTO entries ({', '.join(ENTRY_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' for _ in ENTRY_COLUMNS)})",
+                    [tuple(e[c] for c in ENTRY_COLUMNS) for e in entries],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?)",
+                    (key, stat.st_size, stat.st_mtime_ns),
+                )
+            result["reindexed"].append(key)
+        # Drop entries of files that are gone or no longer indexed
+        present = {k for k in seen if (config.memory_root / k).exists()}
+        for key in sorted(set(known) - present):
+            with conn:
+                conn.execute("DELETE FROM entries WHERE source = ?", (key,))
+                conn.execute("DELETE FROM files WHERE path = ?", (key,))
+            result["removed"].append(key)
+    finally:
+        if own:
+            conn.close()
+    return result
+
+
+def search_memory(
+    config: MemoryConfig,
+    query: str = "",
+    kind: str | None = None,
+    category: str | None = None,
+    workflow: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    limit: int | None = 20,
+) -> list[dict[str, Any]]:
+    """
+    Search indexed memory entries, refreshing changed files first.
+
+    Words in `query` must all match (prefix match, case-insensitive);
+    results are ranked by bm25, or newest first for an empty query.
+
+    Args:
+        config: Memory configuration
+        query: Free-text query
+        kind: Only this entry kind (see ENTRY_KINDS)
+        category: Only this category (case-insensitive)
+        workflow: Only this workflow (agent for errors)
+        since: Only entries dated on or after YYYY-MM-DD
+        until: Only entries dated on or before YYYY-MM-DD
+        limit: Maximum results (None for all)
+
+    Returns:
+        Entries with their columns plus "score" (lower is better)
+    """
+    conn = open_index(config)
+    try:
+        refresh_index(config, conn=conn)
+        fts = _uses_fts(conn)
+        clauses: list[str] = []
+        params: list[Any] = []
+        tokens = SEARCH_TOKEN.findall(query)
+        if tokens and fts:
+            clauses.append("entries MATCH ?")
+            params.append(" ".join(f'"{t}"*' for t in tokens))
+        for token in tokens if not fts else []:
+            clauses.append("(title LIKE ? OR body LIKE ?)")
+            params.extend([f"%{token}%"] * 2)
+        if kind:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if category:
+            clauses.append("lower(category) = lower(?)")
+            params.append(category)
+        if workflow:
+            clauses.append("workflow = ?")
+            params.append(workflow)
+        if since:
+            clauses.append("date >= ?")
+            params.append(since)
+        if until:
+            clauses.append("date <= ?")
+            params.append(until)
+
+        score = "bm25(entries)" if tokens and fts else "0.0"
+        sql = f"SELECT {', '.join(ENTRY_COLUMNS)}, {score} AS score FROM entries"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY score, timestamp DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
@@ -0,0 +1,203 @@
+"""
+ecos_memory_journal.py - Append-only journals for Emasoft Chief of Staff memory files.
+
+Memory writers append one JSON record per entry to a journal next to the
+markdown file (journal/<file>.jsonl) instead of rewriting the markdown:
+an append is a single locked, fsync'd write, so it costs O(1) and a crash
+can lose at most the entry being written.
+
+The markdown is materialised lazily: readers (and `compact`) replay the
+pending records into it with an applier function, write it atomically,
+then truncate the journal. The markdown ends with a marker comment
+naming the last applied record, so if a crash hits between the rewrite
+and the truncation, the records already applied are skipped on replay.
+The markdown is fsync'd before the journal is truncated, and a record the
+applier cannot apply is moved to journal/<file>.rejected.jsonl rather than
+failing every read.
+
+Used by ecos_memory_operations.py.
+
+Dependencies: Python 3.8+ stdlib only
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import re
+import sys
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable
+
+__all__ = [
+    "MARKER_PATTERN",
+    "journal_path",
+    "journal_lock",
+    "append_record",
+    "pending_records",
+    "materialize",
+]
+
+# Trailer naming the last journal record applied to a markdown file
+MARKER_PATTERN = re.compile(r"\n*<!-- ecos-journal: (\w+) -->\n*\Z")
+
+
+def journal_path(markdown_path: Path, journal_dir: Path) -> Path:
+    """Journal file for a markdown memory file."""
+    return journal_dir / f"{markdown_path.stem}.jsonl"
+
+
+@contextmanager
+def journal_lock(journal: Path) -> Iterator[None]:
+    """Hold the journal's exclusive lock (also guards its markdown file)."""
+    journal.parent.mkdir(parents=True, exist_ok=True)
+    with open(journal.with_suffix(".lock"), "a", encoding="utf-8") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def append_record(journal: Path, op: str, timestamp: str, **fields: Any) -> str:
+    """
+    Append one record to a journal.
+
+    Args:
+        journal: Journal file
+        op: Operation name understood by the file's applier
+        timestamp: Entry timestamp ("YYYY-MM-DD HH:MM")
+        **fields: Operation fields
+
+    Returns:
+        The record ID
+
+    Raises:
+        OSError: If the journal cannot be written
+    """
+    record = {"id": uuid.uuid4().hex, "op": op, "ts": timestamp, **fields}
+    line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+    with journal_lock(journal):
+        fd = os.open(journal, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            size = os.fstat(fd).st_size
+            # Terminate a line torn by an earlier crash so it cannot swallow ours
+            if size and os.pread(fd, 1, size - 1) != b"\n":
+                line = b"\n" + line
+            os.write(fd, line)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    return record["id"]
+
+
+def pending_records(journal: Path) -> list[dict[str, Any]]:
+    """Complete, parseable records currently in a journal (oldest first)."""
+    try:
+        data = journal.read_bytes()
+    except OSError:
+        return []
+    records = []
+    # A line without its newline is a write cut short by a crash: skip it
+    for raw in data.split(b"\n")[:-1]:
+        try:
+            record = json.loads(raw)
+        except ValueError:
+            continue
+        if isinstance(record, dict) and "id" in record and "op" in record:
+            records.append(record)
+    return records
+
+
+def _quarantine(journal: Path, record: dict[str, Any], error: Exception) -> None:
+    """Move a record that cannot be applied to the journal's .rejected file."""
+    rejected = journal.with_suffix(".rejected.jsonl")
+    with open(rejected, "a", encoding="utf-8") as f:
+        f.write(json.dumps({**record, "rejected": str(error)}) + "\n")
+    print(
+        f"WARNING: Journal record {record['id']} ({record['op']}) could not be "
+        f"applied to {journal.stem}; moved to {rejected.name}: {error}",
+        file=sys.stderr,
+    )
+
+
+def _replace_durably(path: Path, content: str) -> None:
+    """Atomically replace a file and fsync it and its directory."""
+    tmp_file = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+    dir_fd = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def materialize(
+    markdown_path: Path,
+    journal: Path,
+    apply: Callable[[str, dict[str, Any]], str],
+) -> int:
+    """
+    Replay pending journal records into their markdown file.
+
+    A record the applier rejects (raises on) is moved to the journal's
+    .rejected.jsonl file instead of blocking every later replay. If the
+    markdown exists but cannot be read, nothing is changed.
+
+    Args:
+        markdown_path: Markdown memory file
+        journal: Its journal
+        apply: Function (content, record) -> new content
+
+    Returns:
+        Number of records applied
+    """
+    try:
+        if journal.stat().st_size == 0:
+            return 0
+    except OSError:
+        return 0
+
+    with journal_lock(journal):
+        records = pending_records(journal)
+        try:
+            content = markdown_path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            content = ""
+        except (OSError, UnicodeDecodeError) as e:
+            # Rewriting it from the journal alone would drop every entry
+            print(
+                f"WARNING: Cannot read {markdown_path}, journal not applied: {e}",
+                file=sys.stderr,
+            )
+            return 0
+        marker = MARKER_PATTERN.search(content)
+        if marker:
+            content = content[: marker.start()] + "\n"
+            applied = [r["id"] for r in records]
+            if marker.group(1) in applied:
+                records = records[applied.index(marker.group(1)) + 1 :]
+        applied_count = 0
+        for record in records:
+            try:
+                content = apply(content, record)
+            except (KeyError, TypeError, ValueError, re.error) as e:
+                _quarantine(journal, record, e)
+                continue
+            applied_count += 1
+        if records:
+            trailer = f"<!-- ecos-journal: {records[-1]['id']} -->"
+            content = content.rstrip("\n") + f"\n\n{trailer}\n"
+            # Durable before the journal is emptied: a crash keeps one or the other
+            _replace_durably(markdown_path, content)
+        with open(journal, "w", encoding="utf-8"):
+            pass
+    return applied_count
@@ -3,6 +3,15 @@
 ecos_memory_manager.py - Automated Memory File Management for Emasoft Chief of Staff.
 
 Automates updates to Emasoft Chief of Staff memory files (activeContext.md, progress.md, patterns.md).
+
+Compaction moves old progress sections, decisions and in-flight errors into
+monthly gzip segments under archive/, which stay searchable through the
+memory index. It runs automatically before read commands (not the health
+and validate diagnostics) whenever the health thresholds are exceeded,
+keeping the hot files small; `compact --if-needed` runs the same check.
+
+Writers also keep the resume digest (ecos_memory_digest.py) current for
+session start.
 Dependencies: Python 3.8+ stdlib only
 """
 
@@ -16,10 +25,20 @@ from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from ecos_memory_backup import (
+    find_snapshot,
+    list_snapshots,
+    read_snapshot,
+    write_restored,
+)
+from ecos_memory_digest import refresh_digest
+from ecos_memory_index import ENTRY_KINDS, refresh_index, search_memory
+from ecos_memory_journal import MARKER_PATTERN, journal_lock, journal_path
 from ecos_memory_operations import (
     add_decision,
     add_pattern,
     add_progress,
+    archive_entries,
     backup_file,
     clear_errors,
     ensure_memory_root,
@@ -27,9 +46,11 @@ from ecos_memory_operations import (
     get_recent_errors,
     get_timestamp,
     log_error,
+    materialize_memory,
     read_file_safely,
     search_patterns,
     set_focus,
+    update_digest,
     write_file_safely,
 )
 
@@ -43,8 +64,20 @@ class MemoryConfig:
     progress_file: str = "progress.md"
     patterns_file: str = "patterns.md"
     backup_dir: str = "backups"
+    backup_keep_last: int = 10
+    backup_keep_daily: int = 7
+    backup_keep_weekly: int = 4
+    index_file: str = ".memory-index.sqlite"
+    journal_dir: str = "journal"
+    archive_dir: str = "archive"
+    digest_file: str = ".resume-digest.json"
     max_entries_before_compact: int = 200
     keep_entries_on_compact: int = 100
+    max_errors_before_compact: int = 20
+    keep_errors_on_compact: int = 10
+    keep_decisions_on_compact: int = 50
+    max_active_context_kb: int = 50
+    max_progress_kb: int = 100
 
     @property
     def active_context_path(self) -> Path:
@@ -62,6 +95,22 @@ class MemoryConfig:
     def backup_path(self) -> Path:
         return self.memory_root / self.backup_dir
 
+    @property
+    def index_path(self) -> Path:
+        return self.memory_root / self.index_file
+
+    @property
+    def journal_path(self) -> Path:
+        return self.memory_root / self.journal_dir
+
+    @property
+    def archive_path(self) -> Path:
+        return self.memory_root / self.archive_dir
+
+    @property
+    def digest_path(self) -> Path:
+        return self.memory_root / self.digest_file
+
 
 @dataclass
 class MemoryHealth:
@@ -76,80 +125,238 @@ class MemoryHealth:
     active_context_entries: int = 0
     progress_entries: int = 0
     patterns_entries: int = 0
+    archive_segments: int = 0
+    archive_size_kb: float = 0.0
     needs_compact: bool = False
     issues: list[str] = field(default_factory=list)
 
 
+PROGRESS_SECTION = re.compile(r"## (\d{4}-\d{2}-\d{2})\n(.*?)(?=\n## |\Z)", re.DOTALL)
+ERROR_BLOCK = re.compile(
+    r"### In-Flight Error: ([^\n]+)\n(.*?)(?=\n### |\n## |\Z)", re.DOTALL
+)
+DECISION_LINE = re.compile(r"^- \[([^\]]+)\][^\n]*(?:\n|\Z)", re.MULTILINE)
+
+
+def _split_marker(content: str) -> tuple[str, str]:
+    """Split the journal marker trailer off a materialised memory file."""
+    marker = MARKER_PATTERN.search(content)
+    if not marker:
+        return content, ""
+    return content[: marker.start()] + "\n", marker.group(0).lstrip("\n")
+
+
+def _trim_section(
+    content: str, section: str, block: re.Pattern[str], keep: int
+) -> tuple[str, list[tuple[str, str]]]:
+    """
+    Keep the first `keep` blocks of a "## section" and cut the rest.
+
+    Returns:
+        (new content, [(timestamp, block) of the cut blocks])
+    """
+    span = re.search(
+        rf"^## {re.escape(section)}[ \t]*\n(.*?)(?=^## |\Z)",
+        content,
+        re.DOTALL | re.MULTILINE,
+    )
+    if not span:
+        return content, []
+    blocks = list(block.finditer(content, span.start(1), span.end(1)))
+    if len(blocks) <= keep:
+        return content, []
+    cut = blocks[keep - 1].end() if keep else blocks[0].start()
+    cut_blocks = [(m.group(1).strip(), m.group(0)) for m in blocks[keep:]]
+    return content[:cut] + content[blocks[-1].end() :], cut_blocks
+
+
+def _compact_progress(
+    config: MemoryConfig, keep_entries: int, stats: dict[str, int]
+) -> None:
+    """Archive progress sections past the age cutoff or the size bound."""
+    content, trailer = _split_marker(read_file_safely(config.progress_path))
+    if not content.strip():
+        return
+    sections = [(m.group(1), m.group(0)) for m in PROGRESS_SECTION.finditer(content)]
+    stats["before"] = stats["after"] = len(sections)
+    cutoff = (datetime.now() - timedelta(days=max(7, keep_entries // 10))).strftime(
+        "%Y-%m-%d"
+    )
+    kept: list[tuple[str, str]] = []
+    archived: list[tuple[str, str]] = []
+    for date, section in sections:
+        try:
+            datetime.strptime(date, "%Y-%m-%d")
+        except ValueError:
+            continue
+        (kept if date >= cutoff else archived).append((date, section))
+    # Newest first; shed whole days until the file is under half its threshold
+    kept.sort(key=lambda item: item[0], reverse=True)
+    size_limit = config.max_progress_kb * 1024 // 2
+    size = sum(len(section.encode("utf-8")) + 1 for _, section in kept)
+    while len(kept) > 1 and size > size_limit:
+        date, section = kept.pop()
+        size -= len(section.encode("utf-8")) + 1
+        archived.append((date, section))
+    if not archived:
+        return
+
+    archive_entries(config, "progress", archived)
+    header = ""
+    if content.startswith("# "):
+        header = content[: content.find("\n") + 1] + "\n"
+    body = header + "\n".join(section for _, section in kept)
+    if trailer:
+        body = body.rstrip("\n") + f"\n\n{trailer}"
+    write_file_safely(config.progress_path, body)
+    stats["after"] = len(kept)
+    stats["archived"] = len(archived)
+
+
+def _compact_active_context(config: MemoryConfig, stats: dict[str, int]) -> None:
+    """Archive in-flight errors and decisions past the count or size bound."""
+    content, trailer = _split_marker(read_file_safely(config.active_context_path))
+    if not content.strip():
+        return
+    stats["before"] = stats["after"] = len(ERROR_BLOCK.findall(content))
+    keep_errors = config.keep_errors_on_compact
+    keep_decisions = config.keep_decisions_on_compact
+    size_limit = config.max_active_context_kb * 1024 // 2
+    while True:
+        trimmed, errors = _trim_section(
+            content, "In-Flight Errors", ERROR_BLOCK, keep_errors
+        )
+        trimmed, decisions = _trim_section(
+            trimmed, "Active Decisions", DECISION_LINE, keep_decisions
+        )
+        if len(trimmed.encode("utf-8")) <= size_limit or (
+            keep_errors <= 1 and keep_decisions <= 1
+        ):
+            break
+        keep_errors = max(1, keep_errors // 2)
+        keep_decisions = max(1, keep_decisions // 2)
+    if not errors and not decisions:
+        return
+
+    archive_entries(config, "errors", errors)
+    archive_entries(config, "decisions", decisions)
+    if trailer:
+        trimmed = trimmed.rstrip("\n") + f"\n\n{trailer}"
+    write_file_safely(config.active_context_path, trimmed)
+    stats["after"] = stats["before"] - len(errors)
+    stats["archived"] = len(errors) + len(decisions)
+
+
+def _backup(config: MemoryConfig, path: Path) -> None:
+    """Snapshot a memory file with the configured retention."""
+    backup_file(
+        path,
+        config.backup_path,
+        config.backup_keep_last,
+        config.backup_keep_daily,
+        config.backup_keep_weekly,
+    )
+
+
 def compact_memory(
     config: MemoryConfig, keep_entries: int = 100, backup: bool = True
 ) -> dict[str, dict[str, int]]:
-    """Compact memory files by archiving old entries."""
+    """
+    Compact memory files by moving old entries into archive segments.
+
+    Progress sections older than max(7, keep_entries // 10) days, in-flight
+    errors beyond the newest keep_errors_on_compact and decisions beyond
+    the newest keep_decisions_on_compact are appended to monthly gzip
+    segments under archive/. If a hot file is still above half its size
+    threshold, older entries are moved as well, so it stays bounded.
+
+    Each file is rewritten under its journal lock, so a concurrent
+    materialisation cannot interleave with the rewrite.
+    """
+    materialize_memory(config)
     results: dict[str, dict[str, int]] = {
         "active_context": {"before": 0, "after": 0, "archived": 0},
         "progress": {"before": 0, "after": 0, "archived": 0},
     }
     if backup:
-        backup_file(config.active_context_path, config.backup_path)
-        backup_file(config.progress_path, config.backup_path)
-
-    progress_content = read_file_safely(config.progress_path)
-    if progress_content:
-        date_pattern = r"## (\d{4}-\d{2}-\d{2})\n(.*?)(?=\n## |\Z)"
-        matches = list(re.finditer(date_pattern, progress_content, re.DOTALL))
-        results["progress"]["before"] = len(matches)
-        days_to_keep = max(7, keep_entries // 10)
-        cutoff = datetime.now() - timedelta(days=days_to_keep)
-        new_sections = []
-        for match in matches:
-            try:
-                date = datetime.strptime(match.group(1), "%Y-%m-%d")
-                if date >= cutoff:
-                    new_sections.append(match.group(0))
-            except ValueError:
-                continue
-        results["progress"]["after"] = len(new_sections)
-        results["progress"]["archived"] = (
-            results["progress"]["before"] - results["progress"]["after"]
-        )
-        if new_sections:
-            header = ""
-            if progress_content.startswith("# "):
-                header = progress_content[: progress_content.find("\n") + 1] + "\n"
-            write_file_safely(config.progress_path, header + "\n".join(new_sections))
-
-    active_content = read_file_safely(config.active_context_path)
-    if active_content and "## In-Flight Errors" in active_content:
-        error_pattern = r"### In-Flight Error: ([^\n]+)\n(.*?)(?=\n### |\n## |\Z)"
-        matches = list(re.finditer(error_pattern, active_content, re.DOTALL))
-        results["active_context"]["before"] = len(matches)
-        if len(matches) > 10:
-            errors_to_keep = matches[:10]
-            if errors_to_keep:
-                last_keep_end = errors_to_keep[-1].end()
-                next_section = re.search(
-                    r"\n## (?!In-Flight)", active_content[last_keep_end:]
-                )
-                if next_section:
-                    new_content = (
-                        active_content[:last_keep_end]
-                        + active_content[last_keep_end + next_section.start() :]
-                    )
-                else:
-                    new_content = active_content[:last_keep_end]
-                results["active_context"]["after"] = 10
-                results["active_context"]["archived"] = len(matches) - 10
-                write_file_safely(config.active_context_path, new_content)
-        else:
-            results["active_context"]["after"] = len(matches)
+        for path in (config.active_context_path, config.progress_path):
+            _backup(config, path)
+
+    with journal_lock(journal_path(config.progress_path, config.journal_path)):
+        _compact_progress(config, keep_entries, results["progress"])
+    with journal_lock(journal_path(config.active_context_path, config.journal_path)):
+        _compact_active_context(config, results["active_context"])
+    update_digest(config)
     return results
 
 
+def auto_compact(config: MemoryConfig) -> dict[str, dict[str, int]] | None:
+    """
+    Compact the memory files if get_memory_health says they need it.
+
+    Archived entries are kept in the archive segments, so no backup is
+    taken.
+
+    Returns:
+        compact_memory results, or None when nothing needed compacting
+    """
+    if not config.memory_root.exists():
+        return None
+    if not get_memory_health(config).needs_compact:
+        return None
+    return compact_memory(config, config.keep_entries_on_compact, backup=False)
+
+
+def restore_memory(
+    config: MemoryConfig, at: datetime, names: list[str] | None = None
+) -> dict[str, str | None]:
+    """
+    Restore memory files to their latest backup taken at or before a time.
+
+    Pending journal entries are materialised first and the current content
+    is backed up, so a restore can itself be undone with `restore`.
+
+    Args:
+        config: Memory configuration
+        at: Point in time to restore to
+        names: Only these files (default: all memory files)
+
+    Returns:
+        Restored snapshot time per file name (None: no backup that old)
+
+    Raises:
+        OSError: If a snapshot cannot be read or a file written
+        ValueError: If a snapshot is corrupt
+    """
+    materialize_memory(config)
+    restored: dict[str, str | None] = {}
+    for path in (
+        config.active_context_path,
+        config.progress_path,
+        config.patterns_path,
+    ):
+        if names and path.name not in names:
+            continue
+        snapshot = find_snapshot(config.backup_path, path.name, at)
+        restored[path.name] = None if snapshot is None else snapshot["ts"]
+        if snapshot is None:
+            continue
+        # Read before backing up: retention may prune the snapshot
+        data = read_snapshot(config.backup_path, snapshot)
+        with journal_lock(journal_path(path, config.journal_path)):
+            _backup(config, path)
+            write_restored(path, data)
+    update_digest(config)
+    return restored
+
+
 def validate_memory(config: MemoryConfig) -> tuple[bool, list[str]]:
     """Validate memory file structure."""
     issues: list[str] = []
     if not config.memory_root.exists():
         issues.append(f"Memory root does not exist: {config.memory_root}")
         return False, issues
+    materialize_memory(config)
     if config.active_context_path.exists():
         content = read_file_safely(config.active_context_path)
         if "## Current Focus" not in content:
@@ -167,6 +374,7 @@ def validate_memory(config: MemoryConfig) -> tuple[bool, list[str]]:
 
 def get_memory_health(config: MemoryConfig) -> MemoryHealth:
     """Get health status of memory files."""
+    materialize_memory(config)
     health = MemoryHealth()
     for name, path in [
         ("active_context", config.active_context_path),
@@ -183,9 +391,21 @@ def get_memory_health(config: MemoryConfig) -> MemoryHealth:
                 health.progress_entries = content.count("## 20")
             elif name == "patterns":
                 health.patterns_entries = content.count("### ")
-    if health.active_context_size_kb > 50 or health.progress_size_kb > 100:
+    for segment in config.archive_path.glob("*.md.gz"):
+        health.archive_segments += 1
+        health.archive_size_kb += segment.stat().st_size / 1024
+    if (
+        health.active_context_size_kb > config.max_active_context_kb
+        or health.progress_size_kb > config.max_progress_kb
+    ):
         health.needs_compact = True
         health.issues.append("Memory files are large, consider running compact")
+    if (
+        health.progress_entries > config.max_entries_before_compact
+        or health.active_context_entries > config.max_errors_before_compact
+    ):
+        health.needs_compact = True
+        health.issues.append("Memory files have many entries, consider running compact")
     valid, issues = validate_memory(config)
     health.issues.extend(issues)
     return health
@@ -283,9 +503,40 @@ def _create_parser() -> argparse.ArgumentParser:
     p.add_argument("--query", "-q", required=True)
     p.add_argument("--json", action="store_true")
 
+    p = sub.add_parser("search", help="Ranked search across memory files")
+    p.add_argument("--query", "-q", default="")
+    p.add_argument("--kind", "-k", choices=ENTRY_KINDS)
+    p.add_argument("--category", "-c")
+    p.add_argument("--workflow", "-w")
+    p.add_argument("--since", help="YYYY-MM-DD")
+    p.add_argument("--until", help="YYYY-MM-DD")
+    p.add_argument("--limit", "-l", type=int, default=20)
+    p.add_argument("--json", action="store_true")
+
+    p = sub.add_parser("reindex", help="Refresh the memory search index")
+    p.add_argument("--force", action="store_true", help="Re-parse every file")
+
+    p = sub.add_parser("backups", help="List backups (newest first)")
+    p.add_argument("--file", "-f", help="Only this memory file (e.g. progress.md)")
+    p.add_argument("--json", action="store_true")
+
+    p = sub.add_parser("restore", help="Restore files from backups")
+    p.add_argument(
+        "--at",
+        required=True,
+        type=datetime.fromisoformat,
+        help="Latest backup at or before this time (YYYY-MM-DD[THH:MM[:SS[.ffffff]]])",
+    )
+    p.add_argument(
+        "--file", "-f", action="append", help="Only this memory file (repeatable)"
+    )
+
     p = sub.add_parser("compact", help="Compact files")
     p.add_argument("--keep-entries", "-k", type=int, default=100)
     p.add_argument("--no-backup", action="store_true")
+    p.add_argument(
+        "--if-needed", action="store_true", help="Only when health thresholds are hit"
+    )
 
     sub.add_parser("validate", help="Validate structure")
 
@@ -294,6 +545,8 @@ def _create_parser() -> argparse.ArgumentParser:
 
     sub.add_parser("init", help="Initialize memory")
 
+    sub.add_parser("digest", help="Show the session resume digest (JSON)")
+
     return parser
 
 
@@ -320,6 +573,10 @@ def _print_health(health: MemoryHealth, as_json: bool) -> None:
                             "entries": health.patterns_entries,
                         },
                     },
+                    "archive": {
+                        "segments": health.archive_segments,
+                        "size_kb": health.archive_size_kb,
+                    },
                     "needs_compact": health.needs_compact,
                     "issues": health.issues,
                 },
@@ -350,17 +607,37 @@ def _print_health(health: MemoryHealth, as_json: bool) -> None:
         ]:
             status = "OK" if exists else "MISSING"
             print(f"{name}: {status} ({size:.1f} KB, {entries} entries)")
+        print(
+            f"archive/         : {health.archive_segments} segments "
+            f"({health.archive_size_kb:.1f} KB)"
+        )
         if health.needs_compact:
             print("\nWARNING: Compact recommended")
         if health.issues:
             print("Issues:" + "".join(f"\n  - {i}" for i in health.issues))
 
 
+# Read commands that compact first when the health thresholds are exceeded
+# (diagnostics such as health and validate never modify the files)
+AUTO_COMPACT_COMMANDS = {
+    "get-errors",
+    "search-patterns",
+    "search",
+    "reindex",
+}
+
+
 def main() -> int:
     """Main entry point."""
     args = _create_parser().parse_args()
     config = MemoryConfig(memory_root=args.memory_root)
 
+    if args.command in AUTO_COMPACT_COMMANDS:
+        compacted = auto_compact(config)
+        if compacted:
+            moved = sum(stats["archived"] for stats in compacted.values())
+            print(f"AUTO-COMPACTED: {moved} entries -> archive/", file=sys.stderr)
+
     if args.command == "add-decision":
         return 0 if add_decision(config, args.text, args.category) else 1
     if args.command == "set-focus":
@@ -401,7 +678,58 @@ def main() -> int:
             for r in results:
                 print(f"### {r['name']}\n{r['content'][:200]}...\n")
         return 0
+    if args.command == "search":
+        materialize_memory(config)
+        hits = search_memory(
+            config,
+            args.query,
+            args.kind,
+            args.category,
+            args.workflow,
+            args.since,
+            args.until,
+            args.limit,
+        )
+        if args.json:
+            print(json.dumps(hits, indent=2))
+        elif not hits:
+            print("No matching entries")
+        else:
+            for h in hits:
+                when = h["timestamp"] or h["date"]
+                title = f" {h['title']}:" if h["title"] else ""
+                print(f"[{when}] ({h['kind']}){title} {h['body'][:200]}")
+        return 0
+    if args.command == "reindex":
+        materialize_memory(config)
+        print(json.dumps(refresh_index(config, force=args.force), indent=2))
+        return 0
+    if args.command == "backups":
+        snapshots = list_snapshots(config.backup_path, args.file)
+        if args.json:
+            print(json.dumps(snapshots, indent=2))
+        elif not snapshots:
+            print("No backups")
+        else:
+            for snap in snapshots:
+                print(
+                    f"{snap['ts']}  {snap['file']:<18} {snap['size']:>9} bytes  "
+                    f"{snap['sha256'][:12]}"
+                )
+        return 0
+    if args.command == "restore":
+        try:
+            restored = restore_memory(config, args.at, args.file)
+        except (OSError, ValueError) as e:
+            print(f"ERROR: Restore failed: {e}", file=sys.stderr)
+            return 1
+        for name, ts in restored.items():
+            print(f"RESTORED: {name} <- {ts}" if ts else f"SKIPPED: {name} (no backup)")
+        return 0
     if args.command == "compact":
+        if args.if_needed and not get_memory_health(config).needs_compact:
+            print("Compact not needed")
+            return 0
         res = compact_memory(config, args.keep_entries, backup=not args.no_backup)
         print("Compact results:")
         for fname, stats in res.items():
@@ -423,6 +751,9 @@ def main() -> int:
         return 0
     if args.command == "init":
         return 0 if initialize_memory(config) else 1
+    if args.command == "digest":
+        print(json.dumps(refresh_digest(config), indent=2))
+        return 0
     return 0
 
 
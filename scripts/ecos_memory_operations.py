@@ -7,18 +7,25 @@ This module provides the core operations for manipulating Emasoft Chief of Staff
 - Active Context operations (decisions, focus, errors)
 - Progress log operations
 - Pattern discovery operations
+- Archive segments for entries moved out by compaction
 
 Used by ecos_memory_manager.py for CLI interface.
 """
 
 from __future__ import annotations
 
+import gzip
+import os
 import re
-import shutil
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
+
+from ecos_memory_backup import KEEP_DAILY, KEEP_LAST, KEEP_WEEKLY, take_snapshot
+from ecos_memory_digest import refresh_digest
+from ecos_memory_index import search_memory
+from ecos_memory_journal import append_record, journal_path, materialize
 
 if TYPE_CHECKING:
     from ecos_memory_manager import MemoryConfig
@@ -39,8 +46,21 @@ __all__ = [
     "get_progress_entries",
     "add_pattern",
     "search_patterns",
+    "materialize_memory",
+    "update_digest",
+    "ARCHIVE_HEADERS",
+    "archive_segment_path",
+    "archive_entries",
 ]
 
+# Section header written at the top of each archive segment member, so the
+# segment parses like the hot file its entries came from
+ARCHIVE_HEADERS = {
+    "progress": "# Progress Archive",
+    "decisions": "## Active Decisions",
+    "errors": "## In-Flight Errors",
+}
+
 
 # =============================================================================
 # Utility Functions
@@ -86,18 +106,21 @@ def write_file_safely(path: Path, content: str) -> bool:
         return False
 
 
-def backup_file(path: Path, backup_dir: Path) -> Path | None:
-    """Create timestamped backup of a file."""
+def backup_file(
+    path: Path,
+    backup_dir: Path,
+    keep_last: int = KEEP_LAST,
+    keep_daily: int = KEEP_DAILY,
+    keep_weekly: int = KEEP_WEEKLY,
+) -> dict[str, Any] | None:
+    """Snapshot a file into the deduplicated backup store and apply retention."""
     if not path.exists():
         return None
 
-    backup_dir.mkdir(parents=True, exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_path = backup_dir / f"{path.stem}_{timestamp}{path.suffix}"
-
     try:
-        shutil.copy2(path, backup_path)
-        return backup_path
+        return take_snapshot(
+            backup_dir, path.name, path.read_bytes(), keep_last, keep_daily, keep_weekly
+        )
     except OSError as e:
         print(f"ERROR: Backup failed: {e}", file=sys.stderr)
         return None
@@ -108,19 +131,17 @@ def backup_file(path: Path, backup_dir: Path) -> Path | None:
 # =============================================================================
 
 
-def add_decision(
-    config: MemoryConfig, decision_text: str, category: str = "Architecture"
-) -> bool:
-    """Add a decision to activeContext.md."""
-    content = read_file_safely(config.active_context_path)
-    timestamp = get_timestamp()
-
+def _apply_decision(
+    content: str, timestamp: str, decision_text: str, category: str
+) -> str:
+    """Insert a decision at the top of Active Decisions."""
     decision_entry = f"- [{timestamp}] **{category}**: {decision_text}\n"
 
     if "## Active Decisions" in content:
         pattern = r"(## Active Decisions\s*\n)"
-        replacement = rf"\1{decision_entry}"
-        new_content = re.sub(pattern, replacement, content, count=1)
+        new_content = re.sub(
+            pattern, lambda m: m.group(1) + decision_entry, content, count=1
+        )
     else:
         if "## Current Focus" in content:
             pattern = r"(## Current Focus.*?)(\n## |\Z)"
@@ -136,18 +157,27 @@ def add_decision(
                 new_content = content + f"\n\n## Active Decisions\n\n{decision_entry}"
         else:
             new_content = f"## Active Decisions\n\n{decision_entry}\n" + content
+    return new_content
+
 
-    if write_file_safely(config.active_context_path, new_content):
+def add_decision(
+    config: MemoryConfig, decision_text: str, category: str = "Architecture"
+) -> bool:
+    """Add a decision to activeContext.md."""
+    if _journal(
+        config,
+        config.active_context_path,
+        "decision",
+        text=decision_text,
+        category=category,
+    ):
         print("ADDED: Decision -> activeContext.md")
         return True
     return False
 
 
-def set_focus(config: MemoryConfig, focus_text: str) -> bool:
-    """Set or update the Current Focus in activeContext.md."""
-    content = read_file_safely(config.active_context_path)
-    timestamp = get_timestamp()
-
+def _apply_focus(content: str, timestamp: str, focus_text: str) -> str:
+    """Replace (or add) the Current Focus section."""
     focus_section = f"""## Current Focus
 
 **Updated**: {timestamp}
@@ -158,29 +188,31 @@ def set_focus(config: MemoryConfig, focus_text: str) -> bool:
     if "## Current Focus" in content:
         pattern = r"## Current Focus.*?(?=\n## |\Z)"
         new_content = re.sub(
-            pattern, focus_section.rstrip(), content, count=1, flags=re.DOTALL
+            pattern, lambda m: focus_section.rstrip(), content, count=1, flags=re.DOTALL
         )
     else:
         new_content = focus_section + "\n" + content
+    return new_content
 
-    if write_file_safely(config.active_context_path, new_content):
+
+def set_focus(config: MemoryConfig, focus_text: str) -> bool:
+    """Set or update the Current Focus in activeContext.md."""
+    if _journal(config, config.active_context_path, "focus", text=focus_text):
         print("UPDATED: Current Focus -> activeContext.md")
         return True
     return False
 
 
-def log_error(
-    config: MemoryConfig,
+def _apply_error(
+    content: str,
+    timestamp: str,
     step: str,
     agent: str,
     error_text: str,
-    impact: str = "NON-BLOCKING",
-    context: str = "",
-) -> bool:
-    """Log an in-flight error to activeContext.md."""
-    content = read_file_safely(config.active_context_path)
-    timestamp = get_timestamp()
-
+    impact: str,
+    context: str,
+) -> str:
+    """Insert an in-flight error at the top of In-Flight Errors."""
     error_entry = f"""
 ### In-Flight Error: {timestamp}
 - **Step**: {step}
@@ -192,29 +224,54 @@ def log_error(
 
     if "## In-Flight Errors" in content:
         pattern = r"(## In-Flight Errors\s*\n)"
-        replacement = rf"\1{error_entry}"
-        new_content = re.sub(pattern, replacement, content, count=1)
+        new_content = re.sub(
+            pattern, lambda m: m.group(1) + error_entry, content, count=1
+        )
     else:
         new_content = content.rstrip() + f"\n\n## In-Flight Errors\n{error_entry}"
+    return new_content
+
 
-    if write_file_safely(config.active_context_path, new_content):
+def log_error(
+    config: MemoryConfig,
+    step: str,
+    agent: str,
+    error_text: str,
+    impact: str = "NON-BLOCKING",
+    context: str = "",
+) -> bool:
+    """Log an in-flight error to activeContext.md."""
+    if _journal(
+        config,
+        config.active_context_path,
+        "error",
+        step=step,
+        agent=agent,
+        error=error_text[:500],
+        impact=impact,
+        context=context,
+    ):
         print(f"LOGGED: Error ({impact}) -> activeContext.md")
         return True
     return False
 
 
+def _apply_clear_errors(content: str) -> str:
+    """Remove the In-Flight Errors section."""
+    pattern = r"\n## In-Flight Errors.*?(?=\n## |\Z)"
+    return re.sub(pattern, "", content, flags=re.DOTALL).strip() + "\n"
+
+
 def clear_errors(config: MemoryConfig) -> bool:
     """Clear all in-flight errors from activeContext.md."""
+    materialize_memory(config)
     content = read_file_safely(config.active_context_path)
 
     if "## In-Flight Errors" not in content:
         print("No In-Flight Errors section found")
         return True
 
-    pattern = r"\n## In-Flight Errors.*?(?=\n## |\Z)"
-    new_content = re.sub(pattern, "", content, flags=re.DOTALL)
-
-    if write_file_safely(config.active_context_path, new_content.strip() + "\n"):
+    if _journal(config, config.active_context_path, "clear_errors"):
         print("CLEARED: All In-Flight Errors")
         return True
     return False
@@ -222,6 +279,7 @@ def clear_errors(config: MemoryConfig) -> bool:
 
 def get_recent_errors(config: MemoryConfig, limit: int = 5) -> list[dict[str, str]]:
     """Get recent in-flight errors from activeContext.md."""
+    materialize_memory(config)
     content = read_file_safely(config.active_context_path)
     errors: list[dict[str, str]] = []
 
@@ -248,17 +306,11 @@ def get_recent_errors(config: MemoryConfig, limit: int = 5) -> list[dict[str, st
 # =============================================================================
 
 
-def add_progress(
-    config: MemoryConfig,
-    text: str,
-    category: str = "Progress",
-    workflow: str = "",
-) -> bool:
-    """Add a progress entry to progress.md."""
-    content = read_file_safely(config.progress_path)
-    timestamp = get_timestamp()
-    date = get_date()
-
+def _apply_progress(
+    content: str, timestamp: str, text: str, category: str, workflow: str
+) -> str:
+    """Insert a progress entry at the top of its date section."""
+    date = timestamp[:10]
     workflow_tag = f"[{workflow}] " if workflow else ""
     entry = f"- [{timestamp}] {workflow_tag}**{category}**: {text}\n"
 
@@ -266,8 +318,9 @@ def add_progress(
 
     if date_header in content:
         pattern = rf"({re.escape(date_header)}\s*\n)"
-        replacement = rf"\1\n{entry}"
-        new_content = re.sub(pattern, replacement, content, count=1)
+        new_content = re.sub(
+            pattern, lambda m: f"{m.group(1)}\n{entry}", content, count=1
+        )
     else:
         if content.startswith("# "):
             title_end = content.find("\n") + 1
@@ -278,39 +331,44 @@ def add_progress(
             )
         else:
             new_content = f"{date_header}\n\n{entry}" + content
+    return new_content
 
-    if write_file_safely(config.progress_path, new_content):
+
+def add_progress(
+    config: MemoryConfig,
+    text: str,
+    category: str = "Progress",
+    workflow: str = "",
+) -> bool:
+    """Add a progress entry to progress.md."""
+    if _journal(
+        config,
+        config.progress_path,
+        "progress",
+        text=text,
+        category=category,
+        workflow=workflow,
+    ):
         print("ADDED: Progress entry -> progress.md")
         return True
     return False
 
 
 def get_progress_entries(config: MemoryConfig, days: int = 7) -> list[dict[str, str]]:
-    """Get progress entries from the last N days."""
-    content = read_file_safely(config.progress_path)
+    """Get progress entries from the last N days (newest first, via the index)."""
+    materialize_memory(config)
+    cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
     entries: list[dict[str, str]] = []
-
-    date_pattern = r"## (\d{4}-\d{2}-\d{2})\n(.*?)(?=\n## |\Z)"
-    matches = re.findall(date_pattern, content, re.DOTALL)
-
-    cutoff = datetime.now() - timedelta(days=days)
-
-    for date_str, section in matches:
-        try:
-            date = datetime.strptime(date_str, "%Y-%m-%d")
-            if date >= cutoff:
-                entry_pattern = r"- \[([^\]]+)\] (.+)"
-                for match in re.finditer(entry_pattern, section):
-                    entries.append(
-                        {
-                            "date": date_str,
-                            "timestamp": match.group(1),
-                            "text": match.group(2),
-                        }
-                    )
-        except ValueError:
-            continue
-
+    for hit in search_memory(config, kind="progress", since=cutoff, limit=None):
+        workflow_tag = f"[{hit['workflow']}] " if hit["workflow"] else ""
+        category = f"**{hit['category']}**: " if hit["category"] else ""
+        entries.append(
+            {
+                "date": hit["date"],
+                "timestamp": hit["timestamp"],
+                "text": f"{workflow_tag}{category}{hit['body']}",
+            }
+        )
     return entries
 
 
@@ -319,16 +377,10 @@ def get_progress_entries(config: MemoryConfig, days: int = 7) -> list[dict[str,
 # =============================================================================
 
 
-def add_pattern(
-    config: MemoryConfig,
-    name: str,
-    description: str,
-    category: str = "General",
-) -> bool:
-    """Add a pattern to patterns.md."""
-    content = read_file_safely(config.patterns_path)
-    timestamp = get_timestamp()
-
+def _apply_pattern(
+    content: str, timestamp: str, name: str, description: str, category: str
+) -> str:
+    """Insert a pattern at the top of its category section."""
     pattern_entry = f"""
 ### {name}
 
@@ -342,33 +394,181 @@ def add_pattern(
 
     if category_header in content:
         pattern = rf"({re.escape(category_header)}\s*\n)"
-        replacement = rf"\1{pattern_entry}"
-        new_content = re.sub(pattern, replacement, content, count=1)
+        new_content = re.sub(
+            pattern, lambda m: m.group(1) + pattern_entry, content, count=1
+        )
     else:
         new_content = content.rstrip() + f"\n\n{category_header}\n{pattern_entry}"
+    return new_content
+
 
-    if write_file_safely(config.patterns_path, new_content):
+def add_pattern(
+    config: MemoryConfig,
+    name: str,
+    description: str,
+    category: str = "General",
+) -> bool:
+    """Add a pattern to patterns.md."""
+    if _journal(
+        config,
+        config.patterns_path,
+        "pattern",
+        name=name,
+        description=description,
+        category=category,
+    ):
         print(f"ADDED: Pattern '{name}' -> patterns.md")
         return True
     return False
 
 
 def search_patterns(config: MemoryConfig, query: str) -> list[dict[str, str]]:
-    """Search patterns by name or content."""
-    content = read_file_safely(config.patterns_path)
-    results: list[dict[str, str]] = []
+    """Search patterns by name or content, best matches first (via the index)."""
+    materialize_memory(config)
+    return [
+        {
+            "name": hit["title"],
+            "content": (
+                f"**Category**: {hit['category']}\n"
+                f"**Discovered**: {hit['timestamp']}\n\n{hit['body']}"
+            ),
+        }
+        for hit in search_memory(config, query, kind="pattern", limit=None)
+    ]
 
-    pattern = r"### ([^\n]+)\n(.*?)(?=\n### |\n## |\Z)"
-    matches = re.findall(pattern, content, re.DOTALL)
 
-    query_lower = query.lower()
-    for name, body in matches:
-        if query_lower in name.lower() or query_lower in body.lower():
-            results.append(
-                {
-                    "name": name.strip(),
-                    "content": body.strip(),
-                }
-            )
+# =============================================================================
+# Journal Operations
+# =============================================================================
+
+
+def _journal(config: MemoryConfig, path: Path, op: str, **fields: str) -> bool:
+    """Append a writer operation to the journal of a memory file."""
+    try:
+        append_record(
+            journal_path(path, config.journal_path), op, get_timestamp(), **fields
+        )
+    except OSError as e:
+        print(f"ERROR: Cannot write journal for {path}: {e}", file=sys.stderr)
+        return False
+    update_digest(config)
+    return True
+
+
+def update_digest(config: MemoryConfig) -> None:
+    """Bring the resume digest up to date; failures only cost a rebuild later."""
+    try:
+        refresh_digest(config)
+    except OSError as e:
+        print(f"WARNING: Cannot update resume digest: {e}", file=sys.stderr)
+
+
+def _apply_active_context(content: str, record: dict[str, Any]) -> str:
+    """Apply one activeContext.md journal record."""
+    op, ts = record["op"], record["ts"]
+    if op == "decision":
+        return _apply_decision(content, ts, record["text"], record["category"])
+    if op == "focus":
+        return _apply_focus(content, ts, record["text"])
+    if op == "error":
+        return _apply_error(
+            content,
+            ts,
+            record["step"],
+            record["agent"],
+            record["error"],
+            record["impact"],
+            record["context"],
+        )
+    if op == "clear_errors":
+        return _apply_clear_errors(content)
+    return content
+
+
+def _apply_progress_record(content: str, record: dict[str, Any]) -> str:
+    """Apply one progress.md journal record."""
+    if record["op"] != "progress":
+        return content
+    return _apply_progress(
+        content, record["ts"], record["text"], record["category"], record["workflow"]
+    )
+
+
+def _apply_pattern_record(content: str, record: dict[str, Any]) -> str:
+    """Apply one patterns.md journal record."""
+    if record["op"] != "pattern":
+        return content
+    return _apply_pattern(
+        content,
+        record["ts"],
+        record["name"],
+        record["description"],
+        record["category"],
+    )
+
+
+def materialize_memory(config: MemoryConfig) -> dict[str, int]:
+    """
+    Replay pending journal entries into the markdown memory files.
+
+    Returns:
+        Records applied per markdown file name
+    """
+    applied = {}
+    for path, apply in (
+        (config.active_context_path, _apply_active_context),
+        (config.progress_path, _apply_progress_record),
+        (config.patterns_path, _apply_pattern_record),
+    ):
+        applied[path.name] = materialize(
+            path, journal_path(path, config.journal_path), apply
+        )
+    if any(applied.values()):
+        update_digest(config)
+    return applied
+
+
+# =============================================================================
+# Archive Operations
+# =============================================================================
+
 
-    return results
+def archive_segment_path(config: MemoryConfig, kind: str, date: str) -> Path:
+    """Archive segment for entries of a kind dated in the month of date."""
+    if not re.match(r"\d{4}-\d{2}", date):
+        date = get_date()
+    return config.archive_path / f"{kind}-{date[:7]}.md.gz"
+
+
+def archive_entries(
+    config: MemoryConfig, kind: str, blocks: list[tuple[str, str]]
+) -> int:
+    """
+    Append markdown blocks to their monthly archive segments.
+
+    Each call appends one gzip member per segment, so segments grow
+    without being rewritten; gzip readers see the members as one stream.
+
+    Args:
+        config: Memory configuration
+        kind: Key of ARCHIVE_HEADERS
+        blocks: (date "YYYY-MM-DD...", markdown) pairs
+
+    Returns:
+        Number of blocks archived
+
+    Raises:
+        OSError: If a segment cannot be written
+    """
+    by_segment: dict[Path, list[str]] = {}
+    for date, text in blocks:
+        segment = archive_segment_path(config, kind, date)
+        by_segment.setdefault(segment, []).append(text.strip("\n"))
+    for segment, texts in by_segment.items():
+        segment.parent.mkdir(parents=True, exist_ok=True)
+        member = "\n\n".join([ARCHIVE_HEADERS[kind], *texts]) + "\n\n"
+        with open(segment, "ab") as f:
+            f.write(gzip.compress(member.encode("utf-8")))
+            f.flush()
+            os.fsync(f.fileno())
+    return len(blocks)
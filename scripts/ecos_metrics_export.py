@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+ecos_metrics_export.py - Stream metrics events and rollups to files.
+
+Exports the raw event log (ecos_metrics_store.py) or its hourly/daily
+rollups (ecos_metrics_rollup.py) for offline analysis, filtered by period,
+agent and project. Rows are streamed partition by partition and written
+in fixed-size batches, so memory stays bounded by one day partition and
+one batch however long the history is.
+
+Formats:
+    parquet - Parquet, one row group per batch (requires pyarrow)
+    arrow   - Arrow IPC file, one record batch per batch (requires pyarrow)
+    csv     - CSV with a header row
+    ndjson  - One JSON object per line
+
+The default is parquet when pyarrow is installed, csv otherwise.
+
+Rollup export emits only buckets that lie wholly inside the window; use
+the events dataset for exact edges.
+
+Dependencies: Python 3.8+ stdlib only; pyarrow optional (parquet, arrow)
+
+Usage:
+    ecos_performance_report.py export --output FILE [--dataset events|rollups]
+        [--bucket hour|day] [--format parquet|arrow|csv|ndjson]
+        [--period DAYS] [--agent NAME] [--project ID] [--batch-size N]
+    ecos_metrics_export.py ... (same options)
+
+Exit codes:
+    0 - Success
+    1 - Error (bad arguments, pyarrow missing for a columnar format)
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import IO, Any, Iterator
+
+from ecos_metrics_rollup import TIMED_TYPES, resolve_rows, update_day_rollup
+from ecos_metrics_store import (
+    EVENT_TYPES,
+    agent_roles,
+    iso_utc,
+    iter_events,
+    parse_ts,
+    partition_days,
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # columnar formats are unavailable; csv/ndjson still work
+    pa = None
+
+FORMATS = ("parquet", "arrow", "csv", "ndjson")
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+DEFAULT_BATCH_SIZE = 65536
+
+EVENT_COLUMNS: tuple[str, ...] = (
+    "ts",
+    "type",
+    "agent",
+    "project",
+    "task_id",
+    "task_type",
+    "duration_s",
+    "role",
+    "peer",
+    "detail",
+)
+
+DURATION_COLUMNS = tuple(f"{kind}_duration_s" for kind in TIMED_TYPES)
+ROLLUP_COLUMNS: tuple[str, ...] = ("bucket_start", "bucket", "agent", "project", "role")
+ROLLUP_COLUMNS += EVENT_TYPES + DURATION_COLUMNS
+
+# Columns holding timestamps; stored as microsecond UTC timestamps in
+# columnar formats (event times carry microseconds)
+TIME_COLUMNS = ("ts", "bucket_start")
+# Numeric columns; everything else is a string
+INT_COLUMNS = EVENT_TYPES
+FLOAT_COLUMNS = ("duration_s",) + DURATION_COLUMNS
+
+
+def default_format() -> str:
+    """Preferred export format given the installed packages."""
+    return "parquet" if pa is not None else "csv"
+
+
+def event_rows(
+    start: datetime,
+    end: datetime,
+    agent: str | None = None,
+    project: str | None = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Yield raw events in [start, end) as flat rows of EVENT_COLUMNS.
+
+    Args:
+        start: Window start (aware datetime)
+        end: Window end (aware datetime)
+        agent: Only this agent
+        project: Only this project
+    """
+    for event in iter_events(start, end, agent, project):
+        row = {column: event.get(column) for column in EVENT_COLUMNS}
+        if row["detail"] is not None and not isinstance(row["detail"], str):
+            row["detail"] = json.dumps(row["detail"], separators=(",", ":"))
+        yield row
+
+
+def rollup_rows(
+    start: datetime,
+    end: datetime,
+    agent: str | None = None,
+    project: str | None = None,
+    bucket: str = "hour",
+) -> Iterator[dict[str, Any]]:
+    """
+    Yield rollup rows of ROLLUP_COLUMNS for buckets wholly inside [start, end).
+
+    Args:
+        start: Window start (aware datetime)
+        end: Window end (aware datetime)
+        agent: Only this agent
+        project: Only this project
+        bucket: "hour" or "day"
+    """
+    start_ts, end_ts = iso_utc(start), iso_utc(end)
+    roles = agent_roles()
+    for day in partition_days(start, end):
+        day_start = iso_utc(parse_ts(f"{day.isoformat()}T00:00:00Z"))
+        if bucket == "day":
+            day_end = iso_utc(parse_ts(day_start) + timedelta(days=1))
+            if not (start_ts <= day_start and day_end <= end_ts):
+                continue
+            buckets = [(day_start, update_day_rollup(day)["daily"])]
+        else:
+            hourly = update_day_rollup(day, with_hourly=True)["hourly"]
+            buckets = []
+            for hour in sorted(hourly):
+                hour_start = iso_utc(parse_ts(f"{day.isoformat()}T{hour}:00:00Z"))
+                hour_end = iso_utc(parse_ts(hour_start) + timedelta(hours=1))
+                if start_ts <= hour_start and hour_end <= end_ts:
+                    buckets.append((hour_start, hourly[hour]))
+        for bucket_start, bucket_rows in buckets:
+            rows = resolve_rows(bucket_rows, roles)
+            for key in sorted(rows):
+                row_agent, row_project, row_role = key.split("\t")
+                if agent is not None and row_agent != agent:
+                    continue
+                if project is not None and row_project != project:
+                    continue
+                row: dict[str, Any] = {
+                    "bucket_start": bucket_start,
+                    "bucket": bucket,
+                    "agent": row_agent,
+                    "project": row_project,
+                    "role": row_role,
+                }
+                for column in EVENT_TYPES:
+                    row[column] = int(rows[key].get(column, 0))
+                for column in DURATION_COLUMNS:
+                    row[column] = float(rows[key].get(column, 0))
+                yield row
+
+
+def _arrow_schema(columns: tuple[str, ...]) -> Any:
+    """Arrow schema for an export's columns."""
+    fields = []
+    for column in columns:
+        if column in TIME_COLUMNS:
+            kind = pa.timestamp("us", tz="UTC")
+        elif column in INT_COLUMNS:
+            kind = pa.int64()
+        elif column in FLOAT_COLUMNS:
+            kind = pa.float64()
+        else:
+            kind = pa.string()
+        fields.append(pa.field(column, kind))
+    return pa.schema(fields)
+
+
+def _arrow_batches(
+    rows: Iterator[dict[str, Any]],
+    columns: tuple[str, ...],
+    schema: Any,
+    batch_size: int,
+) -> Iterator[Any]:
+    """Group rows into Arrow record batches of at most batch_size rows."""
+    buffer: dict[str, list[Any]] = {column: [] for column in columns}
+    filled = 0
+    for row in rows:
+        for column in columns:
+            value = row.get(column)
+            if column in TIME_COLUMNS and value is not None:
+                value = parse_ts(value)
+            buffer[column].append(value)
+        filled += 1
+        if filled == batch_size:
+            yield pa.RecordBatch.from_pydict(buffer, schema=schema)
+            buffer = {column: [] for column in columns}
+            filled = 0
+    if filled:
+        yield pa.RecordBatch.from_pydict(buffer, schema=schema)
+
+
+def write_export(
+    rows: Iterator[dict[str, Any]],
+    columns: tuple[str, ...],
+    fmt: str,
+    output: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """
+    Stream rows to an output file in the given format.
+
+    Args:
+        rows: Rows to write (dicts keyed by column)
+        columns: Column order
+        fmt: One of FORMATS
+        output: Output path ("-" for stdout, csv/ndjson only)
+        batch_size: Rows per batch / row group for columnar formats
+
+    Returns:
+        Number of rows written
+
+    Raises:
+        ValueError: Columnar format without pyarrow, or written to stdout
+    """
+    if fmt in COLUMNAR_FORMATS:
+        if pa is None:
+            raise ValueError(f"{fmt} export requires pyarrow (pip install pyarrow)")
+        if output == "-":
+            raise ValueError(f"{fmt} export needs an --output file")
+        schema = _arrow_schema(columns)
+        written = 0
+        if fmt == "parquet":
+            with pq.ParquetWriter(output, schema, compression="zstd") as writer:
+                for batch in _arrow_batches(rows, columns, schema, batch_size):
+                    writer.write_table(pa.Table.from_batches([batch]))
+                    written += batch.num_rows
+        else:
+            with pa.OSFile(output, "wb") as sink:
+                with pa_ipc.new_file(sink, schema) as writer:
+                    for batch in _arrow_batches(rows, columns, schema, batch_size):
+                        writer.write_batch(batch)
+                        written += batch.num_rows
+        return written
+
+    stream: IO[str] = (
+        sys.stdout if output == "-" else open(output, "w", encoding="utf-8", newline="")
+    )
+    written = 0
+    try:
+        if fmt == "csv":
+            writer = csv.writer(stream)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(
+                    ["" if row.get(c) is None else row[c] for c in columns]
+                )
+                written += 1
+        else:
+            for row in rows:
+                stream.write(json.dumps(row, separators=(",", ":")) + "\n")
+                written += 1
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return written
+
+
+def main(argv: list[str] | None = None, prog: str | None = None) -> int:
+    """Main entry point.
+
+    Args:
+        argv: Arguments (default: sys.argv[1:])
+        prog: Program name shown in usage
+
+    Returns:
+        Exit code: 0 for success, 1 for error
+    """
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Export metrics events or rollups for offline analysis"
+    )
+    parser.add_argument(
+        "--output", required=True, help="Output file ('-' for stdout, csv/ndjson)"
+    )
+    parser.add_argument(
+        "--dataset",
+        choices=("events", "rollups"),
+        default="events",
+        help="Raw events or rollup buckets (default: events)",
+    )
+    parser.add_argument(
+        "--bucket",
+        choices=("hour", "day"),
+        default="hour",
+        help="Rollup bucket size (default: hour)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default=default_format(),
+        help="Output format (default: parquet with pyarrow, else csv)",
+    )
+    parser.add_argument(
+        "--period", type=int, default=7, help="Days back from now (default: 7)"
+    )
+    parser.add_argument("--agent", help="Only this agent")
+    parser.add_argument("--project", help="Only this project")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Rows per batch (default: {DEFAULT_BATCH_SIZE})",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.period < 1 or args.batch_size < 1:
+        print(
+            json.dumps(
+                {"success": False, "error": "Period and batch size must be positive"},
+                indent=2,
+            )
+        )
+        return 1
+
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(days=args.period)
+    if args.dataset == "events":
+        rows = event_rows(start, end, args.agent, args.project)
+        columns = EVENT_COLUMNS
+    else:
+        rows = rollup_rows(start, end, args.agent, args.project, args.bucket)
+        columns = ROLLUP_COLUMNS
+
+    try:
+        written = write_export(rows, columns, args.format, args.output, args.batch_size)
+    except (ValueError, OSError) as e:
+        print(json.dumps({"success": False, "error": str(e)}, indent=2))
+        return 1
+
+    if args.output != "-":
+        summary = {
+            "success": True,
+            "dataset": args.dataset,
+            "format": args.format,
+            "period": {"start": iso_utc(start), "end": iso_utc(end)},
+            "filters": {"agent": args.agent, "project": args.project},
+            "rows": written,
+            "output": args.output,
+        }
+        print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+ecos_metrics_rollup.py - Hourly and daily rollups of the metrics event log.
+
+For every day partition of the event log (ecos_metrics_store.py) two
+rollup files under ~/.ecos/metrics/rollups/ keep, per (agent, project,
+role) row, the count of each event type and the summed duration of
+finished tasks:
+
+    YYYY-MM-DD.json         {"offset": 18342,   bytes of the partition rolled up
+                             "first_ts": "...", "last_ts": "...",
+                             "daily": {"agent\\tproject\\trole": {
+                                 "task_completed": 3,
+                                 "task_completed_duration_s": 9000}}}
+    YYYY-MM-DD.hourly.json  {"offset": 18342,
+                             "hour_ranges": {"09": [1024, 5120]},
+                             "hourly": {"09": {"agent\\tproject\\trole": {...}}}}
+
+The hourly detail lives in its own file so that days wholly inside a
+window load only the small daily file.
+
+Rollups advance incrementally from the recorded offset whenever they are
+read, so new events are folded in as they arrive. Both files record the
+offset they cover; a pair that disagrees (a crash between the two atomic
+writes) is rebuilt from the start of the partition, so replaying a
+partition (or rebuilding everything) yields the same rollup as the
+incremental path.
+
+A window query sums daily rows for days wholly inside the window, hourly
+rows for whole hours on its edges, and reads raw events only for the
+partial hours at either end (using the hour's byte range).
+
+Rows of events that carry a "role" (spawns, `record --role`) are keyed
+by it. Other events are rolled up with an empty role, which queries
+resolve to the agent's latest recorded role (agent_roles() in
+ecos_metrics_store.py), else "unknown". A rollup therefore depends only
+on its own partition, whatever order partitions are rolled up in.
+
+Dependencies: Python 3.8+ stdlib only
+
+Usage:
+    ecos_metrics_rollup.py update [--day YYYY-MM-DD]
+    ecos_metrics_rollup.py rebuild
+    ecos_metrics_rollup.py query [--period DAYS] [--agent NAME] [--project ID]
+        [--role ROLE] [--by agent|project|role]
+
+Exit codes:
+    0 - Success
+    1 - Error
+"""
+
+from __future__ import annotations
+
+import argparse
+import fcntl
+import json
+import os
+import sys
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from ecos_metrics_store import (
+    EVENTS_DIR,
+    METRICS_DIR,
+    NO_PROJECT,
+    agent_roles,
+    iso_utc,
+    parse_ts,
+    partition_days,
+    partition_path,
+)
+
+ROLLUPS_DIR = METRICS_DIR / "rollups"
+
+ROLLUP_VERSION = 3
+UNKNOWN_ROLE = "unknown"
+# Row role of events without one; resolved from agent_roles() at query time
+UNRESOLVED_ROLE = ""
+
+# Event types whose duration_s is summed into "<type>_duration_s"
+TIMED_TYPES = ("task_completed", "task_failed")
+
+# Row key dimensions, in key order
+DIMENSIONS = ("agent", "project", "role")
+
+
+def rollup_path(day: date) -> Path:
+    """Daily rollup file for a UTC day."""
+    return ROLLUPS_DIR / f"{day.isoformat()}.json"
+
+
+def hourly_rollup_path(day: date) -> Path:
+    """Hourly rollup file for a UTC day."""
+    return ROLLUPS_DIR / f"{day.isoformat()}.hourly.json"
+
+
+def _read_json(path: Path) -> dict[str, Any] | None:
+    """Read a JSON object, or None if missing or unreadable."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else None
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _write_json_atomic(path: Path, data: dict[str, Any]) -> None:
+    """Write compact JSON to a temp file and rename it over the target."""
+    tmp_file = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp_file, path)
+
+
+def _empty_rollup() -> dict[str, Any]:
+    """Daily rollup of a partition with nothing consumed yet."""
+    return {
+        "version": ROLLUP_VERSION,
+        "offset": 0,
+        "first_ts": None,
+        "last_ts": None,
+        "daily": {},
+    }
+
+
+def _empty_hourly_rollup() -> dict[str, Any]:
+    """Hourly rollup of a partition with nothing consumed yet."""
+    return {
+        "version": ROLLUP_VERSION,
+        "offset": 0,
+        "hour_ranges": {},
+        "hourly": {},
+    }
+
+
+def _current(rollup: dict[str, Any] | None, size: int) -> bool:
+    """Whether a loaded rollup covers exactly `size` bytes of its partition."""
+    return (
+        rollup is not None
+        and rollup.get("version") == ROLLUP_VERSION
+        and rollup.get("offset") == size
+    )
+
+
+def row_key(agent: str, project: str | None, role: str) -> str:
+    """Row key for an (agent, project, role) combination."""
+    return "\t".join((agent, project or NO_PROJECT, role))
+
+
+def event_key(event: dict[str, Any]) -> str:
+    """Rollup row key of an event (its own role, if it carries one)."""
+    return row_key(
+        event["agent"], event.get("project"), event.get("role") or UNRESOLVED_ROLE
+    )
+
+
+def resolve_role(key: str, roles: dict[str, str]) -> str:
+    """Fill in the agent's role (from agent_roles()) on a row key without one."""
+    agent, project, role = key.split("\t")
+    if role != UNRESOLVED_ROLE:
+        return key
+    return row_key(agent, project, roles.get(agent, UNKNOWN_ROLE))
+
+
+def resolve_rows(
+    rows: dict[str, dict[str, float]], roles: dict[str, str]
+) -> dict[str, dict[str, float]]:
+    """Rollup rows with roles resolved, merging rows that end up alike."""
+    resolved: dict[str, dict[str, float]] = {}
+    for key, row in rows.items():
+        _merge_row(resolved.setdefault(resolve_role(key, roles), {}), row)
+    return resolved
+
+
+def _add_event(row: dict[str, float], event: dict[str, Any]) -> None:
+    """Fold one event into an aggregate row."""
+    kind = event["type"]
+    row[kind] = row.get(kind, 0) + 1
+    if kind in TIMED_TYPES and isinstance(event.get("duration_s"), (int, float)):
+        key = f"{kind}_duration_s"
+        row[key] = row.get(key, 0) + event["duration_s"]
+
+
+def _merge_row(total: dict[str, float], row: dict[str, float]) -> None:
+    """Add an aggregate row into a running total."""
+    for key, value in row.items():
+        total[key] = total.get(key, 0) + value
+
+
+def update_day_rollup(day: date, with_hourly: bool = False) -> dict[str, Any]:
+    """
+    Fold events appended to a day partition since the last update.
+
+    Args:
+        day: UTC day of the partition
+        with_hourly: Also return "hour_ranges" and "hourly"
+
+    Returns:
+        The up-to-date daily rollup, merged with the hourly one if requested
+    """
+    path = partition_path(day)
+    try:
+        size = path.stat().st_size
+    except OSError:
+        return {**_empty_rollup(), **_empty_hourly_rollup()}
+    rollup = _read_json(rollup_path(day))
+    if rollup is not None and _current(rollup, size):
+        if not with_hourly:
+            return rollup
+        hourly = _read_json(hourly_rollup_path(day))
+        if hourly is not None and _current(hourly, size):
+            return {**rollup, **hourly}
+
+    ROLLUPS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(rollup_path(day).with_suffix(".lock"), "a", encoding="utf-8") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            rollup = _read_json(rollup_path(day))
+            hourly = _read_json(hourly_rollup_path(day))
+            if (
+                rollup is None
+                or hourly is None
+                or rollup.get("version") != ROLLUP_VERSION
+                or hourly.get("version") != ROLLUP_VERSION
+                or rollup["offset"] != hourly["offset"]
+                or rollup["offset"] > size
+            ):
+                rollup, hourly = _empty_rollup(), _empty_hourly_rollup()
+            if rollup["offset"] < size:
+                _fold_partition(path, rollup, hourly)
+                _write_json_atomic(hourly_rollup_path(day), hourly)
+                _write_json_atomic(rollup_path(day), rollup)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+    return {**rollup, **hourly} if with_hourly else rollup
+
+
+def _fold_partition(
+    path: Path, rollup: dict[str, Any], hourly_rollup: dict[str, Any]
+) -> None:
+    """Fold complete lines from rollup["offset"] to the end of a partition."""
+    daily = rollup["daily"]
+    hourly, hour_ranges = hourly_rollup["hourly"], hourly_rollup["hour_ranges"]
+    with open(path, "rb") as f:
+        f.seek(rollup["offset"])
+        position = rollup["offset"]
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            line_start = position
+            position += len(raw)
+            try:
+                event = json.loads(raw)
+                ts = event["ts"]
+                hour = ts[11:13]
+                key = event_key(event)
+            except (ValueError, KeyError, TypeError):
+                continue
+            _add_event(hourly.setdefault(hour, {}).setdefault(key, {}), event)
+            _add_event(daily.setdefault(key, {}), event)
+            byte_range = hour_ranges.setdefault(hour, [line_start, position])
+            byte_range[0] = min(byte_range[0], line_start)
+            byte_range[1] = max(byte_range[1], position)
+            if rollup["first_ts"] is None or ts < rollup["first_ts"]:
+                rollup["first_ts"] = ts
+            if rollup["last_ts"] is None or ts > rollup["last_ts"]:
+                rollup["last_ts"] = ts
+        rollup["offset"] = hourly_rollup["offset"] = position
+
+
+def rebuild_rollups() -> dict[str, Any]:
+    """Drop all rollups, then roll every partition up again."""
+    if ROLLUPS_DIR.exists():
+        for stale in ROLLUPS_DIR.glob("*.json"):
+            stale.unlink()
+    days = sorted(
+        date.fromisoformat(p.name[: -len(".jsonl")]) for p in EVENTS_DIR.glob("*.jsonl")
+    )
+    for day in days:
+        update_day_rollup(day)
+    return {"partitions": len(days), "agents_with_role": len(agent_roles())}
+
+
+def _matches(key: str, filters: dict[str, str | None]) -> bool:
+    """Whether a row key matches agent/project/role filters (None = any)."""
+    parts = dict(zip(DIMENSIONS, key.split("\t")))
+    return all(value is None or parts[dim] == value for dim, value in filters.items())
+
+
+def _group(key: str, by: str | None) -> str:
+    """Group label of a row key (the whole window when by is None)."""
+    if by is None:
+        return "*"
+    return dict(zip(DIMENSIONS, key.split("\t")))[by]
+
+
+def rollup_window(
+    start: datetime,
+    end: datetime,
+    agent: str | None = None,
+    project: str | None = None,
+    role: str | None = None,
+    by: str | None = None,
+) -> dict[str, Any]:
+    """
+    Aggregate events in [start, end) from rollups plus raw edge events.
+
+    Args:
+        start: Window start (aware datetime)
+        end: Window end (aware datetime)
+        agent: Only this agent
+        project: Only this project ("" for events without one)
+        role: Only this role
+        by: Group results by "agent", "project" or "role" (default: one group)
+
+    Returns:
+        {"groups": {label: row}, "partitions": n,
+         "buckets": {"daily": n, "hourly": n, "raw_events": n}}
+    """
+    filters = {"agent": agent, "project": project, "role": role}
+    groups: dict[str, dict[str, float]] = {}
+    buckets = {"daily": 0, "hourly": 0, "raw_events": 0}
+    start_ts, end_ts = iso_utc(start), iso_utc(end)
+    days = partition_days(start, end)
+    roles = agent_roles()
+
+    def add_rows(rows: dict[str, dict[str, float]]) -> None:
+        for key, row in resolve_rows(rows, roles).items():
+            if _matches(key, filters):
+                _merge_row(groups.setdefault(_group(key, by), {}), row)
+
+    for day in days:
+        rollup = update_day_rollup(day)
+        if rollup["first_ts"] is None:
+            continue
+        if start_ts <= rollup["first_ts"] and rollup["last_ts"] < end_ts:
+            add_rows(rollup["daily"])
+            buckets["daily"] += 1
+            continue
+        rollup = update_day_rollup(day, with_hourly=True)
+        for hour, rows in rollup["hourly"].items():
+            hour_start = iso_utc(parse_ts(f"{day.isoformat()}T{hour}:00:00Z"))
+            hour_end = iso_utc(parse_ts(hour_start) + timedelta(hours=1))
+            if hour_end <= start_ts or hour_start >= end_ts:
+                continue
+            if start_ts <= hour_start and hour_end <= end_ts:
+                add_rows(rows)
+                buckets["hourly"] += 1
+                continue
+            # Partial hour on a window edge: read just this hour's bytes
+            first, last = rollup["hour_ranges"][hour]
+            with open(partition_path(day), "rb") as f:
+                f.seek(first)
+                chunk = f.read(last - first)
+            for raw in chunk.splitlines():
+                try:
+                    event = json.loads(raw)
+                    ts = event["ts"]
+                    event_hour = ts[11:13]
+                    key = resolve_role(event_key(event), roles)
+                except (ValueError, KeyError, TypeError):
+                    continue
+                if event_hour != hour or not start_ts <= ts < end_ts:
+                    continue
+                if _matches(key, filters):
+                    _add_event(groups.setdefault(_group(key, by), {}), event)
+                    buckets["raw_events"] += 1
+
+    return {"groups": groups, "partitions": len(days), "buckets": buckets}
+
+
+def main() -> int:
+    """Main entry point.
+
+    Returns:
+        Exit code: 0 for success, 1 for error
+    """
+    parser = argparse.ArgumentParser(description="ECOS metrics rollups")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    update_parser = subparsers.add_parser(
+        "update", help="Fold new events into the rollups"
+    )
+    update_parser.add_argument("--day", help="Only this UTC day (YYYY-MM-DD)")
+
+    subparsers.add_parser("rebuild", help="Recompute all rollups from the event log")
+
+    query_parser = subparsers.add_parser("query", help="Aggregate a window")
+    query_parser.add_argument(
+        "--period", type=int, default=7, help="Days back from now (default: 7)"
+    )
+    query_parser.add_argument("--agent", help="Only this agent")
+    query_parser.add_argument("--project", help="Only this project")
+    query_parser.add_argument("--role", help="Only this role")
+    query_parser.add_argument(
+        "--by", choices=DIMENSIONS, help="Group results by this dimension"
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "update":
+        if args.day:
+            days = [date.fromisoformat(args.day)]
+        else:
+            days = sorted(
+                date.fromisoformat(p.name[: -len(".jsonl")])
+                for p in EVENTS_DIR.glob("*.jsonl")
+            )
+        events = 0
+        for day in days:
+            rollup = update_day_rollup(day)
+            events += sum(
+                int(v)
+                for row in rollup["daily"].values()
+                for k, v in row.items()
+                if not k.endswith("_duration_s")
+            )
+        result: dict[str, Any] = {
+            "success": True,
+            "partitions": len(days),
+            "events": events,
+        }
+    elif args.command == "rebuild":
+        result = {"success": True, **rebuild_rollups()}
+    else:
+        end = datetime.now(timezone.utc)
+        start = end - timedelta(days=args.period)
+        result = {
+            "success": True,
+            "period": {"start": iso_utc(start), "end": iso_utc(end)},
+            "filters": {
+                "agent": args.agent,
+                "project": args.project,
+                "role": args.role,
+            },
+            **rollup_window(start, end, args.agent, args.project, args.role, args.by),
+        }
+
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
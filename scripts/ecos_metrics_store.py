@@ -0,0 +1,578 @@
+#!/usr/bin/env python3
+"""
+ecos_metrics_store.py - Append-only, day-partitioned agent metrics event log.
+
+ECOS scripts record one event per line:
+
+    {"ts": "2025-02-01T10:30:00.123456Z", "type": "task_completed",
+     "agent": "svgbbox-prog-01", "project": "svgbbox", "task_id": "TASK-7",
+     "task_type": "implementation", "duration_s": 5400}
+
+into ~/.ecos/metrics/events/YYYY-MM-DD.jsonl (UTC day of the event;
+override the root with ECOS_METRICS_DIR). Writers only append a single
+line with O_APPEND, so recording never waits on a lock and never rewrites
+history.
+
+Each partition has two sidecar indexes, extended incrementally from the
+last indexed byte whenever the partition is read:
+
+    YYYY-MM-DD.idx.json      event counts per agent, project and type,
+                             first/last timestamp, indexed size, and
+                             each agent's latest role in the partition
+    YYYY-MM-DD.offsets.json  byte offsets of each agent's and project's
+                             events (posting lists)
+
+Queries only open the partitions that overlap the window. Counts for a
+partition wholly inside the window come from its index; partitions on
+the window edges, and any query that needs the events themselves, read
+only the lines the posting lists point at.
+
+An agent's role is the "role" of its latest event carrying one (spawns
+record it); agent_roles() merges the partition indexes, so the answer
+depends only on the events, not on which partitions were read before.
+
+Dependencies: Python 3.8+ stdlib only
+
+Usage:
+    ecos_metrics_store.py record TYPE --agent NAME [--project ID] [--role ROLE]
+        [--task-id ID] [--task-type TYPE] [--duration SECONDS] [--detail TEXT]
+    ecos_metrics_store.py query [--period DAYS] [--agent NAME] [--project ID]
+        [--events] [--limit N]
+    ecos_metrics_store.py reindex [--day YYYY-MM-DD]
+
+Exit codes:
+    0 - Success
+    1 - Error (invalid event type, unreadable store)
+"""
+
+from __future__ import annotations
+
+import argparse
+import fcntl
+import json
+import os
+import re
+import sys
+import uuid
+from collections import Counter
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+METRICS_DIR = Path(
+    os.environ.get("ECOS_METRICS_DIR", str(Path.home() / ".ecos" / "metrics"))
+)
+EVENTS_DIR = METRICS_DIR / "events"
+
+EVENT_TYPES = (
+    "task_started",
+    "task_completed",
+    "task_failed",
+    "message_sent",
+    "message_received",
+    "agent_spawned",
+    "error",
+)
+
+# Optional event fields kept in the log (anything else goes under "detail")
+EVENT_FIELDS = ("task_id", "task_type", "duration_s", "role", "peer", "detail")
+
+INDEX_VERSION = 2
+
+# Index key for events without a project
+NO_PROJECT = ""
+
+
+def iso_utc(moment: datetime) -> str:
+    """Format a datetime as the store's UTC timestamp ("...Z").
+
+    Always with microseconds: timestamps are compared as strings, which
+    only orders them correctly when every one has the same width.
+    """
+    utc = moment.astimezone(timezone.utc)
+    return utc.isoformat(timespec="microseconds").replace("+00:00", "Z")
+
+
+def parse_ts(ts: str) -> datetime:
+    """Parse a store timestamp into an aware UTC datetime."""
+    return datetime.fromisoformat(ts.replace("Z", "+00:00"))
+
+
+def partition_path(day: date) -> Path:
+    """Event log partition for a UTC day."""
+    return EVENTS_DIR / f"{day.isoformat()}.jsonl"
+
+
+def record_event(
+    event_type: str,
+    agent: str,
+    project: str | None = None,
+    timestamp: datetime | None = None,
+    **fields: Any,
+) -> bool:
+    """
+    Append one event to the log.
+
+    Recording is best effort: failures are swallowed so that metrics never
+    break the operation being measured.
+
+    Args:
+        event_type: One of EVENT_TYPES
+        agent: Agent session name the event belongs to
+        project: Project ID, if any
+        timestamp: Event time (default: now)
+        **fields: Optional EVENT_FIELDS (task_id, task_type, duration_s, ...)
+
+    Returns:
+        True if the event was written
+    """
+    if event_type not in EVENT_TYPES:
+        return False
+    moment = timestamp or datetime.now(timezone.utc)
+    event: dict[str, Any] = {
+        "ts": iso_utc(moment),
+        "type": event_type,
+        "agent": agent,
+        "project": project or None,
+    }
+    for key, value in fields.items():
+        if value is not None:
+            event[key if key in EVENT_FIELDS else "detail"] = value
+    line = json.dumps(event, separators=(",", ":")) + "\n"
+    try:
+        EVENTS_DIR.mkdir(parents=True, exist_ok=True)
+        path = partition_path(moment.astimezone(timezone.utc).date())
+        # One write() on an O_APPEND descriptor: lines never interleave
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+        return True
+    except OSError:
+        return False
+
+
+def _empty_index() -> dict[str, Any]:
+    """Index of an empty partition."""
+    return {
+        "version": INDEX_VERSION,
+        "size": 0,
+        "events": 0,
+        "first_ts": None,
+        "last_ts": None,
+        "counts": {},
+        "roles": {},
+    }
+
+
+def _read_json(path: Path) -> dict[str, Any] | None:
+    """Read a JSON object, or None if missing or unreadable."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else None
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _write_json_atomic(path: Path, data: dict[str, Any]) -> None:
+    """Write compact JSON to a temp file and rename it over the target."""
+    tmp_file = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp_file, path)
+
+
+def load_partition_index(
+    day: date, with_offsets: bool = False
+) -> tuple[dict[str, Any], dict[str, Any] | None]:
+    """
+    Return a partition's index, indexing any events appended since last time.
+
+    Only the bytes after the indexed size are parsed. A trailing line
+    without a newline (a write in progress) is left for the next call.
+
+    Args:
+        day: UTC day of the partition
+        with_offsets: Also return the posting lists
+
+    Returns:
+        (index, offsets) where offsets is None unless requested
+    """
+    path = partition_path(day)
+    idx_path = path.with_suffix(".idx.json")
+    offsets_path = path.with_suffix(".offsets.json")
+    try:
+        size = path.stat().st_size
+    except OSError:
+        empty_offsets: dict[str, Any] | None = (
+            {"agents": {}, "projects": {}} if with_offsets else None
+        )
+        return _empty_index(), empty_offsets
+
+    index = _read_json(idx_path)
+    if index is not None and index.get("version") == INDEX_VERSION and (
+        index["size"] == size
+    ):
+        offsets = _read_json(offsets_path) if with_offsets else None
+        if not with_offsets or offsets is not None:
+            return index, offsets
+
+    with open(path.with_suffix(".lock"), "a", encoding="utf-8") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            index = _read_json(idx_path)
+            offsets = _read_json(offsets_path)
+            if (
+                index is None
+                or offsets is None
+                or index.get("version") != INDEX_VERSION
+                or index["size"] > size
+            ):
+                index, offsets = _empty_index(), {"agents": {}, "projects": {}}
+            if index["size"] < size:
+                _extend_index(path, index, offsets)
+                _write_json_atomic(offsets_path, offsets)
+                _write_json_atomic(idx_path, index)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+    return index, (offsets if with_offsets else None)
+
+
+def _extend_index(path: Path, index: dict[str, Any], offsets: dict[str, Any]) -> None:
+    """Index complete lines from index["size"] to the end of the partition."""
+    counts, roles = index["counts"], index["roles"]
+    agent_offsets = offsets["agents"]
+    project_offsets = offsets["projects"]
+    with open(path, "rb") as f:
+        f.seek(index["size"])
+        position = index["size"]
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            line_start = position
+            position += len(raw)
+            try:
+                event = json.loads(raw)
+                agent, kind = event["agent"], event["type"]
+                ts = event["ts"]
+            except (ValueError, KeyError, TypeError):
+                continue
+            project = event.get("project") or NO_PROJECT
+            by_type = counts.setdefault(agent, {}).setdefault(project, {})
+            by_type[kind] = by_type.get(kind, 0) + 1
+            agent_offsets.setdefault(agent, []).append(line_start)
+            project_offsets.setdefault(project, []).append(line_start)
+            index["events"] += 1
+            if event.get("role"):
+                latest = roles.get(agent)
+                if latest is None or ts >= latest[0]:
+                    roles[agent] = [ts, event["role"]]
+            if index["first_ts"] is None or ts < index["first_ts"]:
+                index["first_ts"] = ts
+            if index["last_ts"] is None or ts > index["last_ts"]:
+                index["last_ts"] = ts
+        index["size"] = position
+
+
+def agent_roles() -> dict[str, str]:
+    """
+    Latest role recorded for each agent, across every partition.
+
+    Costs a stat and a small index read per partition; partitions with
+    new events are indexed first.
+    """
+    latest: dict[str, list[str]] = {}
+    for path in EVENTS_DIR.glob("*.jsonl"):
+        index, _ = load_partition_index(date.fromisoformat(path.name[: -len(".jsonl")]))
+        for agent, (ts, role) in index["roles"].items():
+            if agent not in latest or [ts, role] > latest[agent]:
+                latest[agent] = [ts, role]
+    return {agent: role for agent, (_, role) in latest.items()}
+
+
+def partition_days(start: datetime, end: datetime) -> list[date]:
+    """UTC days with an existing partition overlapping [start, end)."""
+    first = start.astimezone(timezone.utc).date()
+    last = end.astimezone(timezone.utc).date()
+    days = []
+    day = first
+    while day <= last:
+        if partition_path(day).exists():
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def _filtered_counts(
+    index: dict[str, Any], agent: str | None, project: str | None
+) -> Counter[str]:
+    """Sum an index's per-type counts matching the agent/project filters."""
+    totals: Counter[str] = Counter()
+    agents = [agent] if agent is not None else list(index["counts"])
+    for name in agents:
+        projects = index["counts"].get(name, {})
+        keys = [project] if project is not None else list(projects)
+        for key in keys:
+            totals.update(projects.get(key, {}))
+    return totals
+
+
+def _covered(index: dict[str, Any], start: datetime, end: datetime) -> bool:
+    """Whether every event of a partition lies inside [start, end)."""
+    if index["first_ts"] is None:
+        return True
+    return parse_ts(index["first_ts"]) >= start and parse_ts(index["last_ts"]) < end
+
+
+def _line_offsets(
+    offsets: dict[str, Any], agent: str | None, project: str | None
+) -> list[int] | None:
+    """Offsets of lines matching the filters (None means every line)."""
+    if agent is None and project is None:
+        return None
+    selected: set[int] | None = None
+    if agent is not None:
+        selected = set(offsets["agents"].get(agent, []))
+    if project is not None:
+        by_project = set(offsets["projects"].get(project, []))
+        selected = by_project if selected is None else selected & by_project
+    return sorted(selected or ())
+
+
+def _read_partition(
+    day: date,
+    index: dict[str, Any],
+    line_offsets: list[int] | None,
+    prefilter: re.Pattern[bytes] | None = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Yield indexed events of a partition, all or only those at offsets.
+
+    Lines the `prefilter` pattern does not match are skipped unparsed.
+    """
+    with open(partition_path(day), "rb") as f:
+        if line_offsets is None:
+            remaining = index["size"]
+            for raw in f:
+                remaining -= len(raw)
+                if remaining < 0:
+                    break
+                if prefilter is not None and not prefilter.search(raw):
+                    continue
+                try:
+                    yield json.loads(raw)
+                except ValueError:
+                    continue
+            return
+        for offset in line_offsets:
+            f.seek(offset)
+            raw = f.readline()
+            if prefilter is not None and not prefilter.search(raw):
+                continue
+            try:
+                yield json.loads(raw)
+            except ValueError:
+                continue
+
+
+def iter_events(
+    start: datetime,
+    end: datetime,
+    agent: str | None = None,
+    project: str | None = None,
+    types: set[str] | None = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Yield events in [start, end) matching the filters, partition by partition.
+
+    Agent/project filters are resolved through the posting lists, so only
+    matching lines are read and parsed.
+
+    Args:
+        start: Window start (aware datetime)
+        end: Window end (aware datetime)
+        agent: Only this agent's events
+        project: Only this project's events ("" for events without one)
+        types: Only these event types
+    """
+    start_ts, end_ts = iso_utc(start), iso_utc(end)
+    filtered = agent is not None or project is not None
+    # Cheap byte test before parsing: a quoted type name must appear
+    prefilter = None
+    if types is not None:
+        names = b"|".join(re.escape(t.encode()) for t in sorted(types))
+        prefilter = re.compile(b'"(?:' + names + b')"')
+    for day in partition_days(start, end):
+        index, offsets = load_partition_index(day, with_offsets=filtered)
+        line_offsets = _line_offsets(offsets, agent, project) if offsets else None
+        for event in _read_partition(day, index, line_offsets, prefilter):
+            if not start_ts <= event.get("ts", "") < end_ts:
+                continue
+            if types is not None and event.get("type") not in types:
+                continue
+            yield event
+
+
+def count_events(
+    start: datetime,
+    end: datetime,
+    agent: str | None = None,
+    project: str | None = None,
+) -> dict[str, Any]:
+    """
+    Count events per type in [start, end) matching the filters.
+
+    Returns:
+        {"counts": {type: n}, "partitions": n, "scanned_partitions": n}
+        where scanned partitions are edge partitions read line by line
+    """
+    totals: Counter[str] = Counter()
+    partitions = scanned = 0
+    for day in partition_days(start, end):
+        index, _ = load_partition_index(day)
+        partitions += 1
+        if _covered(index, start, end):
+            totals.update(_filtered_counts(index, agent, project))
+            continue
+        scanned += 1
+        _, offsets = load_partition_index(day, with_offsets=True)
+        start_ts, end_ts = iso_utc(start), iso_utc(end)
+        line_offsets = _line_offsets(offsets or {}, agent, project)
+        for event in _read_partition(day, index, line_offsets):
+            if start_ts <= event.get("ts", "") < end_ts:
+                totals[event.get("type", "")] += 1
+    return {
+        "counts": dict(totals),
+        "partitions": partitions,
+        "scanned_partitions": scanned,
+    }
+
+
+def recent_events(
+    start: datetime,
+    end: datetime,
+    limit: int,
+    agent: str | None = None,
+    project: str | None = None,
+) -> list[dict[str, Any]]:
+    """Newest events in [start, end) matching the filters, newest first."""
+    start_ts, end_ts = iso_utc(start), iso_utc(end)
+    newest: list[dict[str, Any]] = []
+    for day in reversed(partition_days(start, end)):
+        _, offsets = load_partition_index(day, with_offsets=True)
+        line_offsets = _line_offsets(offsets or {}, agent, project)
+        if line_offsets is None:
+            line_offsets = sorted(
+                o for offs in (offsets or {}).get("agents", {}).values() for o in offs
+            )
+        # Walk the posting list backwards until enough events are found
+        with open(partition_path(day), "rb") as f:
+            for offset in reversed(line_offsets):
+                f.seek(offset)
+                try:
+                    event = json.loads(f.readline())
+                except ValueError:
+                    continue
+                if start_ts <= event.get("ts", "") < end_ts:
+                    newest.append(event)
+                    if len(newest) >= limit:
+                        return newest
+    return newest
+
+
+def reindex(days: list[date] | None = None) -> dict[str, Any]:
+    """Drop and rebuild the indexes of some (default: all) partitions."""
+    if days is None:
+        days = sorted(
+            date.fromisoformat(p.name[: -len(".jsonl")])
+            for p in EVENTS_DIR.glob("*.jsonl")
+        )
+    events = 0
+    for day in days:
+        path = partition_path(day)
+        for sidecar in (".idx.json", ".offsets.json"):
+            path.with_suffix(sidecar).unlink(missing_ok=True)
+        index, _ = load_partition_index(day)
+        events += index["events"]
+    return {"partitions": len(days), "events": events}
+
+
+def main() -> int:
+    """Main entry point.
+
+    Returns:
+        Exit code: 0 for success, 1 for error
+    """
+    parser = argparse.ArgumentParser(description="ECOS agent metrics event log")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="Append an event")
+    record_parser.add_argument("type", choices=EVENT_TYPES, help="Event type")
+    record_parser.add_argument("--agent", required=True, help="Agent session name")
+    record_parser.add_argument("--project", help="Project ID")
+    record_parser.add_argument("--role", help="Agent role")
+    record_parser.add_argument("--task-id", help="Task ID")
+    record_parser.add_argument("--task-type", help="Task type (implementation, ...)")
+    record_parser.add_argument(
+        "--duration", type=float, help="Task duration in seconds"
+    )
+    record_parser.add_argument("--detail", help="Free-form detail")
+
+    query_parser = subparsers.add_parser("query", help="Count or list events")
+    query_parser.add_argument(
+        "--period", type=int, default=7, help="Days back from now (default: 7)"
+    )
+    query_parser.add_argument("--agent", help="Only this agent")
+    query_parser.add_argument("--project", help="Only this project")
+    query_parser.add_argument(
+        "--events", action="store_true", help="List the newest events too"
+    )
+    query_parser.add_argument(
+        "--limit", type=int, default=20, help="Events to list (default: 20)"
+    )
+
+    reindex_parser = subparsers.add_parser("reindex", help="Rebuild indexes")
+    reindex_parser.add_argument("--day", help="Only this UTC day (YYYY-MM-DD)")
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        ok = record_event(
+            args.type,
+            args.agent,
+            args.project,
+            role=args.role,
+            task_id=args.task_id,
+            task_type=args.task_type,
+            duration_s=args.duration,
+            detail=args.detail,
+        )
+        result: dict[str, Any] = {"success": ok}
+        if not ok:
+            result["error"] = f"Failed to write to {EVENTS_DIR}"
+    elif args.command == "query":
+        end = datetime.now(timezone.utc)
+        start = end - timedelta(days=args.period)
+        result = {
+            "success": True,
+            "period": {"start": iso_utc(start), "end": iso_utc(end)},
+            "filters": {"agent": args.agent, "project": args.project},
+            **count_events(start, end, args.agent, args.project),
+        }
+        if args.events:
+            result["events"] = recent_events(
+                start, end, args.limit, args.agent, args.project
+            )
+    else:
+        days = [date.fromisoformat(args.day)] if args.day else None
+        result = {"success": True, **reindex(days)}
+
+    print(json.dumps(result, indent=2))
+    return 0 if result["success"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
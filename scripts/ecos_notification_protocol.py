@@ -9,29 +9,66 @@ Features:
 - Wait for acknowledgments with reminder messages
 - Broadcast notifications based on agent attributes (role, project)
 - Skill installation with multi-phase notification workflow
+- Wake-on-message delivery for hibernated agents
+
+Wake-on-message (--wake-hibernated): the target's lifecycle status is read
+from a short-lived cache (~/.ecos/agent-status-cache.json). Messages to a
+hibernated agent are queued in ~/.ecos/wake-queue/<agent>.jsonl and the
+first sender triggers a single background wake (concurrent senders only
+queue). Once the agent reports ready (a 'ready' message or the
+agent-ready command), or READY_TIMEOUT passes after the wake, the queue
+is flushed in order. A wake that finds the agent already active (someone
+else woke it) counts as woken. While a queue file exists, new messages go
+through it whatever the cached status says, so none overtakes the backlog.
+wait-ack starts its timeout clock when the wake completes.
 
 Usage:
     python ecos_notification_protocol.py notify --agents agent1,agent2 --operation install --message "Installing skill X"
     python ecos_notification_protocol.py wait-ack --agent agent1 --timeout 120 --remind 30
     python ecos_notification_protocol.py broadcast --subject "Update" --message "..." --priority high --agents a,b,c
     python ecos_notification_protocol.py install-skill --agent agent1 --skill my-skill --wait-for-ok
+    python ecos_notification_protocol.py notify --agents agent1 --operation update --message "..." --wake-hibernated
+    python ecos_notification_protocol.py agent-ready --agent agent1
 
 Output: JSON format
 """
 
 import argparse
+import fcntl
 import json
 import os
 import subprocess
 import sys
 import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime, timezone
+from pathlib import Path
+
+from ecos_metrics_store import record_event
 
 # Default timeouts and intervals
 DEFAULT_TIMEOUT = 120
 DEFAULT_REMIND_INTERVAL = 30
 DEFAULT_POLL_INTERVAL = 5
 
+# Wake-on-message state
+ECOS_STATE_DIR = Path.home() / ".ecos"
+STATUS_CACHE_FILE = ECOS_STATE_DIR / "agent-status-cache.json"
+WAKE_QUEUE_DIR = ECOS_STATE_DIR / "wake-queue"
+WAKE_SCRIPT = Path(__file__).parent / "ecos_wake_agent.py"
+HIBERNATED_STATUSES = frozenset({"hibernated", "sleeping"})
+
+# Seconds a cached agent status is trusted before re-listing agents
+STATUS_CACHE_TTL = 30
+# Seconds to wait for a woken agent to report ready before flushing anyway
+READY_TIMEOUT = 120
+# A wake still marked in progress after this many seconds is retried
+WAKE_STALE_SECONDS = 600
+# Wake states during which messages are queued rather than sent
+WAKE_PENDING_STATES = frozenset({"waking", "woken"})
+
 
 def _send_message(
     to: str,
@@ -78,7 +115,16 @@ def _send_message(
         text=True,
         timeout=30,
     )
-    return result.returncode == 0
+    if result.returncode != 0:
+        return False
+
+    sender = os.getenv("SESSION_NAME", "chief-of-staff")
+    # Both events belong to the target's project, so per-project reports
+    # count the traffic of the agents they cover
+    project = get_agent_project(to)
+    record_event("message_sent", sender, project, peer=to, detail=msg_type)
+    record_event("message_received", to, project, peer=sender, detail=msg_type)
+    return True
 
 
 def _get_messages(agent: str, status: str = "unread") -> list[dict[str, object]]:
@@ -141,8 +187,355 @@ def _list_agents_via_script() -> list[dict[str, object]]:
     return []
 
 
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive flock on a lock file for the duration of the block."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _write_json_atomic(path: Path, data: dict[str, object]) -> None:
+    """Write JSON to a temp file and rename it over the target."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_file, path)
+
+
+def _read_json(path: Path) -> dict[str, object]:
+    """Read a JSON object, returning {} if missing or unreadable."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _agent_cache() -> dict[str, object]:
+    """
+    Cached agent map: {"fetched_at", "agents": {name: status}, "projects": {...}}.
+
+    The map is rebuilt from aimaestro-agent.sh at most once per
+    STATUS_CACHE_TTL seconds; concurrent callers wait for one refresh.
+    """
+    cache = _read_json(STATUS_CACHE_FILE)
+    fetched_at = cache.get("fetched_at", 0)
+    if not isinstance(fetched_at, (int, float)) or (
+        time.time() - fetched_at > STATUS_CACHE_TTL
+    ):
+        with _file_lock(STATUS_CACHE_FILE.with_suffix(".lock")):
+            cache = _read_json(STATUS_CACHE_FILE)
+            fetched_at = cache.get("fetched_at", 0)
+            if not isinstance(fetched_at, (int, float)) or (
+                time.time() - fetched_at > STATUS_CACHE_TTL
+            ):
+                listed = [
+                    info
+                    for info in _list_agents_via_script()
+                    if info.get("session_name")
+                ]
+                cache = {
+                    "fetched_at": time.time(),
+                    "agents": {
+                        str(info["session_name"]): str(info.get("status", "")).lower()
+                        for info in listed
+                    },
+                    "projects": {
+                        str(info["session_name"]): str(info["project"])
+                        for info in listed
+                        if info.get("project")
+                    },
+                }
+                _write_json_atomic(STATUS_CACHE_FILE, cache)
+    return cache
+
+
+def get_agent_status(agent: str) -> str | None:
+    """
+    Get an agent's lifecycle status from the cached agent map.
+
+    Args:
+        agent: Agent session name
+
+    Returns:
+        Lower-cased status, or None if the agent is unknown
+    """
+    agents = _agent_cache().get("agents", {})
+    status = agents.get(agent) if isinstance(agents, dict) else None
+    return str(status) if status else None
+
+
+def get_agent_project(agent: str) -> str | None:
+    """Get an agent's project from the cached agent map (None if unknown)."""
+    projects = _agent_cache().get("projects", {})
+    project = projects.get(agent) if isinstance(projects, dict) else None
+    return str(project) if project else None
+
+
+def _set_cached_status(agent: str, status: str) -> None:
+    """Record a status change in the cached status map."""
+    with _file_lock(STATUS_CACHE_FILE.with_suffix(".lock")):
+        cache = _read_json(STATUS_CACHE_FILE)
+        agents = cache.get("agents")
+        if isinstance(agents, dict):
+            agents[agent] = status
+            _write_json_atomic(STATUS_CACHE_FILE, cache)
+
+
+def _wake_lock_path(agent: str) -> Path:
+    """Lock serializing queue and wake state changes for one agent."""
+    return WAKE_QUEUE_DIR / f"{agent}.lock"
+
+
+def _wake_state_path(agent: str) -> Path:
+    """Wake state file: {state, requested_at, woken_at, ready_at, error}."""
+    return WAKE_QUEUE_DIR / f"{agent}.wake.json"
+
+
+def _queue_path(agent: str) -> Path:
+    """Queued messages for an agent, one JSON object per line."""
+    return WAKE_QUEUE_DIR / f"{agent}.jsonl"
+
+
+def get_wake_state(agent: str) -> dict[str, object]:
+    """Get the wake-on-message state of an agent ({} if never woken)."""
+    return _read_json(_wake_state_path(agent))
+
+
+def _wake_in_progress(state: dict[str, object]) -> bool:
+    """Whether a wake state means messages must still be queued."""
+    if state.get("state") not in WAKE_PENDING_STATES:
+        return False
+    requested_at = state.get("requested_at", 0)
+    return isinstance(requested_at, (int, float)) and (
+        time.time() - requested_at < WAKE_STALE_SECONDS + READY_TIMEOUT
+    )
+
+
+def _append_to_queue(agent: str, payload: dict[str, object]) -> None:
+    """Append a message to an agent's queue (caller holds the wake lock)."""
+    with open(_queue_path(agent), "a", encoding="utf-8") as f:
+        f.write(json.dumps(payload) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _queue_and_wake(agent: str, payload: dict[str, object]) -> bool:
+    """
+    Queue a message for a hibernated agent and trigger its wake once.
+
+    The wake is started only if no other sender already started one, so
+    any number of concurrent senders produce a single wake.
+
+    Returns:
+        True if this call started the wake
+    """
+    with _file_lock(_wake_lock_path(agent)):
+        _append_to_queue(agent, payload)
+        state = get_wake_state(agent)
+        if _wake_in_progress(state):
+            return False
+        _write_json_atomic(
+            _wake_state_path(agent), {"state": "waking", "requested_at": time.time()}
+        )
+
+    try:
+        subprocess.Popen(
+            [
+                sys.executable,
+                str(Path(__file__).resolve()),
+                "wake-flush",
+                "--agent",
+                agent,
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError as e:
+        with _file_lock(_wake_lock_path(agent)):
+            _write_json_atomic(
+                _wake_state_path(agent), {"state": "failed", "error": str(e)}
+            )
+        return False
+    return True
+
+
+def flush_queue(agent: str) -> dict[str, object]:
+    """
+    Deliver an agent's queued messages in order and mark it ready.
+
+    Messages that fail to send stay queued and the agent is left in its
+    wake state, so the next flush retries them.
+
+    Returns:
+        Dict with sent and remaining counts
+    """
+    with _file_lock(_wake_lock_path(agent)):
+        queue_file = _queue_path(agent)
+        try:
+            lines = queue_file.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            lines = []
+
+        remaining: list[str] = []
+        sent = 0
+        for line in lines:
+            try:
+                payload = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if remaining or not _send_message(
+                to=agent,
+                subject=payload["subject"],
+                message=payload["message"],
+                priority=payload["priority"],
+                msg_type=payload["msg_type"],
+                require_ack=payload["require_ack"],
+            ):
+                # Keep order: everything after a failure stays queued too
+                remaining.append(line)
+            else:
+                sent += 1
+
+        if remaining:
+            queue_file.write_text("\n".join(remaining) + "\n", encoding="utf-8")
+        else:
+            queue_file.unlink(missing_ok=True)
+            state = get_wake_state(agent)
+            state.update({"state": "ready", "ready_at": time.time()})
+            _write_json_atomic(_wake_state_path(agent), state)
+
+    return {"agent": agent, "sent": sent, "remaining": len(remaining)}
+
+
+def _agent_reported_ready(agent: str) -> bool:
+    """Whether the agent sent us a 'ready' message or was marked ready."""
+    if get_wake_state(agent).get("state") == "ready":
+        return True
+    our_session = os.getenv("SESSION_NAME", "chief-of-staff")
+    for msg in _get_messages(our_session, status="unread"):
+        content = msg.get("content", {})
+        msg_type = content.get("type", "") if isinstance(content, dict) else ""
+        if msg.get("from", "") == agent and msg_type == "ready":
+            return True
+    return False
+
+
+def wake_and_flush(agent: str) -> dict[str, object]:
+    """
+    Wake a hibernated agent, wait for it to report ready, then flush its queue.
+
+    Runs in the background process started by the first queued message.
+
+    Returns:
+        Dict with the wake result and the flush summary
+    """
+    already_active = False
+    try:
+        proc = subprocess.run(
+            [sys.executable, str(WAKE_SCRIPT), agent],
+            capture_output=True,
+            text=True,
+            timeout=300,
+        )
+        woken = proc.returncode == 0
+        error = (proc.stderr or proc.stdout).strip()
+        if not woken:
+            # Someone else woke it first (e.g. within the status cache TTL)
+            try:
+                already_active = json.loads(proc.stdout).get("agent_status") == "active"
+            except (ValueError, AttributeError):
+                already_active = False
+            woken = already_active
+    except subprocess.TimeoutExpired:
+        woken, error = False, "Wake timed out after 300s"
+
+    with _file_lock(_wake_lock_path(agent)):
+        state = get_wake_state(agent)
+        if not woken:
+            # Queued messages stay; the next message to the agent retries
+            state.update({"state": "failed", "error": error[:200]})
+        else:
+            state.update({"state": "woken", "woken_at": time.time()})
+        _write_json_atomic(_wake_state_path(agent), state)
+    if not woken:
+        return {"agent": agent, "woken": False, "error": error[:200]}
+
+    _set_cached_status(agent, "active")
+    deadline = time.time() + (0 if already_active else READY_TIMEOUT)
+    while time.time() < deadline and not _agent_reported_ready(agent):
+        time.sleep(DEFAULT_POLL_INTERVAL)
+
+    return {"agent": agent, "woken": True, **flush_queue(agent)}
+
+
+def _deliver(
+    to: str,
+    subject: str,
+    message: str,
+    priority: str = "normal",
+    msg_type: str = "notification",
+    require_ack: bool = False,
+    wake_hibernated: bool = False,
+) -> str:
+    """
+    Send a message, or queue it and wake the target if it is hibernated.
+
+    While messages are still queued for the target (a wake in progress, or
+    one that failed), new messages go through the queue whatever the
+    cached status says, so nothing overtakes them.
+
+    Returns:
+        "sent", "queued" or "error: amp-send failed"
+    """
+    payload: dict[str, object] = {
+        "subject": subject,
+        "message": message,
+        "priority": priority,
+        "msg_type": msg_type,
+        "require_ack": require_ack,
+        "queued_at": time.time(),
+    }
+    backlog = _queue_path(to).exists()
+    if wake_hibernated or backlog:
+        waking = _wake_in_progress(get_wake_state(to))
+        if waking or (wake_hibernated and get_agent_status(to) in HIBERNATED_STATUSES):
+            # Queue behind earlier messages even once the agent is active
+            _queue_and_wake(to, payload)
+            return "queued"
+        if backlog:
+            # No wake pending: deliver the backlog, then this message, in order
+            with _file_lock(_wake_lock_path(to)):
+                _append_to_queue(to, payload)
+            flushed = flush_queue(to)
+            return "sent" if not flushed["remaining"] else "queued"
+
+    if _send_message(to, subject, message, priority, msg_type, require_ack):
+        return "sent"
+    return "error: amp-send failed"
+
+
+def _wait_for_wake(agent: str) -> None:
+    """Block until a wake of the agent in progress completes (or goes stale)."""
+    while _wake_in_progress(get_wake_state(agent)):
+        time.sleep(DEFAULT_POLL_INTERVAL)
+
+
 def notify_agents(
-    agents: list[str], operation: str, message: str, require_ack: bool = False
+    agents: list[str],
+    operation: str,
+    message: str,
+    require_ack: bool = False,
+    wake_hibernated: bool = False,
 ) -> dict[str, object]:
     """
     Send notification to each agent via AMP CLI.
@@ -155,32 +548,30 @@ def notify_agents(
         operation: Operation name (e.g., "install", "update", "restart")
         message: Notification message content
         require_ack: Whether to request acknowledgment from agents
+        wake_hibernated: Queue messages to hibernated agents and wake them
 
     Returns:
         Dict mapping agent names to status:
         {
             "agent1": "sent",
-            "agent2": "error: amp-send failed"
+            "agent2": "queued",
+            "agent3": "error: amp-send failed"
         }
     """
     results: dict[str, object] = {}
     subject = f"[{operation.upper()}] Notification"
 
     for agent in agents:
-        success = _send_message(
+        results[agent] = _deliver(
             to=agent,
             subject=subject,
             message=message,
             priority="normal",
             msg_type="notification",
             require_ack=require_ack,
+            wake_hibernated=wake_hibernated,
         )
 
-        if success:
-            results[agent] = "sent"
-        else:
-            results[agent] = "error: amp-send failed"
-
     return results
 
 
@@ -194,6 +585,8 @@ def wait_for_acknowledgment(
 
     Continuously polls for an acknowledgment message from the specified agent.
     Sends reminder messages at the specified interval if no ack received.
+    If the agent is being woken by wake-on-message delivery, the timeout
+    starts once the wake completes and its queued messages are delivered.
 
     Args:
         agent: Agent session name to wait for
@@ -203,6 +596,7 @@ def wait_for_acknowledgment(
     Returns:
         True if acknowledgment received, False if timeout reached
     """
+    _wait_for_wake(agent)
     start_time = time.time()
     last_remind_time = start_time
 
@@ -258,6 +652,7 @@ def broadcast_notification(
     agents: list[str] | None = None,
     role: str | None = None,
     project: str | None = None,
+    wake_hibernated: bool = False,
 ) -> dict[str, object]:
     """
     Broadcast notification to agents matching criteria.
@@ -272,14 +667,16 @@ def broadcast_notification(
         agents: Explicit list of agent session names (takes precedence)
         role: Filter agents by role (e.g., "implementer", "reviewer")
         project: Filter agents by project assignment
+        wake_hibernated: Queue messages to hibernated agents and wake them
 
     Returns:
         Dict with results:
         {
             "total_agents": 5,
-            "sent": 4,
+            "sent": 3,
+            "queued": 1,
             "failed": 1,
-            "results": {"agent1": "sent", "agent2": "error: ..."}
+            "results": {"agent1": "sent", "agent2": "queued", "agent3": "error: ..."}
         }
     """
     target_agents: list[str] = []
@@ -309,29 +706,23 @@ def broadcast_notification(
 
     # Send to all target agents
     results: dict[str, str] = {}
-    sent_count = 0
-    failed_count = 0
 
     for agent_name in target_agents:
-        success = _send_message(
+        results[agent_name] = _deliver(
             to=agent_name,
             subject=subject,
             message=message,
             priority=priority,
             msg_type="broadcast",
+            wake_hibernated=wake_hibernated,
         )
 
-        if success:
-            results[agent_name] = "sent"
-            sent_count += 1
-        else:
-            results[agent_name] = "error: amp-send failed"
-            failed_count += 1
-
+    statuses = list(results.values())
     return {
         "total_agents": len(target_agents),
-        "sent": sent_count,
-        "failed": failed_count,
+        "sent": statuses.count("sent"),
+        "queued": statuses.count("queued"),
+        "failed": len(statuses) - statuses.count("sent") - statuses.count("queued"),
         "results": results,
     }
 
@@ -533,6 +924,7 @@ def _cmd_notify(args: argparse.Namespace) -> dict[str, object]:
         operation=args.operation,
         message=args.message,
         require_ack=args.require_ack,
+        wake_hibernated=args.wake_hibernated,
     )
 
 
@@ -569,9 +961,20 @@ def _cmd_broadcast(args: argparse.Namespace) -> dict[str, object]:
         agents=agents,
         role=args.role,
         project=args.project,
+        wake_hibernated=args.wake_hibernated,
     )
 
 
+def _cmd_agent_ready(args: argparse.Namespace) -> dict[str, object]:
+    """Handle 'agent-ready' subcommand."""
+    return flush_queue(args.agent)
+
+
+def _cmd_wake_flush(args: argparse.Namespace) -> dict[str, object]:
+    """Handle 'wake-flush' subcommand (started in the background)."""
+    return wake_and_flush(args.agent)
+
+
 def _cmd_install_skill(args: argparse.Namespace) -> dict[str, object]:
     """Handle 'install-skill' subcommand."""
     return skill_install_with_notification(
@@ -600,6 +1003,10 @@ Examples:
 
   # Install skill with notification workflow
   python ecos_notification_protocol.py install-skill --agent agent1 --skill my-skill --marketplace emasoft-plugins
+
+  # Queue for hibernated agents and wake them; deliver once the agent is ready
+  python ecos_notification_protocol.py broadcast --subject "Update" --message "..." --wake-hibernated
+  python ecos_notification_protocol.py agent-ready --agent agent1
         """,
     )
 
@@ -627,6 +1034,11 @@ Examples:
     notify_parser.add_argument(
         "--require-ack", action="store_true", help="Request acknowledgment from agents"
     )
+    notify_parser.add_argument(
+        "--wake-hibernated",
+        action="store_true",
+        help="Queue messages to hibernated agents and wake them",
+    )
 
     # 'wait-ack' subcommand
     wait_parser = subparsers.add_parser(
@@ -674,6 +1086,26 @@ Examples:
     )
     broadcast_parser.add_argument("--role", help="Filter agents by role")
     broadcast_parser.add_argument("--project", help="Filter agents by project")
+    broadcast_parser.add_argument(
+        "--wake-hibernated",
+        action="store_true",
+        help="Queue messages to hibernated agents and wake them",
+    )
+
+    # 'agent-ready' subcommand
+    ready_parser = subparsers.add_parser(
+        "agent-ready",
+        help="Mark a woken agent ready and deliver its queued messages",
+    )
+    ready_parser.add_argument("--agent", "-a", required=True, help="Agent session name")
+
+    # 'wake-flush' subcommand (internal: background wake started by a sender)
+    wake_flush_parser = subparsers.add_parser(
+        "wake-flush", help="Wake an agent, wait until ready, deliver its queue"
+    )
+    wake_flush_parser.add_argument(
+        "--agent", "-a", required=True, help="Agent session name"
+    )
 
     # 'install-skill' subcommand
     install_parser = subparsers.add_parser(
@@ -717,6 +1149,10 @@ Examples:
             result = _cmd_broadcast(args)
         elif args.command == "install-skill":
             result = _cmd_install_skill(args)
+        elif args.command == "agent-ready":
+            result = _cmd_agent_ready(args)
+        elif args.command == "wake-flush":
+            result = _cmd_wake_flush(args)
         else:
             result = {"error": f"Unknown command: {args.command}"}
 
@@ -0,0 +1,249 @@
+"""
+ecos_performance_analytics.py - Strength/weakness analytics over metrics.
+
+Implements the comparative analysis described in the ecos-performance-tracking
+skill (strength-weakness-analysis.md) on top of the metrics event log:
+
+- per agent and per role: task latency percentiles, failure rate overall
+  and by task type, recovery count (tasks an agent completed after failing
+  them), and message overhead per finished task
+- z-scores of each agent against the peers sharing its role
+- trend: change against the previous period of the same length
+
+The whole organisation is analysed in one batched pass: event counts come
+from the rollups (ecos_metrics_rollup.py, grouped by agent) and a single
+scan of task events over both periods feeds every agent's distributions,
+so cost does not grow with the number of agents compared.
+
+Used by `ecos_performance_report.py --compare`.
+
+Dependencies: Python 3.8+ stdlib only
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import datetime
+from typing import Any
+
+from ecos_metrics_rollup import UNKNOWN_ROLE, rollup_window
+from ecos_metrics_store import agent_roles, iso_utc, iter_events
+
+FINISHED_TYPES = {"task_completed", "task_failed"}
+
+PERCENTILES = (50, 90, 99)
+
+# Agents with fewer finished tasks are reported but not used as peer baseline
+MIN_TASKS_FOR_PEERS = 5
+
+# |z| at or above this marks a strength or weakness
+Z_THRESHOLD = 1.0
+
+# Compared metrics: +1 when higher is better, -1 when lower is better
+COMPARED_METRICS = {
+    "tasks_completed": 1,
+    "failure_rate": -1,
+    "latency_p50_s": -1,
+    "latency_p90_s": -1,
+    "recoveries": 1,
+    "message_overhead": -1,
+}
+
+
+def percentile(sorted_values: list[float], q: float) -> float | None:
+    """
+    Linear-interpolated percentile of already sorted values.
+
+    Args:
+        sorted_values: Values in ascending order
+        q: Percentile in [0, 100]
+
+    Returns:
+        The percentile, or None for an empty list
+    """
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * q / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (
+        rank - low
+    )
+
+
+def _new_stats() -> dict[str, Any]:
+    """Empty task accumulator for one agent or role."""
+    return {
+        "completed": 0,
+        "failed": 0,
+        "durations": [],
+        "by_type": {},
+        "recoveries": 0,
+    }
+
+
+def _add_task(stats: dict[str, Any], event: dict[str, Any]) -> None:
+    """Fold a task_completed/task_failed event into an accumulator."""
+    failed = event["type"] == "task_failed"
+    stats["failed" if failed else "completed"] += 1
+    if not failed and isinstance(event.get("duration_s"), (int, float)):
+        stats["durations"].append(event["duration_s"])
+    by_type = stats["by_type"].setdefault(
+        event.get("task_type") or "unspecified", [0, 0]
+    )
+    by_type[0] += 1
+    by_type[1] += failed
+
+
+def _merge_stats(total: dict[str, Any], stats: dict[str, Any]) -> None:
+    """Pool an agent's accumulator into its role's."""
+    total["completed"] += stats["completed"]
+    total["failed"] += stats["failed"]
+    total["durations"].extend(stats["durations"])
+    total["recoveries"] += stats["recoveries"]
+    for task_type, (finished, failed) in stats["by_type"].items():
+        pooled = total["by_type"].setdefault(task_type, [0, 0])
+        pooled[0] += finished
+        pooled[1] += failed
+
+
+def _metrics(stats: dict[str, Any], counts: dict[str, float]) -> dict[str, Any]:
+    """Distribution metrics of an accumulator plus its rollup counts."""
+    finished = stats["completed"] + stats["failed"]
+    durations = sorted(stats["durations"])
+    messages = int(counts.get("message_sent", 0) + counts.get("message_received", 0))
+    metrics: dict[str, Any] = {
+        "tasks_completed": stats["completed"],
+        "tasks_failed": stats["failed"],
+        "failure_rate": None,
+    }
+    if finished:
+        metrics["failure_rate"] = round(stats["failed"] / finished * 100, 1)
+    for q in PERCENTILES:
+        value = percentile(durations, q)
+        metrics[f"latency_p{q}_s"] = None if value is None else round(value, 1)
+    return {
+        **metrics,
+        "failure_by_task_type": {
+            task_type: {
+                "finished": type_finished,
+                "failed": type_failed,
+                "failure_rate": round(type_failed / type_finished * 100, 1),
+            }
+            for task_type, (type_finished, type_failed) in sorted(
+                stats["by_type"].items()
+            )
+        },
+        "recoveries": stats["recoveries"],
+        "messages": messages,
+        "message_overhead": round(messages / finished, 2) if finished else None,
+        "errors": int(counts.get("error", 0)),
+    }
+
+
+def _baseline(members: list[dict[str, Any]]) -> dict[str, dict[str, float]]:
+    """Mean and population stdev of each compared metric across peers."""
+    baseline = {}
+    for metric in COMPARED_METRICS:
+        values = [m[metric] for m in members if m[metric] is not None]
+        if len(values) < 2:
+            continue
+        mean = sum(values) / len(values)
+        stdev = math.sqrt(sum((v - mean) ** 2 for v in values) / len(values))
+        baseline[metric] = {"mean": round(mean, 2), "stdev": round(stdev, 2)}
+    return baseline
+
+
+def analyze(
+    start: datetime, end: datetime, project: str | None = None
+) -> dict[str, Any]:
+    """
+    Analyse every agent and role active in [start, end).
+
+    Args:
+        start: Window start (aware datetime)
+        end: Window end (aware datetime)
+        project: Only events of this project
+
+    Returns:
+        {"agents": {agent: {...}}, "roles": {role: {...}}, "events_scanned": n}
+    """
+    previous_start = start - (end - start)
+    start_ts = iso_utc(start)
+    counts = rollup_window(start, end, project=project, by="agent")["groups"]
+    previous_counts = rollup_window(previous_start, start, project=project, by="agent")
+    # Roles come from the recorded spawn events, whichever windows were read
+    roles = agent_roles()
+
+    current: dict[str, dict[str, Any]] = {}
+    previous: dict[str, dict[str, Any]] = {}
+    open_failures: set[tuple[str, str]] = set()
+    scanned = 0
+    events = iter_events(previous_start, end, project=project, types=FINISHED_TYPES)
+    for event in events:
+        scanned += 1
+        agent = event["agent"]
+        period = current if event["ts"] >= start_ts else previous
+        stats = period.setdefault(agent, _new_stats())
+        _add_task(stats, event)
+        task_id = event.get("task_id")
+        if not task_id:
+            continue
+        if event["type"] == "task_failed":
+            open_failures.add((agent, task_id))
+        elif (agent, task_id) in open_failures:
+            open_failures.discard((agent, task_id))
+            stats["recoveries"] += 1
+
+    agents: dict[str, dict[str, Any]] = {}
+    role_stats: dict[str, dict[str, Any]] = {}
+    role_counts: dict[str, dict[str, float]] = {}
+    for agent in sorted(set(current) | set(counts)):
+        stats = current.get(agent, _new_stats())
+        role = roles.get(agent, UNKNOWN_ROLE)
+        entry = _metrics(stats, counts.get(agent, {}))
+        entry["role"] = role
+        before = _metrics(
+            previous.get(agent, _new_stats()),
+            previous_counts["groups"].get(agent, {}),
+        )
+        entry["trend"] = {
+            metric: round(entry[metric] - before[metric], 2)
+            for metric in COMPARED_METRICS
+            if entry[metric] is not None and before[metric] is not None
+        }
+        agents[agent] = entry
+        _merge_stats(role_stats.setdefault(role, _new_stats()), stats)
+        pooled = role_counts.setdefault(role, {})
+        for key, value in counts.get(agent, {}).items():
+            pooled[key] = pooled.get(key, 0) + value
+
+    roles_report: dict[str, dict[str, Any]] = {}
+    for role in sorted(role_stats):
+        members = [a for a in agents.values() if a["role"] == role]
+        peers = [
+            m
+            for m in members
+            if m["tasks_completed"] + m["tasks_failed"] >= MIN_TASKS_FOR_PEERS
+        ]
+        baseline = _baseline(peers)
+        role_entry = _metrics(role_stats[role], role_counts[role])
+        role_entry["agents"] = len(members)
+        role_entry["peers"] = len(peers)
+        role_entry["baseline"] = baseline
+        roles_report[role] = role_entry
+
+        for member in members:
+            member.update(zscores={}, strengths=[], weaknesses=[])
+        for peer in peers:
+            for metric, spread in baseline.items():
+                if peer[metric] is None or spread["stdev"] == 0:
+                    continue
+                z = round((peer[metric] - spread["mean"]) / spread["stdev"], 2)
+                peer["zscores"][metric] = z
+                if COMPARED_METRICS[metric] * z >= Z_THRESHOLD:
+                    peer["strengths"].append(metric)
+                elif COMPARED_METRICS[metric] * z <= -Z_THRESHOLD:
+                    peer["weaknesses"].append(metric)
+
+    return {"agents": agents, "roles": roles_report, "events_scanned": scanned}
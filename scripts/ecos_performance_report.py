@@ -2,14 +2,20 @@
 """
 Chief of Staff Performance Report Script
 
-Generates performance reports for agents by reading state files
-and aggregating metrics over a specified time period.
+Generates performance reports for agents by aggregating metrics over a
+specified time period. Metrics come from the event log kept by
+ecos_metrics_store.py: counts are summed from the hourly and daily
+rollups of ecos_metrics_rollup.py, with raw events read only for the
+partial hours at the window edges. When the log has no events for the
+period, the report falls back to the counters in the legacy state files.
 
 Usage:
     python3 ecos_performance_report.py --agent SESSION_NAME
     python3 ecos_performance_report.py --agent SESSION_NAME --period 7
     python3 ecos_performance_report.py --project PROJECT_ID
     python3 ecos_performance_report.py --all --period 30
+    python3 ecos_performance_report.py --all --period 30 --compare
+    python3 ecos_performance_report.py export --output q3.parquet --period 90
 
 Output:
     JSON with performance metrics including:
@@ -21,19 +27,38 @@ Output:
 """
 
 import argparse
+import base64
+import binascii
+import heapq
 import json
+import os
 import re
 import sys
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional, TypedDict
+from typing import BinaryIO, NamedTuple, Optional, TypedDict
+
+import ecos_metrics_export
+from ecos_metrics_rollup import rollup_window
+from ecos_performance_analytics import analyze
+from ecos_metrics_store import EVENTS_DIR, recent_events
 
 
 class TimelineEntry(TypedDict):
     """Type for timeline entries."""
 
     timestamp: str
+    type: str
+    entry: str
+
+
+class TimelineEvent(NamedTuple):
+    """A timestamped line parsed from a state or log file."""
+
+    timestamp: str  # normalised to "YYYY-MM-DDTHH:MM[:SS]"
+    type: str  # metrics event type, or "note"
     entry: str
+    source: str
 
 
 class PerformanceData(TypedDict):
@@ -57,6 +82,24 @@ STATE_FILE_PATTERNS = [
     "design/exec-phase.local.md",
 ]
 
+# Timeline entries kept per report
+TIMELINE_LIMIT = 20
+
+TIMESTAMP_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2})[T\s](\d{2}:\d{2}(?::\d{2})?)")
+
+# First matching keyword classifies a timeline line (else "note")
+TIMELINE_TYPE_PATTERNS = [
+    ("task_failed", re.compile(r"\bfail(?:ed|ure|s)?\b", re.IGNORECASE)),
+    ("error", re.compile(r"\berrors?\b", re.IGNORECASE)),
+    (
+        "task_completed",
+        re.compile(r"\b(?:completed?|done|finished|merged)\b", re.IGNORECASE),
+    ),
+    ("task_started", re.compile(r"\b(?:started|assigned|claimed)\b", re.IGNORECASE)),
+    ("agent_spawned", re.compile(r"\bspawn(?:ed|ing)?\b", re.IGNORECASE)),
+    ("message_sent", re.compile(r"\b(?:message|notified|sent)\b", re.IGNORECASE)),
+]
+
 
 def parse_frontmatter(content: str) -> tuple[dict, str]:
     """
@@ -130,16 +173,161 @@ def find_state_files(project_dir: Optional[Path] = None) -> list[Path]:
     return found_files
 
 
-def parse_performance_data(state_files: list[Path]) -> PerformanceData:
+def encode_cursor(positions: dict[str, list[int]]) -> str:
+    """
+    Encode per-file read positions as an opaque --since cursor.
+
+    Args:
+        positions: Resolved file path -> [inode, byte offset]
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps(positions, separators=(",", ":"), sort_keys=True)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> dict[str, list[int]]:
+    """
+    Decode a --since cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        positions = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (binascii.Error, UnicodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid --since cursor: {e}") from e
+    if not isinstance(positions, dict):
+        raise ValueError("Invalid --since cursor: expected an object")
+    for key, entry in positions.items():
+        if not (
+            isinstance(entry, list)
+            and len(entry) == 2
+            and all(type(n) is int and n >= 0 for n in entry)
+        ):
+            raise ValueError(
+                f"Invalid --since cursor: expected [inode, offset] for {key}"
+            )
+    return positions
+
+
+def read_frontmatter(f: BinaryIO) -> tuple[dict, int]:
+    """
+    Read only the frontmatter block at the start of an open file.
+
+    Args:
+        f: File opened in binary mode, positioned at the start
+
+    Returns:
+        Tuple of (frontmatter_dict, byte offset where the body starts)
+    """
+    first = f.readline()
+    if not first.startswith(b"---"):
+        return {}, 0
+    lines = [first]
+    for raw in f:
+        lines.append(raw)
+        if raw.startswith(b"---"):
+            text = b"".join(lines).decode("utf-8", errors="replace")
+            data, _ = parse_frontmatter(text)
+            return data, sum(len(line) for line in lines)
+    # Unterminated frontmatter: treat the whole file as body, as before
+    return {}, 0
+
+
+def parse_timeline_line(
+    line: str, source: str, match: Optional[re.Match] = None
+) -> Optional[TimelineEvent]:
+    """
+    Parse one line into a typed timeline event, if it carries a timestamp.
+
+    Args:
+        line: Decoded line without its newline
+        source: File the line came from
+        match: TIMESTAMP_PATTERN match on `line`, if already searched
+
+    Returns:
+        The event, or None for lines without a timestamp
+    """
+    match = match or TIMESTAMP_PATTERN.search(line)
+    if match is None:
+        return None
+    entry = line[max(0, match.start() - 10) :].strip()[:80]
+    kind = next(
+        (name for name, pattern in TIMELINE_TYPE_PATTERNS if pattern.search(line)),
+        "note",
+    )
+    return TimelineEvent(f"{match.group(1)}T{match.group(2)}", kind, entry, source)
+
+
+def extract_timeline(
+    f: BinaryIO,
+    source: str,
+    heap: list[tuple[str, TimelineEvent]],
+    limit: int,
+) -> int:
+    """
+    Stream timestamped lines from the current position into a top-K heap.
+
+    The heap is a min-heap on timestamp holding at most `limit` items, so
+    only the newest entries survive and memory stays O(limit). Lines older
+    than the heap minimum are dropped before being classified.
+
+    Args:
+        f: File opened in binary mode
+        source: File name recorded on each event
+        heap: Shared heap of (timestamp, event)
+        limit: Maximum number of entries kept
+
+    Returns:
+        Byte offset just past the last complete line read. A final line
+        without a newline may still be being written: it is skipped and
+        left for the next run, which reads it once it is complete.
+    """
+    position = f.tell()
+    for raw in f:
+        if not raw.endswith(b"\n"):
+            break
+        position += len(raw)
+        line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+        match = TIMESTAMP_PATTERN.search(line)
+        if match is None:
+            continue
+        if len(heap) == limit and f"{match.group(1)}T{match.group(2)}" <= heap[0][0]:
+            continue
+        event = parse_timeline_line(line, source, match)
+        if event is None:
+            continue
+        if len(heap) < limit:
+            heapq.heappush(heap, (event.timestamp, event))
+        else:
+            heapq.heapreplace(heap, (event.timestamp, event))
+    return position
+
+
+def parse_performance_data(
+    state_files: list[Path], since: Optional[str] = None
+) -> tuple[PerformanceData, str]:
     """
     Parse performance data from state files.
 
+    Counters come from each file's frontmatter; the timeline streams the
+    body line by line. With a `since` cursor from a previous run, bodies
+    are read only from where that run stopped (files that were replaced
+    or truncated are read again from the start).
+
     Args:
         state_files: List of state file paths to parse
+        since: Cursor returned as "timeline_cursor" by a previous report
 
     Returns:
-        Dictionary with aggregated performance data
+        Tuple of (aggregated performance data, cursor for the next run)
+
+    Raises:
+        ValueError: If `since` is not a valid cursor
     """
+    positions = decode_cursor(since) if since else {}
     performance: PerformanceData = {
         "tasks_completed": 0,
         "tasks_failed": 0,
@@ -151,11 +339,29 @@ def parse_performance_data(state_files: list[Path]) -> PerformanceData:
         "sessions": [],
         "timeline": [],
     }
+    heap: list[tuple[str, TimelineEvent]] = []
+    next_positions: dict[str, list[int]] = {}
 
     for file_path in state_files:
+        key = str(file_path.resolve())
         try:
-            content = file_path.read_text(encoding="utf-8")
-            data, body = parse_frontmatter(content)
+            with open(file_path, "rb") as f:
+                data, body_start = read_frontmatter(f)
+
+                # Stream the timeline, resuming where the cursor left off
+                stat = os.fstat(f.fileno())
+                inode = stat.st_ino
+                cursor = positions.get(key)
+                if (
+                    cursor is not None
+                    and cursor[0] == inode
+                    and body_start <= cursor[1] <= stat.st_size
+                ):
+                    offset = cursor[1]
+                else:
+                    offset = body_start
+                f.seek(offset)
+                offset = extract_timeline(f, file_path.name, heap, TIMELINE_LIMIT)
 
             # Extract metrics from frontmatter
             if "tasks_completed" in data:
@@ -188,30 +394,69 @@ def parse_performance_data(state_files: list[Path]) -> PerformanceData:
                 except (ValueError, TypeError):
                     pass
 
-            # Parse timeline from body (look for dated entries)
-            date_pattern = re.compile(r"(\d{4}-\d{2}-\d{2}[T\s]\d{2}:\d{2})")
-            for match in date_pattern.finditer(body):
-                # Get context around the date
-                start = max(0, match.start() - 10)
-                end = min(len(body), match.end() + 100)
-                context = body[start:end].strip()
-
-                # Extract first line of context
-                first_line = context.split("\n")[0][:80]
-
-                performance["timeline"].append(
-                    {"timestamp": match.group(1), "entry": first_line}
-                )
+            next_positions[key] = [inode, offset]
 
         except Exception:
             performance["errors_encountered"] += 1
 
-    # Sort timeline by timestamp
-    performance["timeline"].sort(key=lambda x: x["timestamp"], reverse=True)
-    # Limit timeline entries
-    performance["timeline"] = performance["timeline"][:20]
+    performance["timeline"] = [
+        {"timestamp": event.timestamp, "type": event.type, "entry": event.entry}
+        for _, event in sorted(heap, reverse=True)
+    ]
+
+    return performance, encode_cursor(next_positions)
+
+
+def load_performance_events(
+    agent_name: Optional[str],
+    project_id: Optional[str],
+    start: datetime,
+    end: datetime,
+) -> Optional[PerformanceData]:
+    """
+    Aggregate performance data from the metrics event log.
+
+    Args:
+        agent_name: Optional agent session name filter
+        project_id: Optional project ID filter
+        start: Window start
+        end: Window end
 
-    return performance
+    Returns:
+        Performance data, or None if the log has no partitions in the window
+    """
+    # Whole days and hours come from rollups; only partial edge hours are read raw
+    result = rollup_window(start, end, agent_name, project_id)
+    if result["partitions"] == 0:
+        return None
+    counts = result["groups"].get("*", {})
+    finished = counts.get("task_completed", 0) + counts.get("task_failed", 0)
+
+    timeline: list[TimelineEntry] = []
+    sessions: list[str] = []
+    for event in recent_events(start, end, 20, agent_name, project_id):
+        description = f"{event['type']} {event['agent']}"
+        if event.get("task_id"):
+            description += f" {event['task_id']}"
+        if event.get("project"):
+            description += f" ({event['project']})"
+        timeline.append(
+            {"timestamp": event["ts"], "type": event["type"], "entry": description}
+        )
+        if event["agent"] not in sessions:
+            sessions.append(event["agent"])
+
+    return {
+        "tasks_completed": counts.get("task_completed", 0),
+        "tasks_failed": counts.get("task_failed", 0),
+        "tasks_in_progress": max(0, counts.get("task_started", 0) - finished),
+        "messages_sent": counts.get("message_sent", 0),
+        "messages_received": counts.get("message_received", 0),
+        "agents_spawned": counts.get("agent_spawned", 0),
+        "errors_encountered": counts.get("error", 0),
+        "sessions": sessions,
+        "timeline": timeline,
+    }
 
 
 def calculate_efficiency(
@@ -264,6 +509,7 @@ def generate_report(
     project_id: Optional[str],
     period_days: int,
     project_dir: Optional[Path],
+    since: Optional[str] = None,
 ) -> dict:
     """
     Generate a performance report.
@@ -273,31 +519,41 @@ def generate_report(
         project_id: Optional project ID filter
         period_days: Reporting period in days
         project_dir: Project directory to search
+        since: Timeline cursor from a previous state-file report
 
     Returns:
         Dictionary with the performance report
     """
-    # Find state files
-    state_files = find_state_files(project_dir)
+    # Calculate date range
+    end_date = datetime.now(timezone.utc)
+    start_date = end_date - timedelta(days=period_days)
 
-    if not state_files:
-        return {
-            "success": False,
-            "error": "No state files found",
-            "searched_patterns": STATE_FILE_PATTERNS,
-            "searched_directory": str(project_dir or Path.cwd()),
-        }
+    performance = load_performance_events(agent_name, project_id, start_date, end_date)
+    timeline_cursor = None
+    if performance is not None:
+        sources = [str(EVENTS_DIR)]
+    else:
+        # No events recorded for the period: fall back to state file counters
+        state_files = find_state_files(project_dir)
+
+        if not state_files:
+            return {
+                "success": False,
+                "error": "No metrics events or state files found",
+                "metrics_dir": str(EVENTS_DIR),
+                "searched_patterns": STATE_FILE_PATTERNS,
+                "searched_directory": str(project_dir or Path.cwd()),
+            }
 
-    # Parse performance data
-    performance = parse_performance_data(state_files)
+        try:
+            performance, timeline_cursor = parse_performance_data(state_files, since)
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+        sources = [str(f) for f in state_files]
 
     # Calculate efficiency
     efficiency = calculate_efficiency(performance, period_days)
 
-    # Calculate date range
-    end_date = datetime.now(timezone.utc)
-    start_date = end_date - timedelta(days=period_days)
-
     report = {
         "success": True,
         "generated_at": end_date.isoformat().replace("+00:00", "Z"),
@@ -325,14 +581,76 @@ def generate_report(
         },
         "efficiency": efficiency,
         "recent_activity": performance["timeline"][:10],
-        "sources": [str(f) for f in state_files],
+        "sources": sources,
     }
+    if timeline_cursor is not None:
+        # Pass back as --since to read only lines added after this run
+        report["timeline_cursor"] = timeline_cursor
 
     return report
 
 
+def generate_compare_report(
+    agent_name: Optional[str],
+    project_id: Optional[str],
+    period_days: int,
+) -> dict:
+    """
+    Generate a comparative (strength/weakness) report from the metrics log.
+
+    Every agent in scope is analysed against its role peers; with an agent
+    filter the report keeps that agent and its role only.
+
+    Args:
+        agent_name: Optional agent session name filter
+        project_id: Optional project ID filter
+        period_days: Reporting period in days
+
+    Returns:
+        Dictionary with the comparative report
+    """
+    end_date = datetime.now(timezone.utc)
+    start_date = end_date - timedelta(days=period_days)
+
+    analysis = analyze(start_date, end_date, project_id)
+    agents = analysis["agents"]
+    roles = analysis["roles"]
+    if agent_name is not None:
+        agents = {k: v for k, v in agents.items() if k == agent_name}
+        agent_roles = {v["role"] for v in agents.values()}
+        roles = {k: v for k, v in roles.items() if k in agent_roles}
+
+    if not agents:
+        return {
+            "success": False,
+            "error": "No metrics events found for the period",
+            "metrics_dir": str(EVENTS_DIR),
+        }
+
+    return {
+        "success": True,
+        "generated_at": end_date.isoformat().replace("+00:00", "Z"),
+        "period": {
+            "days": period_days,
+            "start": start_date.strftime("%Y-%m-%d"),
+            "end": end_date.strftime("%Y-%m-%d"),
+        },
+        "filters": {"agent": agent_name, "project": project_id},
+        "agents": agents,
+        "roles": roles,
+        "events_scanned": analysis["events_scanned"],
+        "sources": [str(EVENTS_DIR)],
+    }
+
+
 def main() -> int:
     """Main entry point."""
+    # "export" streams events/rollups to files; see ecos_metrics_export.py
+    if sys.argv[1:2] == ["export"]:
+        return ecos_metrics_export.main(
+            sys.argv[2:], prog="ecos_performance_report.py export"
+        )
+
     parser = argparse.ArgumentParser(
         description="Generate performance reports for agents",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -347,8 +665,14 @@ Examples:
     # Report for all agents
     python3 ecos_performance_report.py --all
 
+    # Compare every agent with its role peers (z-scores, trends)
+    python3 ecos_performance_report.py --all --compare
+
     # Specify custom project directory
     python3 ecos_performance_report.py --agent my-session --project-dir /path/to/project
+
+    # Export raw events of the last quarter (see: export --help)
+    python3 ecos_performance_report.py export --output events.parquet --period 90
         """,
     )
 
@@ -375,6 +699,19 @@ Examples:
         help="Project directory to search for state files",
     )
 
+    parser.add_argument(
+        "--since",
+        metavar="CURSOR",
+        help="Timeline cursor from a previous report: only read state-file "
+        "lines added since (the event log timeline is indexed already)",
+    )
+
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Comparative report: distributions, role z-scores and trends",
+    )
+
     parser.add_argument(
         "--compact", action="store_true", help="Output compact JSON (no indentation)"
     )
@@ -405,7 +742,12 @@ Examples:
     agent_name = args.agent if args.agent else None
     project_id = args.project if args.project else None
 
-    report = generate_report(agent_name, project_id, args.period, project_dir)
+    if args.compare:
+        report = generate_compare_report(agent_name, project_id, args.period)
+    else:
+        report = generate_report(
+            agent_name, project_id, args.period, project_dir, args.since
+        )
 
     # Output JSON
     indent = None if args.compact else 2
@@ -0,0 +1,735 @@
+#!/usr/bin/env python3
+"""
+ecos_plugin_store.py - Content-addressed plugin store for agent plugin installs.
+
+Installing a plugin into an agent directory used to copy the whole plugin
+version tree. With many agents and plugins that duplicates gigabytes of
+identical files. This store keeps every distinct file once, as a read-only
+object named by its SHA-256, and materializes plugin trees into agent
+directories by hard-linking those objects (falling back to a reflink via
+FICLONE on Linux, then to a plain copy when the agent directory is on
+another filesystem).
+
+The store also maintains an index of the marketplace plugin cache
+(~/.ecos/plugin-cache-index.json) with every installed version's parsed
+semver, install time, size and content hash. Resolving the latest or a
+pinned version is a single stat plus an index read; the version
+directories are only re-listed when the plugin's cache directory changes.
+
+A manifest per source tree caches (size, mtime) -> hash for every file, so
+repeated installs of the same plugin version only stat the source files
+and never re-read them. Install time and disk usage are therefore driven
+by the number of files, not their size.
+
+Objects are read-only so an agent cannot modify a shared file in place;
+tools that rewrite files by rename simply break the link for that agent.
+
+Layout:
+    ~/.ecos/plugin-store/objects/<aa>/<sha256>[.x]   (.x = executable)
+    ~/.ecos/plugin-store/manifests/<source-key>.json
+    ~/.ecos/plugin-cache-index.json
+    ~/.ecos/plugin-cache-index.lock
+
+Dependencies: Python 3.8+ stdlib only
+
+Usage:
+    python ecos_plugin_store.py install SOURCE_DIR DEST_DIR [--link-mode MODE]
+    python ecos_plugin_store.py stats
+    python ecos_plugin_store.py gc
+    python ecos_plugin_store.py index [--plugin NAME]
+    python ecos_plugin_store.py resolve NAME [--version VERSION]
+    python ecos_plugin_store.py verify NAME [--version VERSION] [--deep]
+
+Exit codes:
+    0 - Success
+    1 - Error
+"""
+
+from __future__ import annotations
+
+import argparse
+import errno
+import hashlib
+import json
+import os
+import re
+import shutil
+import stat
+import sys
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, cast
+
+STORE_DIR = Path.home() / ".ecos" / "plugin-store"
+OBJECTS_DIR = STORE_DIR / "objects"
+MANIFESTS_DIR = STORE_DIR / "manifests"
+
+# Linux ioctl request number for FICLONE (_IOW(0x94, 9, int))
+FICLONE = 0x40049409
+
+LINK_MODES = ("hardlink", "reflink", "copy")
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Marketplace plugin cache and its version index
+MARKETPLACE_CACHE_DIR = (
+    Path.home() / ".claude" / "plugins" / "cache" / "emasoft-plugins"
+)
+CACHE_INDEX_FILE = Path.home() / ".ecos" / "plugin-cache-index.json"
+CACHE_INDEX_LOCK = CACHE_INDEX_FILE.with_suffix(".lock")
+
+SEMVER_RE = re.compile(
+    r"^v?(\d+)\.(\d+)\.(\d+)(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$"
+)
+
+
+def iso_now() -> str:
+    """Return current UTC timestamp in ISO format."""
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def hash_file(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def object_path(file_hash: str, executable: bool) -> Path:
+    """Return the store path of an object.
+
+    Executable and non-executable copies of the same content are separate
+    objects because hard links share their permission bits.
+    """
+    suffix = ".x" if executable else ""
+    return OBJECTS_DIR / file_hash[:2] / f"{file_hash}{suffix}"
+
+
+def _manifest_path(source: Path) -> Path:
+    """Return the manifest file for a source tree."""
+    key = hashlib.sha256(str(source.resolve()).encode("utf-8")).hexdigest()[:24]
+    return MANIFESTS_DIR / f"{key}.json"
+
+
+def _load_manifest(source: Path) -> dict[str, Any]:
+    """Load the cached manifest for a source tree (empty if missing/corrupt)."""
+    path = _manifest_path(source)
+    if not path.exists():
+        return {"source": str(source), "files": {}, "symlinks": {}, "dirs": []}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return cast(dict[str, Any], json.load(f))
+    except (OSError, json.JSONDecodeError):
+        return {"source": str(source), "files": {}, "symlinks": {}, "dirs": []}
+
+
+def _save_manifest(source: Path, manifest: dict[str, Any]) -> None:
+    """Atomically write the manifest for a source tree."""
+    path = _manifest_path(source)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    manifest["updated_at"] = iso_now()
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    """Clone src to dst sharing data blocks (Linux FICLONE). Returns success."""
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        return True
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+
+
+def _ingest_object(source_file: Path, file_hash: str, executable: bool) -> Path:
+    """Place a source file into the store as a read-only object."""
+    obj = object_path(file_hash, executable)
+    if obj.exists():
+        return obj
+    obj.parent.mkdir(parents=True, exist_ok=True)
+    tmp_obj = obj.with_name(f".{obj.name}.{uuid.uuid4().hex}.tmp")
+    if not _reflink(source_file, tmp_obj):
+        shutil.copyfile(source_file, tmp_obj)
+    tmp_obj.chmod(0o555 if executable else 0o444)
+    os.replace(tmp_obj, obj)
+    return obj
+
+
+def ingest_tree(source: Path) -> dict[str, Any]:
+    """Ensure every file under source is in the store and return its manifest.
+
+    Files whose size and mtime match the cached manifest are not re-read.
+
+    Returns:
+        Manifest: {source, files: {relpath: {hash, size, mtime_ns, exec}},
+        symlinks: {relpath: target}, dirs: [relpath]}
+    """
+    old_manifest = _load_manifest(source)
+    old_files: dict[str, Any] = old_manifest.get("files", {})
+    files: dict[str, Any] = {}
+    symlinks: dict[str, str] = {}
+    dirs: list[str] = []
+    hashed = 0
+
+    for dirpath, dirnames, filenames in os.walk(source):
+        dir_path = Path(dirpath)
+        for name in dirnames + filenames:
+            path = dir_path / name
+            rel = path.relative_to(source).as_posix()
+            st = path.lstat()
+            if stat.S_ISLNK(st.st_mode):
+                symlinks[rel] = os.readlink(path)
+                continue
+            if stat.S_ISDIR(st.st_mode):
+                dirs.append(rel)
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+
+            executable = bool(st.st_mode & stat.S_IXUSR)
+            cached = old_files.get(rel)
+            if (
+                cached
+                and cached["size"] == st.st_size
+                and cached["mtime_ns"] == st.st_mtime_ns
+                and cached["exec"] == executable
+                and object_path(cached["hash"], executable).exists()
+            ):
+                files[rel] = cached
+                continue
+
+            file_hash = hash_file(path)
+            _ingest_object(path, file_hash, executable)
+            hashed += 1
+            files[rel] = {
+                "hash": file_hash,
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "exec": executable,
+            }
+
+    manifest: dict[str, Any] = {
+        "source": str(source),
+        "files": files,
+        "symlinks": symlinks,
+        "dirs": dirs,
+    }
+    if (
+        hashed
+        or files.keys() != old_files.keys()
+        or symlinks != old_manifest.get("symlinks")
+        or dirs != old_manifest.get("dirs")
+    ):
+        _save_manifest(source, manifest)
+    manifest["hashed"] = hashed
+    return manifest
+
+
+def _place_file(obj: Path, dest: Path, link_mode: str) -> str:
+    """Materialize one object at dest. Returns the method actually used."""
+    if link_mode == "hardlink":
+        try:
+            os.link(obj, dest)
+            return "hardlink"
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+    if link_mode in ("hardlink", "reflink") and _reflink(obj, dest):
+        dest.chmod(obj.stat().st_mode & 0o777)
+        return "reflink"
+    shutil.copy2(obj, dest)
+    return "copy"
+
+
+def materialize_tree(
+    manifest: dict[str, Any], dest: Path, link_mode: str = "hardlink"
+) -> dict[str, int]:
+    """Build dest from store objects according to a manifest.
+
+    Returns:
+        Count of files placed per method plus symlinks recreated
+    """
+    counts = {"hardlink": 0, "reflink": 0, "copy": 0, "symlink": 0}
+    dest.mkdir(parents=True, exist_ok=True)
+    for rel in manifest.get("dirs", []):
+        (dest / rel).mkdir(parents=True, exist_ok=True)
+
+    for rel, entry in manifest["files"].items():
+        target = dest / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        obj = object_path(entry["hash"], entry["exec"])
+        counts[_place_file(obj, target, link_mode)] += 1
+
+    for rel, link_target in manifest["symlinks"].items():
+        target = dest / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.symlink(link_target, target)
+        counts["symlink"] += 1
+
+    return counts
+
+
+def install_plugin_tree(
+    source: Path, dest: Path, link_mode: str = "hardlink"
+) -> dict[str, Any]:
+    """Install a plugin tree into dest, sharing identical files via the store.
+
+    Any existing dest is replaced.
+
+    Args:
+        source: Plugin version directory (e.g. marketplace cache entry)
+        dest: Destination directory inside the agent folder
+        link_mode: 'hardlink' (default), 'reflink' or 'copy'
+
+    Returns:
+        Install summary with file counts per method
+    """
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"Invalid link mode: {link_mode}. Valid: {list(LINK_MODES)}")
+
+    manifest = ingest_tree(source)
+
+    if dest.is_symlink() or dest.is_file():
+        dest.unlink()
+    elif dest.exists():
+        shutil.rmtree(dest)
+    counts = materialize_tree(manifest, dest, link_mode)
+
+    return {
+        "source": str(source),
+        "dest": str(dest),
+        "files": len(manifest["files"]),
+        "hashed": manifest["hashed"],
+        "placed": counts,
+    }
+
+
+def store_stats() -> dict[str, Any]:
+    """Report object count, stored bytes and bytes saved by sharing."""
+    objects = 0
+    stored_bytes = 0
+    shared_bytes = 0
+    if OBJECTS_DIR.exists():
+        for obj in OBJECTS_DIR.glob("*/*"):
+            if obj.name.startswith("."):
+                continue
+            st = obj.stat()
+            objects += 1
+            stored_bytes += st.st_size
+            # Each extra link beyond the store's own is a copy avoided
+            shared_bytes += st.st_size * max(0, st.st_nlink - 2)
+
+    return {
+        "store_dir": str(STORE_DIR),
+        "objects": objects,
+        "stored_bytes": stored_bytes,
+        "bytes_saved_by_links": shared_bytes,
+        "manifests": len(list(MANIFESTS_DIR.glob("*.json")))
+        if MANIFESTS_DIR.exists()
+        else 0,
+        "timestamp": iso_now(),
+    }
+
+
+def gc_store() -> dict[str, Any]:
+    """Delete objects no agent links to and that no manifest references.
+
+    Reflinked and copied installs do not hold links, so objects referenced
+    by a manifest are always kept.
+    """
+    referenced: set[str] = set()
+    if MANIFESTS_DIR.exists():
+        for path in MANIFESTS_DIR.glob("*.json"):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            if not Path(data.get("source", "")).exists():
+                path.unlink(missing_ok=True)
+                continue
+            for entry in data.get("files", {}).values():
+                referenced.add(object_path(entry["hash"], entry["exec"]).name)
+
+    removed = 0
+    freed = 0
+    if OBJECTS_DIR.exists():
+        for obj in OBJECTS_DIR.glob("*/*"):
+            if obj.name.startswith("."):
+                continue
+            st = obj.stat()
+            if obj.name not in referenced and st.st_nlink == 1:
+                freed += st.st_size
+                obj.unlink()
+                removed += 1
+
+    return {"removed_objects": removed, "freed_bytes": freed, "timestamp": iso_now()}
+
+
+# =============================================================================
+# MARKETPLACE CACHE INDEX
+# =============================================================================
+
+
+def parse_semver(version: str) -> tuple[Any, ...] | None:
+    """Parse a semantic version string into a sortable key.
+
+    Accepts an optional leading 'v', a prerelease ('-beta.1') and build
+    metadata ('+abc', ignored for ordering). Releases sort after their
+    prereleases; numeric prerelease identifiers sort numerically.
+
+    Returns:
+        Sort key tuple, or None if the string is not a semantic version
+    """
+    match = SEMVER_RE.match(version)
+    if not match:
+        return None
+    major, minor, patch, pre = match.groups()
+    if pre is None:
+        pre_key: tuple[Any, ...] = (1,)
+    else:
+        pre_key = (
+            0,
+            tuple((0, int(p), "") if p.isdigit() else (1, 0, p) for p in pre.split(".")),
+        )
+    return (int(major), int(minor), int(patch), pre_key)
+
+
+def select_latest_version(versions: list[str]) -> str | None:
+    """Pick the highest semantic version (lexical max if none parse)."""
+    parsed = [(parse_semver(v), v) for v in versions]
+    semvers = [(key, v) for key, v in parsed if key is not None]
+    if semvers:
+        return max(semvers)[1]
+    return max(versions) if versions else None
+
+
+def tree_content_hash(manifest: dict[str, Any]) -> str:
+    """Compute a single content hash for a plugin tree from its manifest."""
+    digest = hashlib.sha256()
+    for rel in sorted(manifest["files"]):
+        entry = manifest["files"][rel]
+        digest.update(f"f\0{rel}\0{entry['hash']}\0{int(entry['exec'])}\n".encode())
+    for rel in sorted(manifest["symlinks"]):
+        digest.update(f"l\0{rel}\0{manifest['symlinks'][rel]}\n".encode())
+    return digest.hexdigest()
+
+
+def _index_version(version_dir: Path) -> dict[str, Any]:
+    """Build the index entry for one installed plugin version.
+
+    Ingesting the tree also pre-populates the store, so the first spawn
+    using this version only has to link files.
+    """
+    st = version_dir.stat()
+    manifest = ingest_tree(version_dir)
+    parsed = SEMVER_RE.match(version_dir.name)
+    semver = None
+    if parsed:
+        major, minor, patch, prerelease = parsed.groups()
+        semver = [int(major), int(minor), int(patch), prerelease]
+    return {
+        "path": str(version_dir),
+        "semver": semver,
+        "installed_at": datetime.fromtimestamp(st.st_mtime, timezone.utc)
+        .isoformat()
+        .replace("+00:00", "Z"),
+        "dir_mtime_ns": st.st_mtime_ns,
+        "size": sum(f["size"] for f in manifest["files"].values()),
+        "files": len(manifest["files"]),
+        "content_hash": tree_content_hash(manifest),
+    }
+
+
+def load_cache_index() -> dict[str, Any]:
+    """Load the marketplace cache index (empty if missing/corrupt)."""
+    if not CACHE_INDEX_FILE.exists():
+        return {"marketplace_dir": str(MARKETPLACE_CACHE_DIR), "plugins": {}}
+    try:
+        with open(CACHE_INDEX_FILE, encoding="utf-8") as f:
+            return cast(dict[str, Any], json.load(f))
+    except (OSError, json.JSONDecodeError):
+        return {"marketplace_dir": str(MARKETPLACE_CACHE_DIR), "plugins": {}}
+
+
+@contextmanager
+def _locked_cache_index() -> Iterator[None]:
+    """Hold the cache index's exclusive lock for a read-modify-write."""
+    import fcntl
+
+    CACHE_INDEX_LOCK.parent.mkdir(parents=True, exist_ok=True)
+    with open(CACHE_INDEX_LOCK, "a", encoding="utf-8") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def save_cache_index(index: dict[str, Any]) -> None:
+    """Atomically write the marketplace cache index.
+
+    Callers updating a loaded index hold _locked_cache_index() from the
+    load to the save, so concurrent refreshes do not drop each other's
+    entries.
+    """
+    CACHE_INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+    index["last_updated"] = iso_now()
+    tmp_file = CACHE_INDEX_FILE.with_name(
+        f".{CACHE_INDEX_FILE.name}.{uuid.uuid4().hex}.tmp"
+    )
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp_file, CACHE_INDEX_FILE)
+
+
+def _refresh_plugin_entry(
+    plugin_dir: Path, old_entry: dict[str, Any] | None
+) -> dict[str, Any]:
+    """Re-index one plugin, reusing entries of unchanged version dirs."""
+    old_versions = (old_entry or {}).get("versions", {})
+    versions: dict[str, Any] = {}
+    for version_dir in plugin_dir.iterdir():
+        if not version_dir.is_dir() or version_dir.name.startswith("."):
+            continue
+        cached = old_versions.get(version_dir.name)
+        if cached and cached["dir_mtime_ns"] == version_dir.stat().st_mtime_ns:
+            versions[version_dir.name] = cached
+        else:
+            versions[version_dir.name] = _index_version(version_dir)
+
+    return {
+        "dir_mtime_ns": plugin_dir.stat().st_mtime_ns,
+        "latest": select_latest_version(list(versions)),
+        "versions": versions,
+    }
+
+
+def refresh_cache_index(plugin_name: str | None = None) -> dict[str, Any]:
+    """Bring the index up to date with the marketplace cache.
+
+    Args:
+        plugin_name: Refresh only this plugin (default: all plugins)
+
+    Returns:
+        The refreshed index
+    """
+    with _locked_cache_index():
+        index = load_cache_index()
+        plugins: dict[str, Any] = index.setdefault("plugins", {})
+        names = (
+            [plugin_name]
+            if plugin_name
+            else (
+                [p.name for p in MARKETPLACE_CACHE_DIR.iterdir() if p.is_dir()]
+                if MARKETPLACE_CACHE_DIR.exists()
+                else []
+            )
+        )
+        if plugin_name is None:
+            for stale in set(plugins) - set(names):
+                del plugins[stale]
+
+        for name in names:
+            plugin_dir = MARKETPLACE_CACHE_DIR / name
+            if not plugin_dir.is_dir():
+                plugins.pop(name, None)
+                continue
+            old_entry = plugins.get(name)
+            if old_entry and old_entry["dir_mtime_ns"] == plugin_dir.stat().st_mtime_ns:
+                continue
+            plugins[name] = _refresh_plugin_entry(plugin_dir, old_entry)
+
+        save_cache_index(index)
+    return index
+
+
+def get_plugin_index_entry(plugin_name: str) -> dict[str, Any] | None:
+    """Return the index entry for a plugin, refreshing it only if it changed.
+
+    A lookup costs one stat of the plugin's cache directory plus reading
+    the index; version directories are only listed when the directory
+    changed (a version was added or removed).
+    """
+    plugin_dir = MARKETPLACE_CACHE_DIR / plugin_name
+    try:
+        dir_mtime_ns = plugin_dir.stat().st_mtime_ns
+    except OSError:
+        return None
+
+    entry = load_cache_index().get("plugins", {}).get(plugin_name)
+    if entry is None or entry["dir_mtime_ns"] != dir_mtime_ns:
+        entry = refresh_cache_index(plugin_name)["plugins"].get(plugin_name)
+    return cast("dict[str, Any] | None", entry)
+
+
+def resolve_plugin_version(
+    plugin_name: str, version: str | None = None
+) -> Path | None:
+    """Resolve the cache path of the latest (or pinned) plugin version.
+
+    Returns:
+        Version directory, or None if the plugin/version is not installed
+    """
+    entry = get_plugin_index_entry(plugin_name)
+    if entry is None:
+        return None
+    selected = version or entry["latest"]
+    if selected is None or selected not in entry["versions"]:
+        return None
+    return Path(entry["versions"][selected]["path"])
+
+
+def verify_plugin_version(
+    plugin_name: str, version: str | None = None, deep: bool = False
+) -> dict[str, Any]:
+    """Verify an installed plugin version against its indexed content hash.
+
+    The quick check stats each file listed in the manifest (no directory
+    walk, no reads) and recomputes the tree hash from the manifest. The
+    deep check re-reads and re-hashes every file.
+    """
+    entry = get_plugin_index_entry(plugin_name)
+    if entry is None:
+        return {"success": False, "error": f"Plugin '{plugin_name}' not in cache"}
+    selected = version or entry["latest"]
+    info = entry["versions"].get(selected)
+    if info is None:
+        return {
+            "success": False,
+            "error": f"Version '{selected}' of '{plugin_name}' not in cache",
+        }
+
+    source = Path(info["path"])
+    manifest = _load_manifest(source)
+    mismatched: list[str] = []
+    for rel, file_entry in manifest.get("files", {}).items():
+        path = source / rel
+        try:
+            st = path.stat()
+        except OSError:
+            mismatched.append(rel)
+            continue
+        if deep:
+            if hash_file(path) != file_entry["hash"]:
+                mismatched.append(rel)
+        elif st.st_size != file_entry["size"] or st.st_mtime_ns != file_entry["mtime_ns"]:
+            mismatched.append(rel)
+
+    hash_ok = (
+        bool(manifest.get("files"))
+        and tree_content_hash(manifest) == info["content_hash"]
+    )
+    return {
+        "success": hash_ok and not mismatched,
+        "plugin": plugin_name,
+        "version": selected,
+        "content_hash": info["content_hash"],
+        "deep": deep,
+        "mismatched_files": mismatched,
+        "timestamp": iso_now(),
+    }
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Content-addressed plugin store for agent plugin installs.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    # Install a plugin version into an agent folder
+    python ecos_plugin_store.py install \\
+        ~/.claude/plugins/cache/emasoft-plugins/emasoft-programmer-agent/1.2.0 \\
+        ~/agents/prog-01/.claude/plugins/emasoft-programmer-agent
+
+    # Show store size and sharing savings
+    python ecos_plugin_store.py stats
+
+    # Remove unreferenced objects
+    python ecos_plugin_store.py gc
+
+    # Rebuild the marketplace cache index and resolve the latest version
+    python ecos_plugin_store.py index
+    python ecos_plugin_store.py resolve emasoft-programmer-agent
+
+    # Check a pinned version against its recorded content hash
+    python ecos_plugin_store.py verify emasoft-programmer-agent --version 1.2.0
+        """,
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    install_parser = subparsers.add_parser("install", help="Install a plugin tree")
+    install_parser.add_argument("source", help="Source plugin directory")
+    install_parser.add_argument("dest", help="Destination directory")
+    install_parser.add_argument(
+        "--link-mode",
+        choices=LINK_MODES,
+        default="hardlink",
+        help="How to place files (default: hardlink)",
+    )
+    subparsers.add_parser("stats", help="Show store statistics")
+    subparsers.add_parser("gc", help="Remove unreferenced objects")
+
+    index_parser = subparsers.add_parser("index", help="Refresh the cache index")
+    index_parser.add_argument("--plugin", help="Refresh only this plugin")
+
+    resolve_parser = subparsers.add_parser("resolve", help="Resolve a plugin version")
+    resolve_parser.add_argument("plugin", help="Plugin name")
+    resolve_parser.add_argument("--version", help="Pinned version (default: latest)")
+
+    verify_parser = subparsers.add_parser("verify", help="Verify a plugin version")
+    verify_parser.add_argument("plugin", help="Plugin name")
+    verify_parser.add_argument("--version", help="Version (default: latest)")
+    verify_parser.add_argument(
+        "--deep", action="store_true", help="Re-hash every file"
+    )
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "install":
+            result = install_plugin_tree(
+                Path(args.source).expanduser(),
+                Path(args.dest).expanduser(),
+                args.link_mode,
+            )
+        elif args.command == "stats":
+            result = store_stats()
+        elif args.command == "gc":
+            result = gc_store()
+        elif args.command == "index":
+            result = refresh_cache_index(args.plugin)
+        elif args.command == "resolve":
+            path = resolve_plugin_version(args.plugin, args.version)
+            result = {
+                "success": path is not None,
+                "plugin": args.plugin,
+                "version": path.name if path else args.version,
+                "path": str(path) if path else None,
+            }
+        else:
+            result = verify_plugin_version(args.plugin, args.version, args.deep)
+    except (OSError, ValueError) as e:
+        print(json.dumps({"status": "error", "error": str(e)}, indent=2), file=sys.stderr)
+        return 1
+
+    print(json.dumps(result, indent=2))
+    return 0 if result.get("success", True) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+ecos_registry_index.py - Organisation-wide index over all team registries.
+
+Team registries live in separate team-registry.json files, so questions
+like "which team is agent X in", "all programmers on host Y" or "how many
+agents are active across teams" would otherwise need every registry file
+opened. This module maintains a single index at ~/.ecos/agent-index.json
+keyed by agent name, with secondary indexes by role, host, status and team
+plus running totals. ecos_team_registry.py updates it under an exclusive
+lock whenever add-agent, remove-agent or update-status changes a registry.
+
+Lookups by agent name are dict lookups; attribute queries intersect the
+pre-built buckets starting from the smallest one.
+
+Agent names are AI Maestro addresses and therefore unique across teams.
+
+Dependencies: Python 3.8+ stdlib only (Unix file locking via fcntl)
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import uuid
+from bisect import bisect_left, insort
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, cast
+
+ECOS_STATE_DIR = Path.home() / ".ecos"
+AGENT_INDEX_FILE = ECOS_STATE_DIR / "agent-index.json"
+AGENT_INDEX_LOCK_FILE = ECOS_STATE_DIR / "agent-index.lock"
+
+# Attributes that get a secondary index (bucket name -> sorted agent names)
+INDEXED_FIELDS = ("role", "host", "status", "team")
+
+
+def get_timestamp() -> str:
+    """Get current ISO8601 timestamp."""
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _empty_index() -> dict[str, Any]:
+    """Return an empty agent index."""
+    return {
+        "agents": {},
+        "by": {field: {} for field in INDEXED_FIELDS},
+        "totals": {"agents": 0, "by_status": {}},
+        "last_updated": get_timestamp(),
+    }
+
+
+def load_index() -> dict[str, Any]:
+    """Load the agent index (read-only snapshot, no locking)."""
+    if not AGENT_INDEX_FILE.exists():
+        return _empty_index()
+    try:
+        with open(AGENT_INDEX_FILE, encoding="utf-8") as f:
+            return cast(dict[str, Any], json.load(f))
+    except (OSError, json.JSONDecodeError):
+        return _empty_index()
+
+
+@contextmanager
+def locked_index() -> Iterator[dict[str, Any]]:
+    """Load the index under an exclusive lock and atomically save it on exit.
+
+    If the body raises, nothing is written and the index is unchanged.
+    """
+    ECOS_STATE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(AGENT_INDEX_LOCK_FILE, "a", encoding="utf-8") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            index = load_index()
+            yield index
+            index["last_updated"] = get_timestamp()
+            tmp_file = AGENT_INDEX_FILE.with_name(
+                f".{AGENT_INDEX_FILE.name}.{uuid.uuid4().hex}.tmp"
+            )
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(index, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, AGENT_INDEX_FILE)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _bucket_add(index: dict[str, Any], field: str, value: str, name: str) -> None:
+    """Add an agent name to a secondary index bucket (kept sorted)."""
+    bucket: list[str] = index["by"][field].setdefault(value, [])
+    pos = bisect_left(bucket, name)
+    if pos == len(bucket) or bucket[pos] != name:
+        insort(bucket, name)
+
+
+def _bucket_remove(index: dict[str, Any], field: str, value: str, name: str) -> None:
+    """Remove an agent name from a secondary index bucket."""
+    bucket: list[str] | None = index["by"][field].get(value)
+    if not bucket:
+        return
+    pos = bisect_left(bucket, name)
+    if pos < len(bucket) and bucket[pos] == name:
+        bucket.pop(pos)
+    if not bucket:
+        del index["by"][field][value]
+
+
+def _unlink_agent(index: dict[str, Any], name: str) -> dict[str, Any] | None:
+    """Remove an agent and its bucket memberships and totals from the index."""
+    old = cast("dict[str, Any] | None", index["agents"].pop(name, None))
+    if old is None:
+        return None
+    for field in INDEXED_FIELDS:
+        _bucket_remove(index, field, str(old.get(field)), name)
+    totals = index["totals"]
+    totals["agents"] -= 1
+    status = str(old.get("status"))
+    totals["by_status"][status] = totals["by_status"].get(status, 1) - 1
+    if totals["by_status"][status] <= 0:
+        del totals["by_status"][status]
+    return old
+
+
+def _link_agent(index: dict[str, Any], name: str, entry: dict[str, Any]) -> None:
+    """Insert an agent with its bucket memberships and totals into the index."""
+    index["agents"][name] = entry
+    for field in INDEXED_FIELDS:
+        _bucket_add(index, field, str(entry.get(field)), name)
+    totals = index["totals"]
+    totals["agents"] += 1
+    status = str(entry.get("status"))
+    totals["by_status"][status] = totals["by_status"].get(status, 0) + 1
+
+
+def _index_entry(
+    team: str, agent: dict[str, Any], registry_file: str | None
+) -> dict[str, Any]:
+    """Project a registry agent record onto an index entry."""
+    return {
+        "name": agent["name"],
+        "team": team,
+        "role": agent.get("role"),
+        "host": agent.get("host"),
+        "status": agent.get("status"),
+        "ai_maestro_address": agent.get("ai_maestro_address", agent["name"]),
+        "registry_file": str(Path(registry_file).resolve()) if registry_file else None,
+        "indexed_at": get_timestamp(),
+    }
+
+
+def index_upsert_agent(
+    team: str, agent: dict[str, Any], registry_file: str | None = None
+) -> None:
+    """Insert or update one agent of a team in the global index."""
+    with locked_index() as index:
+        _unlink_agent(index, agent["name"])
+        _link_agent(index, agent["name"], _index_entry(team, agent, registry_file))
+
+
+def index_remove_agent(agent_name: str) -> None:
+    """Remove one agent from the global index."""
+    with locked_index() as index:
+        _unlink_agent(index, agent_name)
+
+
+def index_sync_team(
+    team: str, agents: list[dict[str, Any]], registry_file: str | None = None
+) -> None:
+    """Replace all index entries of a team with the given agent list."""
+    with locked_index() as index:
+        for name in list(index["by"]["team"].get(team, [])):
+            _unlink_agent(index, name)
+        for agent in agents:
+            _unlink_agent(index, agent["name"])
+            _link_agent(index, agent["name"], _index_entry(team, agent, registry_file))
+
+
+def rebuild_index(registry_files: list[str]) -> dict[str, Any]:
+    """Re-index the given team registry files, replacing their teams' entries.
+
+    Returns:
+        Summary with teams and agent counts indexed
+    """
+    indexed: dict[str, int] = {}
+    for registry_file in registry_files:
+        with open(registry_file, encoding="utf-8") as f:
+            registry = json.load(f)
+        team = registry["team"]["name"]
+        index_sync_team(team, registry.get("agents", []), registry_file)
+        indexed[team] = len(registry.get("agents", []))
+    return {"indexed_teams": indexed, "total_agents": load_index()["totals"]["agents"]}
+
+
+def query_index(
+    agent: str | None = None,
+    role: str | None = None,
+    host: str | None = None,
+    status: str | None = None,
+    team: str | None = None,
+) -> dict[str, Any]:
+    """Answer organisation-wide agent questions from the index.
+
+    Args:
+        agent: Exact agent name lookup (ignores the other filters)
+        role, host, status, team: Attribute filters (combined with AND)
+
+    Returns:
+        {count, agents: [entries]} for filter queries, the single entry for
+        an agent lookup, or totals when no filter is given
+    """
+    index = load_index()
+
+    if agent is not None:
+        entry = index["agents"].get(agent)
+        return {"found": entry is not None, "agent": entry}
+
+    filters = {"role": role, "host": host, "status": status, "team": team}
+    active = {f: v for f, v in filters.items() if v is not None}
+    if not active:
+        return {
+            "totals": index["totals"],
+            "teams": {t: len(n) for t, n in index["by"]["team"].items()},
+            "roles": {r: len(n) for r, n in index["by"]["role"].items()},
+            "hosts": {h: len(n) for h, n in index["by"]["host"].items()},
+            "last_updated": index.get("last_updated"),
+        }
+
+    buckets = sorted(
+        (index["by"][field].get(value, []) for field, value in active.items()),
+        key=len,
+    )
+    names = set(buckets[0])
+    for bucket in buckets[1:]:
+        names.intersection_update(bucket)
+    return {
+        "filters": active,
+        "count": len(names),
+        "agents": [index["agents"][n] for n in sorted(names)],
+    }
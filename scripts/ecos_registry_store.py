@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+ecos_registry_store.py - Transactional persistence for team-registry.json files.
+
+Every registry mutation runs as a transaction:
+1. Take an exclusive lock on <registry>.lock (concurrent ECOS commands
+   serialize instead of silently dropping each other's changes)
+2. Load the registry, recovering any journal entries the snapshot missed
+3. Apply the mutation and diff the result against the loaded state
+4. Append the diff to the append-only change journal
+   (<registry>.journal.jsonl) and fsync it
+5. Write the new snapshot to a temp file, fsync, and rename it over the
+   registry (the registry is never truncated in place)
+
+Journal entries record what changed, not how to recompute it:
+    {"seq": 7, "ts": "...", "op": "add-agent",
+     "changes": {"agents_added": [{...}], "agents_removed": ["name"],
+                 "agents_changed": {"name": {"status": "hibernated"}},
+                 "set": {"contacts_last_updated": "..."}, "unset": []}}
+A "snapshot" entry carries a full registry and is the base for replay, so
+a registry can be rebuilt from its journal alone, and readers can fetch
+"changes since revision N" instead of reloading the full file. The
+snapshot's "revision" field always equals the seq of the last applied
+journal entry.
+
+Dependencies: Python 3.8+ stdlib only (Unix file locking via fcntl)
+"""
+
+from __future__ import annotations
+
+import copy
+import fcntl
+import json
+import os
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, cast
+
+# Registry fields owned by the store rather than by mutations
+STORE_FIELDS = ("revision",)
+
+
+def get_timestamp() -> str:
+    """Get current ISO8601 timestamp."""
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def journal_path(registry_file: str | Path) -> Path:
+    """Return the change journal path for a registry file."""
+    path = Path(registry_file)
+    return path.with_name(f"{path.name}.journal.jsonl")
+
+
+def lock_path(registry_file: str | Path) -> Path:
+    """Return the lock file path for a registry file."""
+    path = Path(registry_file)
+    return path.with_name(f"{path.name}.lock")
+
+
+@contextmanager
+def registry_lock(registry_file: str | Path) -> Iterator[None]:
+    """Hold the exclusive mutation lock of a registry file."""
+    with open(lock_path(registry_file), "a", encoding="utf-8") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _atomic_write_json(path: Path, data: dict[str, Any]) -> None:
+    """Write JSON to a temp file, fsync it and rename it over path."""
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    # Persist the rename itself
+    dir_fd = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def _append_journal(registry_file: str | Path, entry: dict[str, Any]) -> None:
+    """Append one entry to the change journal and fsync it."""
+    with open(journal_path(registry_file), "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_journal(
+    registry_file: str | Path, since: int = 0
+) -> Iterator[dict[str, Any]]:
+    """Yield journal entries with seq > since, in order.
+
+    A torn final line (crash mid-append) is ignored.
+    """
+    path = journal_path(registry_file)
+    if not path.exists():
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if entry.get("seq", 0) > since:
+                yield cast(dict[str, Any], entry)
+
+
+def diff_registries(before: dict[str, Any], after: dict[str, Any]) -> dict[str, Any]:
+    """Compute the structured change between two registry states.
+
+    Returns:
+        {agents_added, agents_removed, agents_changed, set, unset}; all
+        empty when nothing changed. In agents_changed a None value means
+        the field was removed (registry agent fields are never null).
+    """
+    before_agents = {a["name"]: a for a in before.get("agents", [])}
+    after_agents = {a["name"]: a for a in after.get("agents", [])}
+
+    added = [a for name, a in after_agents.items() if name not in before_agents]
+    removed = [name for name in before_agents if name not in after_agents]
+    changed: dict[str, dict[str, Any]] = {}
+    for name, agent in after_agents.items():
+        old = before_agents.get(name)
+        if old is None or old == agent:
+            continue
+        fields = {k: v for k, v in agent.items() if old.get(k) != v}
+        fields.update({k: None for k in old if k not in agent})
+        changed[name] = fields
+
+    keys = (set(before) | set(after)) - {"agents", *STORE_FIELDS}
+    set_fields = {k: after[k] for k in keys if k in after and before.get(k) != after[k]}
+    unset = sorted(k for k in keys if k in before and k not in after)
+
+    return {
+        "agents_added": added,
+        "agents_removed": removed,
+        "agents_changed": changed,
+        "set": set_fields,
+        "unset": unset,
+    }
+
+
+def has_changes(changes: dict[str, Any]) -> bool:
+    """Return True if a diff contains any change."""
+    return any(changes.get(k) for k in changes)
+
+
+def apply_changes(registry: dict[str, Any], changes: dict[str, Any]) -> None:
+    """Apply a journal diff to a registry in place."""
+    removed = set(changes.get("agents_removed", []))
+    agents = [a for a in registry.get("agents", []) if a["name"] not in removed]
+    for agent in agents:
+        fields = changes.get("agents_changed", {}).get(agent["name"])
+        if fields:
+            for key, value in fields.items():
+                if value is None:
+                    agent.pop(key, None)
+                else:
+                    agent[key] = value
+    agents.extend(copy.deepcopy(changes.get("agents_added", [])))
+    registry["agents"] = agents
+    registry.update(copy.deepcopy(changes.get("set", {})))
+    for key in changes.get("unset", []):
+        registry.pop(key, None)
+
+
+def replay_journal(
+    registry_file: str | Path, base: dict[str, Any] | None = None
+) -> dict[str, Any] | None:
+    """Rebuild a registry by replaying its journal.
+
+    Args:
+        registry_file: Registry whose journal is replayed
+        base: Starting state (default: the last snapshot entry in the
+              journal); entries with seq <= base['revision'] are skipped
+
+    Returns:
+        The rebuilt registry, or None if the journal has no snapshot and
+        no base was given
+    """
+    registry = copy.deepcopy(base) if base is not None else None
+    for entry in read_journal(registry_file, (base or {}).get("revision", 0)):
+        if "registry" in entry:
+            registry = copy.deepcopy(entry["registry"])
+        elif registry is not None:
+            apply_changes(registry, entry["changes"])
+        else:
+            continue
+        registry["revision"] = entry["seq"]
+    return registry
+
+
+def load_registry(registry_file: str | Path) -> dict[str, Any]:
+    """Load a registry snapshot, applying journal entries it is missing.
+
+    A crash after the journal append but before the snapshot rename leaves
+    the snapshot one revision behind; the journal brings it forward.
+    """
+    with open(registry_file, encoding="utf-8") as f:
+        registry = cast(dict[str, Any], json.load(f))
+    recovered = replay_journal(registry_file, registry)
+    return recovered if recovered is not None else registry
+
+
+def _next_seq(registry: dict[str, Any], registry_file: str | Path) -> int:
+    """Return the next journal sequence number."""
+    last = registry.get("revision", 0)
+    for entry in read_journal(registry_file, last):
+        last = max(last, entry["seq"])
+    return int(last) + 1
+
+
+def write_registry_snapshot(
+    registry_file: str | Path, registry: dict[str, Any], op: str = "snapshot"
+) -> int:
+    """Journal a full registry snapshot and write it atomically.
+
+    Used when a registry is created or rebuilt; becomes the replay base.
+
+    Returns:
+        The new revision
+    """
+    path = Path(registry_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with registry_lock(path):
+        seq = _next_seq(registry, path) if path.exists() else 1
+        snapshot = {k: v for k, v in registry.items() if k not in STORE_FIELDS}
+        _append_journal(
+            path, {"seq": seq, "ts": get_timestamp(), "op": op, "registry": snapshot}
+        )
+        registry["revision"] = seq
+        _atomic_write_json(path, registry)
+    return seq
+
+
+@contextmanager
+def registry_transaction(
+    registry_file: str | Path, op: str
+) -> Iterator[dict[str, Any]]:
+    """Mutate a registry atomically with journaling.
+
+    Usage:
+        with registry_transaction(path, "add-agent") as registry:
+            add_agent_to_registry(registry, ...)
+
+    The body mutates the yielded registry in place. If it raises, nothing
+    is journaled or written. On commit registry["revision"] is the new
+    journal seq; a body that changes nothing writes nothing.
+    """
+    path = Path(registry_file)
+    with registry_lock(path):
+        registry = load_registry(path)
+        before = copy.deepcopy(registry)
+
+        # Registries written before journaling get a replay base first
+        if not journal_path(path).exists():
+            snapshot = {k: v for k, v in before.items() if k not in STORE_FIELDS}
+            seq = before.get("revision", 0) + 1
+            _append_journal(
+                path,
+                {
+                    "seq": seq,
+                    "ts": get_timestamp(),
+                    "op": "snapshot",
+                    "registry": snapshot,
+                },
+            )
+            before["revision"] = registry["revision"] = seq
+
+        yield registry
+
+        changes = diff_registries(before, registry)
+        if not has_changes(changes):
+            return
+        seq = _next_seq(before, path)
+        _append_journal(
+            path, {"seq": seq, "ts": get_timestamp(), "op": op, "changes": changes}
+        )
+        registry["revision"] = seq
+        _atomic_write_json(path, registry)
+
+
+def changes_since(registry_file: str | Path, revision: int) -> dict[str, Any]:
+    """Return journal entries after a revision for incremental readers.
+
+    Returns:
+        {from_revision, to_revision, entries}; if a snapshot entry is among
+        them the reader should replace its state rather than patch it
+    """
+    entries = list(read_journal(registry_file, revision))
+    return {
+        "from_revision": revision,
+        "to_revision": entries[-1]["seq"] if entries else revision,
+        "entries": entries,
+    }
+
+
+def rebuild_from_journal(registry_file: str | Path) -> dict[str, Any]:
+    """Rebuild a registry file entirely from its journal and write it."""
+    path = Path(registry_file)
+    with registry_lock(path):
+        registry = replay_journal(path)
+        if registry is None:
+            raise ValueError(f"No snapshot in journal {journal_path(path)}")
+        _atomic_write_json(path, registry)
+    return registry
+
+
+def compact_journal(registry_file: str | Path) -> int:
+    """Replace the journal with a single snapshot of the current state.
+
+    Readers asking for changes since a revision older than the compaction
+    get the snapshot entry and must reload.
+
+    Returns:
+        Number of entries removed
+    """
+    path = Path(registry_file)
+    with registry_lock(path):
+        registry = load_registry(path)
+        removed = sum(1 for _ in read_journal(path))
+        seq = int(registry.get("revision", 0))
+        snapshot = {k: v for k, v in registry.items() if k not in STORE_FIELDS}
+        entry = {
+            "seq": seq,
+            "ts": get_timestamp(),
+            "op": "snapshot",
+            "registry": snapshot,
+        }
+        tmp_path = journal_path(path).with_name(
+            f".{journal_path(path).name}.{uuid.uuid4().hex}.tmp"
+        )
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, journal_path(path))
+    return max(0, removed - 1)
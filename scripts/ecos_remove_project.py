@@ -26,6 +26,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+from ecos_state_index import index_content
+
 
 def get_state_file_path(cwd: str | None = None) -> Path:
     """Get the chief-of-staff state file path.
@@ -82,23 +84,10 @@ def get_project_info(content: str, project_id: str) -> dict[str, Any] | None:
     Returns:
         Project info dictionary or None if not found
     """
-    # Find projects section
-    pattern = r"## Projects\s*\n(.*?)(?=\n## |\Z)"
-    match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-    if not match:
-        return None
-
-    projects_section = match.group(1)
-
-    # Find specific project
-    project_pattern = rf"### {re.escape(project_id)}\s*\n(.*?)(?=\n### |\n## |\Z)"
-    project_match = re.search(
-        project_pattern, projects_section, re.DOTALL | re.IGNORECASE
-    )
-    if not project_match:
+    body = index_content(content).block_body("Projects", project_id)
+    if body is None:
         return None
 
-    body = project_match.group(1)
     project: dict[str, Any] = {
         "id": project_id,
         "repo_url": None,
@@ -138,13 +127,10 @@ def get_agents_for_project(content: str, project_id: str) -> list[str]:
     agents: list[str] = []
 
     # Find agents section
-    pattern = r"## Agents\s*\n(.*?)(?=\n## |\Z)"
-    match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-    if not match:
+    agents_section = index_content(content).section_body("Agents")
+    if agents_section is None:
         return agents
 
-    agents_section = match.group(1)
-
     # Parse each agent
     current_agent: str | None = None
     for line in agents_section.split("\n"):
@@ -170,23 +156,21 @@ def remove_project_from_state(content: str, project_id: str) -> str:
     Returns:
         Updated state file content
     """
-    # Find and remove the project entry from the ## Projects section
-    # First find projects section
-    projects_pattern = r"(## Projects\s*\n)(.*?)(?=\n## |\Z)"
-    projects_match = re.search(projects_pattern, content, re.DOTALL | re.IGNORECASE)
+    # Find the project block inside the ## Projects section
+    index = index_content(content)
+    section = index.section("Projects")
+    block = index.block("Projects", project_id)
 
-    if not projects_match:
+    if section is None:
         return content
 
-    projects_section = projects_match.group(2)
-
     # Remove the project from the section
-    updated_section = re.sub(
-        rf"### {re.escape(project_id)}\s*\n.*?(?=\n### |\Z)",
-        "",
-        projects_section,
-        flags=re.DOTALL | re.IGNORECASE,
-    )
+    updated_section = content[section.body_start : section.end]
+    if block is not None:
+        updated_section = (
+            content[section.body_start : block.start]
+            + content[block.end : section.end]
+        )
 
     # Clean up extra newlines
     updated_section = re.sub(r"\n{3,}", "\n\n", updated_section)
@@ -199,11 +183,7 @@ def remove_project_from_state(content: str, project_id: str) -> str:
         updated_section = "\n_No projects registered yet._\n"
 
     # Reconstruct content
-    start = projects_match.start(2)
-    end = projects_match.end(2)
-    updated_content = content[:start] + updated_section + content[end:]
-
-    return updated_content
+    return index.replace(section.body_start, section.end, updated_section).content
 
 
 def main() -> int:
@@ -5,7 +5,14 @@ ecos_session_start.py - Initialize Chief of Staff state on session start.
 SessionStart hook that loads the Chief of Staff state file and outputs a system
 message summarizing the staff status to help Claude resume work seamlessly.
 
+When design/memory exists, the summary also includes the memory resume
+digest (ecos_memory_digest.py): current focus, latest decisions, open
+in-flight errors and recent progress. The digest is a small cached file
+kept current by the memory writers, so the memory files themselves are
+only read when they were rewritten since the digest was built.
+
 State file: .claude/chief-of-staff-state.local.md
+Memory digest: design/memory/.resume-digest.json
 
 Dependencies: Python 3.8+ stdlib only
 
@@ -25,6 +32,13 @@ import os
 import sys
 from datetime import datetime
 from pathlib import Path
+from typing import Any
+
+from ecos_memory_digest import refresh_digest
+from ecos_memory_manager import MemoryConfig
+
+# Memory root relative to the project directory (ecos_memory_manager default)
+MEMORY_ROOT = Path("design") / "memory"
 
 
 def get_state_file(cwd: str) -> Path:
@@ -193,11 +207,76 @@ def parse_resource_alerts(content: str) -> list[str]:
     return alerts
 
 
+def load_memory_digest(cwd: str) -> dict[str, Any] | None:
+    """Load the memory resume digest of a project.
+
+    Args:
+        cwd: Current working directory
+
+    Returns:
+        The digest, or None if there is no memory root or it cannot be read
+    """
+    config = MemoryConfig(memory_root=Path(cwd) / MEMORY_ROOT)
+    if not config.memory_root.is_dir():
+        return None
+    try:
+        return refresh_digest(config)
+    except OSError as e:
+        print(f"WARNING: Cannot load memory digest: {e}", file=sys.stderr)
+        return None
+
+
+def format_memory_digest(digest: dict[str, Any]) -> list[str]:
+    """Format the memory resume digest as summary lines.
+
+    Args:
+        digest: Resume digest from load_memory_digest
+
+    Returns:
+        Summary lines (empty if the digest holds nothing)
+    """
+    lines = []
+    focus = digest.get("focus")
+    if focus and focus.get("text"):
+        lines.append(f"\nCURRENT FOCUS ({focus.get('updated') or 'unknown'}):")
+        for text in focus["text"].splitlines()[:3]:
+            lines.append(f"  {text[:70]}")
+
+    if digest["decisions"]:
+        lines.append("\nRECENT DECISIONS:")
+        for decision in digest["decisions"]:
+            lines.append(
+                f"  - [{decision['timestamp']}] {decision['category']}: "
+                f"{decision['text'][:60]}"
+            )
+
+    if digest["error_count"]:
+        lines.append(f"\n!!! OPEN IN-FLIGHT ERRORS ({digest['error_count']}) !!!")
+        for error in digest["errors"][:5]:
+            lines.append(
+                f"  ! [{error['timestamp']}] {error.get('step', '?')}/"
+                f"{error.get('agent', '?')} ({error.get('impact', '?')}): "
+                f"{error.get('error', '')[:50]}"
+            )
+        if digest["error_count"] > 5:
+            lines.append(f"  ... and {digest['error_count'] - 5} more")
+
+    if digest["progress"]:
+        lines.append("\nRECENT PROGRESS:")
+        for progress in digest["progress"][:5]:
+            workflow = f"[{progress['workflow']}] " if progress["workflow"] else ""
+            lines.append(
+                f"  - [{progress['timestamp']}] {workflow}{progress['text'][:60]}"
+            )
+    return lines
+
+
 def format_status_summary(
     agents: list[dict[str, str]],
     tasks: list[str],
     alerts: list[str],
-    session_count: int
+    session_count: int,
+    digest: dict[str, Any] | None = None,
 ) -> str:
     """Format staff status into a system message summary.
 
@@ -206,6 +285,7 @@ def format_status_summary(
         tasks: List of pending tasks
         alerts: List of resource alerts
         session_count: Number of sessions
+        digest: Memory resume digest, if the project has memory files
 
     Returns:
         Formatted summary string for system message
@@ -237,9 +317,14 @@ def format_status_summary(
         for alert in alerts:
             lines.append(f"  ! {alert}")
 
+    if digest:
+        lines.extend(format_memory_digest(digest))
+
     lines.append("")
     lines.append("=" * 60)
     lines.append("State file: .claude/chief-of-staff-state.local.md")
+    if digest:
+        lines.append(f"Memory: {MEMORY_ROOT.as_posix()}/ (ecos_memory_manager.py)")
     lines.append("=" * 60)
 
     return "\n".join(lines)
@@ -347,9 +432,10 @@ def main() -> int:
     tasks = parse_pending_tasks(content)
     alerts = parse_resource_alerts(content)
     session_count = get_session_count(content)
+    digest = load_memory_digest(cwd)
 
     # Output status summary
-    summary = format_status_summary(agents, tasks, alerts, session_count)
+    summary = format_status_summary(agents, tasks, alerts, session_count, digest)
     print(summary)
 
     return 0
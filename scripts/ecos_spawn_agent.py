@@ -4,6 +4,7 @@ ecos_spawn_agent.py - Spawn a new AI Maestro agent session.
 
 Usage:
     python ecos_spawn_agent.py ROLE SESSION_NAME [--project PROJECT_ID] [--plugins PLUGIN1,PLUGIN2] [--agent AGENT_NAME]
+        [--from-pool | --standby]
 
 Example:
     python ecos_spawn_agent.py orchestrator svgbbox-orchestrator --project svgbbox \
@@ -12,56 +13,67 @@ Example:
 
 import argparse
 import json
-import shutil
 import subprocess
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from ecos_metrics_store import record_event
+from ecos_plugin_store import install_plugin_tree, resolve_plugin_version
+from ecos_standby_pool import claim_standby, record_spawn_demand
 
-def get_marketplace_plugin_path(plugin_name: str) -> Path | None:
+
+def get_marketplace_plugin_path(
+    plugin_name: str, version: str | None = None
+) -> Path | None:
     """Get the path to a marketplace-installed plugin.
 
     Plugins are installed from emasoft-plugins marketplace to:
     ~/.claude/plugins/cache/emasoft-plugins/<plugin-name>/<version>/
 
-    Returns the latest version path, or None if not installed.
+    Versions are resolved through the plugin cache index, which orders
+    them by semantic version (1.10.0 > 1.9.0).
+
+    Returns the pinned (or latest) version path, or None if not installed.
     """
-    cache_dir = (
-        Path.home() / ".claude" / "plugins" / "cache" / "emasoft-plugins" / plugin_name
-    )
-    if not cache_dir.exists():
-        return None
+    return resolve_plugin_version(plugin_name, version)
 
-    # Find latest version directory
-    versions = sorted(cache_dir.iterdir(), reverse=True)
-    if versions:
-        return versions[0]
-    return None
 
+def split_plugin_spec(spec: str) -> tuple[str, str | None]:
+    """Split a 'name==version' plugin spec into (name, version).
+
+    A bare name resolves to the latest cached version.
+    """
+    name, _, version = spec.partition("==")
+    return name.strip(), (version.strip() or None)
 
-def install_marketplace_plugin(plugin_name: str, agent_dir: Path) -> bool:
+
+def install_marketplace_plugin(
+    plugin_name: str, agent_dir: Path, version: str | None = None
+) -> bool:
     """Install a plugin from emasoft-plugins marketplace to agent's local folder.
 
+    Files are materialized from the content-addressed plugin store
+    (ecos_plugin_store.py), so agents share identical plugin files via hard
+    links instead of each holding a full copy.
+
     Args:
         plugin_name: Name of the plugin (e.g., 'emasoft-orchestrator-agent')
         agent_dir: Path to the agent's directory (e.g., ~/agents/eoa-svgbbox/)
+        version: Pinned version (default: latest)
 
     Returns:
         True if successful, False if plugin not found in marketplace cache
     """
-    source_path = get_marketplace_plugin_path(plugin_name)
+    source_path = get_marketplace_plugin_path(plugin_name, version)
     if not source_path:
         return False
 
     dest_path = agent_dir / ".claude" / "plugins" / plugin_name
     dest_path.parent.mkdir(parents=True, exist_ok=True)
 
-    if dest_path.exists():
-        shutil.rmtree(dest_path)
-
-    shutil.copytree(source_path, dest_path)
+    install_plugin_tree(source_path, dest_path)
     return True
 
 
@@ -80,6 +92,10 @@ Examples:
 
     # Spawn with plugins
     python ecos_spawn_agent.py developer dev-01 --plugins linter,formatter
+
+    # Take a warm standby from the pool if one matches (falls back to a full spawn)
+    python ecos_spawn_agent.py programmer prog-01 --project my-app \
+        --plugins emasoft-programmer-agent --from-pool
         """,
     )
     parser.add_argument(
@@ -102,7 +118,7 @@ Examples:
         "--plugins",
         type=str,
         default=None,
-        help="Comma-separated list of plugins to load",
+        help="Comma-separated list of plugins to load (pin a version with name==1.2.0)",
     )
     parser.add_argument(
         "--agent",
@@ -110,6 +126,17 @@ Examples:
         default=None,
         help="Main agent name to inject via --agent CLI flag (e.g., eoa-orchestrator-main-agent)",
     )
+    pool_group = parser.add_mutually_exclusive_group()
+    pool_group.add_argument(
+        "--from-pool",
+        action="store_true",
+        help="Claim a matching warm standby instead of spawning (keeps the standby's session name)",
+    )
+    pool_group.add_argument(
+        "--standby",
+        action="store_true",
+        help="Spawn as a hibernated warm standby (used by ecos_standby_pool.py)",
+    )
     return parser.parse_args()
 
 
@@ -136,13 +163,50 @@ def main() -> int:
     """
     args = parse_args()
 
+    # Parse plugins list if provided (name or name==version)
+    plugin_versions: dict[str, str | None] = {}
+    if args.plugins:
+        for spec in args.plugins.split(","):
+            if spec.strip():
+                name, version = split_plugin_spec(spec)
+                plugin_versions[name] = version
+    plugins_list = list(plugin_versions)
+
+    # Claim a warm standby if requested; fall back to a full spawn otherwise
+    if args.from_pool:
+        claim = claim_standby(
+            args.role, args.project, plugins_list if args.plugins else None, args.agent
+        )
+        if claim is not None and claim["status"] == "success":
+            record_event(
+                "agent_spawned", claim["session_name"], args.project, role=args.role
+            )
+            result: dict[str, Any] = {
+                "status": "success",
+                "message": f"Agent '{claim['session_name']}' assigned from standby pool",
+                "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                "from_pool": True,
+                "session_name": claim["session_name"],
+                "requested_session_name": args.session_name,
+                "parameters": {
+                    "role": args.role,
+                    "session_name": claim["session_name"],
+                    "project": args.project,
+                    "plugins": plugins_list,
+                    "agent": args.agent,
+                    "agent_dir": claim["agent_dir"],
+                },
+            }
+            print(json.dumps(result, indent=2))
+            return 0
+
     # Build agent directory path (FLAT structure)
     agent_dir = Path.home() / "agents" / args.session_name
 
     # Check if agent already exists
     returncode, stdout, stderr = run_aimaestro_command(["show", args.session_name])
     if returncode == 127:
-        result: dict[str, Any] = {
+        result = {
             "status": "error",
             "message": "aimaestro-agent.sh not found in PATH",
             "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
@@ -160,17 +224,12 @@ def main() -> int:
         print(json.dumps(result, indent=2), file=sys.stderr)
         return 2
 
-    # Parse plugins list if provided
-    plugins_list = []
-    if args.plugins:
-        plugins_list = [p.strip() for p in args.plugins.split(",") if p.strip()]
-
     # Install plugins from emasoft-plugins marketplace to agent's local folder
     # Plugins are fetched from: ~/.claude/plugins/cache/emasoft-plugins/<plugin-name>/<version>/
     plugins_installed = []
     plugins_failed = []
     for plugin in plugins_list:
-        if install_marketplace_plugin(plugin, agent_dir):
+        if install_marketplace_plugin(plugin, agent_dir, plugin_versions[plugin]):
             plugins_installed.append(plugin)
         else:
             plugins_failed.append(plugin)
@@ -194,7 +253,10 @@ def main() -> int:
     create_args.extend(["--dir", str(agent_dir)])
 
     # Add task description
-    if args.project:
+    if args.standby:
+        create_args.extend(["--task", f"Standby {args.role}"])
+        create_args.extend(["--tags", f"role:{args.role},standby"])
+    elif args.project:
         create_args.extend(["--task", f"Work on {args.project}"])
         # Add tags
         create_args.extend(["--tags", f"project:{args.project},role:{args.role}"])
@@ -238,6 +300,28 @@ def main() -> int:
         print(json.dumps(result, indent=2), file=sys.stderr)
         return 1
 
+    if args.standby:
+        # Standbys are parked hibernated until claimed from the pool
+        returncode, _, stderr = run_aimaestro_command(["hibernate", args.session_name])
+        if returncode != 0:
+            result = {
+                "status": "error",
+                "message": f"Failed to hibernate standby '{args.session_name}'",
+                "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                "error": stderr,
+            }
+            print(json.dumps(result, indent=2), file=sys.stderr)
+            return 1
+    else:
+        # Feed spawn demand into standby pool sizing
+        try:
+            record_spawn_demand(
+                args.role, plugins_list if args.plugins else None, args.agent
+            )
+        except OSError as e:
+            print(f"Warning: Failed to record spawn demand: {e}", file=sys.stderr)
+        record_event("agent_spawned", args.session_name, args.project, role=args.role)
+
     # Success
     result = {
         "status": "success",
@@ -248,8 +332,10 @@ def main() -> int:
             "session_name": args.session_name,
             "project": args.project,
             "plugins": plugins_list,
+            "plugin_versions": plugin_versions,
             "agent": args.agent,
             "agent_dir": str(agent_dir),
+            "standby": args.standby,
         },
         "output": stdout,
     }
@@ -5,10 +5,17 @@ ecos_staff_status.py - Get status of all managed agents.
 Reads the chief-of-staff state file and outputs JSON with agent status information
 including session name, role, assigned project, status, and last heartbeat.
 
+With --watch, keeps the parsed state in memory and redraws a compact
+agents-by-project table (heartbeat age, per-session CPU/RSS, host) only
+when the state file, its heartbeat table or the team registry change.
+Change detection is mtime/size polling, so an idle watch costs a few
+stat() calls per interval.
+
 Dependencies: Python 3.8+ stdlib only
 
 Usage:
     ecos_staff_status.py [--project PROJECT_ID]
+    ecos_staff_status.py --watch [--interval 2] [--registry-file PATH]
 
 Exit codes:
     0 - Success
@@ -20,12 +27,31 @@ from __future__ import annotations
 import argparse
 import json
 import os
-import re
+import subprocess
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+from ecos_heartbeat_check import (
+    HEARTBEAT_TIMEOUT,
+    parse_agents_heartbeats,
+    parse_timestamp,
+)
+from ecos_state_index import (
+    FIELD_RE,
+    StateIndex,
+    index_content,
+    load_state_index,
+    parse_block_fields,
+)
+
+# Statuses that are not expected to send heartbeats
+QUIET_STATUSES = frozenset(
+    {"hibernated", "offline", "terminated", "done", "completed", "idle", "session_ended"}
+)
+
 
 def get_state_file_path(cwd: str | None = None) -> Path:
     """Get the chief-of-staff state file path.
@@ -61,20 +87,8 @@ def parse_yaml_block(content: str, block_name: str) -> list[dict[str, Any]]:
     """
     items: list[dict[str, Any]] = []
 
-    # Find the block section
-    pattern = rf"^## {block_name}\s*\n(.*?)(?=\n## |\Z)"
-    match = re.search(pattern, content, re.MULTILINE | re.DOTALL | re.IGNORECASE)
-    if not match:
-        return items
-
-    block_content = match.group(1)
-
     # Parse each item (indicated by ### or - with yaml-like structure)
-    item_pattern = r"^### ([^\n]+)\n(.*?)(?=\n### |\Z)"
-    for item_match in re.finditer(item_pattern, block_content, re.MULTILINE | re.DOTALL):
-        item_name = item_match.group(1).strip()
-        item_body = item_match.group(2)
-
+    for item_name, item_body in index_content(content).iter_blocks(block_name):
         item: dict[str, Any] = {"name": item_name}
 
         # Parse key: value pairs
@@ -82,7 +96,7 @@ def parse_yaml_block(content: str, block_name: str) -> list[dict[str, Any]]:
             line = line.strip()
             if line.startswith("- **") and "**:" in line:
                 # Format: - **Key**: Value
-                kv_match = re.match(r"- \*\*([^*]+)\*\*:\s*(.+)", line)
+                kv_match = FIELD_RE.match(line)
                 if kv_match:
                     key = kv_match.group(1).strip().lower().replace(" ", "_")
                     value = kv_match.group(2).strip()
@@ -111,21 +125,9 @@ def parse_agents_from_state(content: str) -> list[dict[str, Any]]:
     """
     agents: list[dict[str, Any]] = []
 
-    # Find agents section
-    pattern = r"## Agents\s*\n(.*?)(?=\n## |\Z)"
-    match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-    if not match:
-        return agents
-
-    agents_section = match.group(1)
-
     # Parse each agent entry
     # Format: ### session-name or - **Session**: session-name
-    agent_pattern = r"### ([^\n]+)\n(.*?)(?=\n### |\n## |\Z)"
-    for agent_match in re.finditer(agent_pattern, agents_section, re.DOTALL):
-        session = agent_match.group(1).strip()
-        body = agent_match.group(2)
-
+    for session, body in index_content(content).iter_blocks("Agents"):
         agent: dict[str, Any] = {
             "session": session,
             "role": "unknown",
@@ -135,21 +137,15 @@ def parse_agents_from_state(content: str) -> list[dict[str, Any]]:
         }
 
         # Parse fields from body
-        for line in body.split("\n"):
-            line = line.strip()
-            if line.startswith("- **"):
-                kv_match = re.match(r"- \*\*([^*]+)\*\*:\s*(.+)", line)
-                if kv_match:
-                    key = kv_match.group(1).strip().lower()
-                    value = kv_match.group(2).strip()
-                    if key == "role":
-                        agent["role"] = value
-                    elif key == "project":
-                        agent["project"] = value if value.lower() != "none" else None
-                    elif key == "status":
-                        agent["status"] = value
-                    elif key in ("heartbeat", "last_heartbeat", "last heartbeat"):
-                        agent["heartbeat"] = value
+        for key, value in parse_block_fields(body).items():
+            if key == "role":
+                agent["role"] = value
+            elif key == "project":
+                agent["project"] = value if value.lower() != "none" else None
+            elif key == "status":
+                agent["status"] = value
+            elif key in ("heartbeat", "last_heartbeat", "last heartbeat"):
+                agent["heartbeat"] = value
 
         agents.append(agent)
 
@@ -174,6 +170,227 @@ def filter_agents_by_project(
     return [a for a in agents if a.get("project") == project_id]
 
 
+def _file_signature(path: Path | None) -> tuple[int, int] | None:
+    """Return (mtime_ns, size) of a file, or None if it is missing."""
+    if path is None:
+        return None
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def sample_session_resources() -> dict[str, dict[str, float]]:
+    """Sum CPU% and RSS of the process tree of every tmux session.
+
+    AI Maestro runs each agent in a tmux session named after the agent, so
+    the pane processes and their descendants are that agent's footprint.
+
+    Returns:
+        {session_name: {"cpu_percent": float, "rss_mb": float}}; empty if
+        tmux or ps is unavailable
+    """
+    try:
+        panes = subprocess.run(
+            ["tmux", "list-panes", "-a", "-F", "#{session_name} #{pane_pid}"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+        procs = subprocess.run(
+            ["ps", "-eo", "pid=,ppid=,pcpu=,rss="],
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return {}
+    if panes.returncode != 0 or procs.returncode != 0:
+        return {}
+
+    children: dict[int, list[int]] = {}
+    usage: dict[int, tuple[float, float]] = {}
+    for line in procs.stdout.splitlines():
+        parts = line.split()
+        if len(parts) != 4:
+            continue
+        try:
+            pid, ppid = int(parts[0]), int(parts[1])
+            usage[pid] = (float(parts[2]), float(parts[3]))
+        except ValueError:
+            continue
+        children.setdefault(ppid, []).append(pid)
+
+    resources: dict[str, dict[str, float]] = {}
+    for line in panes.stdout.splitlines():
+        session, _, pane_pid = line.rpartition(" ")
+        if not pane_pid.isdigit():
+            continue
+        totals = resources.setdefault(session, {"cpu_percent": 0.0, "rss_mb": 0.0})
+        stack = [int(pane_pid)]
+        while stack:
+            pid = stack.pop()
+            cpu, rss_kb = usage.get(pid, (0.0, 0.0))
+            totals["cpu_percent"] += cpu
+            totals["rss_mb"] += rss_kb / 1024
+            stack.extend(children.get(pid, []))
+    return resources
+
+
+def _format_age(seconds: float | None) -> str:
+    """Format a heartbeat age compactly (45s, 12m, 3h, 2d)."""
+    if seconds is None:
+        return "-"
+    if seconds < 60:
+        # 10s steps keep an idle dashboard from redrawing every tick
+        return f"{int(seconds // 10) * 10}s"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}m"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)}h"
+    return f"{int(seconds // 86400)}d"
+
+
+class StaffWatcher:
+    """In-memory staff view that re-parses only the inputs that changed.
+
+    Inputs are the state file (agent blocks plus the Active Agents
+    heartbeat table), an optional team registry (host, registry status)
+    and sampled per-session resource use.
+    """
+
+    def __init__(
+        self,
+        state_file: Path,
+        registry_file: Path | None = None,
+        project: str | None = None,
+        resource_interval: float = 15.0,
+    ):
+        self.state_file = state_file
+        self.registry_file = registry_file
+        self.project = project
+        self.resource_interval = resource_interval
+        self.agents: list[dict[str, Any]] = []
+        self.heartbeats: dict[str, datetime] = {}
+        self.registry_agents: dict[str, dict[str, Any]] = {}
+        self.resources: dict[str, dict[str, float]] = {}
+        self._state_index: StateIndex | None = None
+        self._registry_signature: tuple[int, int] | None = None
+        self._resources_sampled_at = float("-inf")
+
+    def poll(self) -> bool:
+        """Refresh whatever changed since the last poll.
+
+        Returns:
+            True if any input changed
+        """
+        changed = False
+
+        # Cached by (mtime_ns, size): unchanged files cost one stat()
+        index = load_state_index(self.state_file)
+        if index is not self._state_index:
+            self._state_index = index
+            content = index.content if index is not None else ""
+            self.agents = filter_agents_by_project(
+                parse_agents_from_state(content), self.project
+            )
+            self.heartbeats = {
+                a["name"]: a["heartbeat_dt"]
+                for a in parse_agents_heartbeats(content)
+                if a["heartbeat_dt"] is not None
+            }
+            changed = True
+
+        signature = _file_signature(self.registry_file)
+        if signature != self._registry_signature:
+            self._registry_signature = signature
+            self.registry_agents = {}
+            if signature is not None and self.registry_file is not None:
+                try:
+                    with open(self.registry_file, encoding="utf-8") as f:
+                        registry = json.load(f)
+                    self.registry_agents = {a["name"]: a for a in registry["agents"]}
+                except (OSError, ValueError, KeyError):
+                    pass
+            changed = True
+
+        now = time.monotonic()
+        if (
+            self.resource_interval > 0
+            and now - self._resources_sampled_at >= self.resource_interval
+        ):
+            self._resources_sampled_at = now
+            resources = sample_session_resources()
+            if resources != self.resources:
+                self.resources = resources
+                changed = True
+
+        return changed
+
+    def heartbeat_age(self, agent: dict[str, Any], now: datetime) -> float | None:
+        """Seconds since the agent's newest known heartbeat."""
+        candidates = [self.heartbeats.get(agent["session"])]
+        if agent.get("heartbeat"):
+            candidates.append(parse_timestamp(agent["heartbeat"]))
+        known = [c for c in candidates if c is not None]
+        return (now - max(known)).total_seconds() if known else None
+
+    def render(self, now: datetime | None = None) -> str:
+        """Render the compact agents-by-project table."""
+        now = now or datetime.now()
+        projects: dict[str, list[dict[str, Any]]] = {}
+        for agent in self.agents:
+            projects.setdefault(agent["project"] or "-", []).append(agent)
+
+        lines = [
+            f"ECOS staff: {len(self.agents)} agent(s) in "
+            f"{len([p for p in projects if p != '-'])} project(s)"
+            f"   {now.strftime('%H:%M:%S')}",
+            f"{'PROJECT':<18} {'SESSION':<26} {'ROLE':<14} {'STATUS':<12} "
+            f"{'BEAT':>6} {'CPU%':>6} {'RSS MB':>7}  HOST",
+        ]
+        for project in sorted(projects):
+            for agent in sorted(projects[project], key=lambda a: a["session"]):
+                age = self.heartbeat_age(agent, now)
+                stale = agent["status"].lower() not in QUIET_STATUSES and (
+                    age is None or age > HEARTBEAT_TIMEOUT
+                )
+                usage = self.resources.get(agent["session"])
+                registered = self.registry_agents.get(agent["session"], {})
+                lines.append(
+                    f"{project:<18.18} {agent['session']:<26.26} "
+                    f"{agent['role']:<14.14} {agent['status']:<12.12} "
+                    f"{_format_age(age) + ('!' if stale else ' '):>6} "
+                    f"{round(usage['cpu_percent'], 1) if usage else '-':>6} "
+                    f"{round(usage['rss_mb']) if usage else '-':>7}  "
+                    f"{registered.get('host', '-')}"
+                )
+        return "\n".join(lines)
+
+
+def watch(watcher: StaffWatcher, interval: float) -> int:
+    """Redraw the staff table whenever its inputs or displayed ages change.
+
+    Idle cost per tick is a few stat() calls; the terminal is written only
+    when the rendered frame differs from the previous one.
+    """
+    clear = "\033[H\033[2J" if sys.stdout.isatty() else ""
+    last_frame = ""
+    try:
+        while True:
+            watcher.poll()
+            frame = watcher.render()
+            # Compare without the clock so an idle dashboard stays quiet
+            if frame.split("\n", 1)[-1] != last_frame.split("\n", 1)[-1]:
+                sys.stdout.write(clear + frame + "\n")
+                sys.stdout.flush()
+                last_frame = frame
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        return 0
+
+
 def main() -> int:
     """Main entry point.
 
@@ -197,10 +414,44 @@ def main() -> int:
         help="Working directory (defaults to current directory)",
     )
 
+    parser.add_argument(
+        "--watch",
+        "-w",
+        action="store_true",
+        help="Live table, redrawn when the state file, heartbeats or registry change",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=2.0,
+        help="Watch mode: seconds between change checks (default: 2)",
+    )
+    parser.add_argument(
+        "--registry-file",
+        type=str,
+        default=None,
+        help="Watch mode: team registry to show agent hosts from",
+    )
+    parser.add_argument(
+        "--resource-interval",
+        type=float,
+        default=15.0,
+        help="Watch mode: seconds between per-session resource samples (0 = off)",
+    )
+
     args = parser.parse_args()
 
     state_file = get_state_file_path(args.cwd)
 
+    if args.watch:
+        watcher = StaffWatcher(
+            state_file,
+            Path(args.registry_file) if args.registry_file else None,
+            args.project,
+            args.resource_interval,
+        )
+        return watch(watcher, args.interval)
+
     if not state_file.exists():
         result = {
             "success": False,
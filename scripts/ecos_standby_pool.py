@@ -0,0 +1,584 @@
+#!/usr/bin/env python3
+"""
+ecos_standby_pool.py - Warm standby agent pool for instant spawning and replacement.
+
+Keeps a small number of pre-spawned, hibernated agents per role with their
+plugins already installed. Spawning or replacing an agent then only needs
+to re-assign (update task/tags) and wake a standby instead of running the
+full show/copy-plugins/create sequence. The pool is refilled in the
+background after every claim.
+
+Pool sizing adapts to recent spawn demand per role: the target size for a
+role is the number of spawns expected during REFILL_HORIZON_HOURS, derived
+from the spawns seen during the last DEMAND_WINDOW_HOURS, capped by
+MAX_STANDBY_PER_ROLE. The total pool never exceeds the headroom left under
+MAX_CONCURRENT_AGENTS, and no standby is spawned while the resource monitor
+reports that spawning is unsafe.
+
+NOTE: AI Maestro has no rename operation, so a claimed standby keeps its
+session name. Callers must use the 'session_name' returned by claim.
+
+Dependencies: Python 3.8+ stdlib only (Unix file locking via fcntl)
+
+Usage:
+    python ecos_standby_pool.py status
+    python ecos_standby_pool.py refill [--role ROLE] [--min N] [--background]
+    python ecos_standby_pool.py claim --role ROLE [--project P] [--plugins P1,P2] [--agent A]
+    python ecos_standby_pool.py drain [--role ROLE]
+
+Exit codes:
+    0 - Success
+    1 - Error (or no standby available for claim)
+"""
+
+from __future__ import annotations
+
+import argparse
+import fcntl
+import json
+import math
+import os
+import subprocess
+import sys
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, cast
+
+from ecos_resource_monitor import (
+    can_spawn_agent,
+    get_claude_processes,
+    get_cpu_usage,
+    get_disk_usage,
+    get_memory_usage,
+)
+from ecos_team_registry import ROLE_CONSTRAINTS
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "shared"))
+from thresholds import MAX_CONCURRENT_AGENTS  # noqa: E402
+
+# Pool state
+ECOS_STATE_DIR = Path.home() / ".ecos"
+POOL_FILE = ECOS_STATE_DIR / "standby-pool.json"
+POOL_LOCK_FILE = ECOS_STATE_DIR / "standby-pool.lock"
+REFILL_LOCK_FILE = ECOS_STATE_DIR / "standby-refill.lock"
+
+# Demand-driven sizing
+DEMAND_WINDOW_HOURS = 24
+REFILL_HORIZON_HOURS = 4
+MAX_STANDBY_PER_ROLE = 3
+
+SPAWN_SCRIPT = Path(__file__).parent / "ecos_spawn_agent.py"
+
+
+def iso_now() -> str:
+    """Return current UTC timestamp in ISO format."""
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def run_aimaestro_command(args: list[str], timeout: int = 60) -> tuple[int, str, str]:
+    """Run aimaestro-agent.sh command."""
+    cmd = ["aimaestro-agent.sh"] + args
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        return (result.returncode, result.stdout.strip(), result.stderr.strip())
+    except subprocess.TimeoutExpired:
+        return (124, "", f"Command timed out after {timeout}s")
+    except FileNotFoundError:
+        return (127, "", "aimaestro-agent.sh not found in PATH")
+    except Exception as e:
+        return (1, "", str(e))
+
+
+def _empty_pool() -> dict[str, Any]:
+    """Return an empty pool state."""
+    return {"roles": {}, "last_updated": iso_now()}
+
+
+def _role_entry(pool: dict[str, Any], role: str) -> dict[str, Any]:
+    """Get (creating if needed) the pool entry for a role.
+
+    Each role entry holds:
+        standbys: [{name, plugins, agent, created_at}]
+        demand: [ISO timestamps of recent spawns/claims]
+        profile: {plugins, agent} of the most recent spawn for the role
+    """
+    roles = pool.setdefault("roles", {})
+    if role not in roles:
+        constraint = ROLE_CONSTRAINTS.get(role)
+        roles[role] = {
+            "standbys": [],
+            "demand": [],
+            "profile": {
+                "plugins": [constraint.plugin] if constraint else [],
+                "agent": None,
+            },
+        }
+    return cast(dict[str, Any], roles[role])
+
+
+@contextmanager
+def locked_pool() -> Iterator[dict[str, Any]]:
+    """Load the pool under an exclusive lock and save it on exit.
+
+    Concurrent spawn/claim/refill invocations serialize on POOL_LOCK_FILE.
+    The pool file is replaced atomically so readers never see a partial write.
+    """
+    ECOS_STATE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(POOL_LOCK_FILE, "a", encoding="utf-8") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            pool = load_pool()
+            yield pool
+            pool["last_updated"] = iso_now()
+            tmp_file = POOL_FILE.with_suffix(".json.tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(pool, f, indent=2)
+            os.replace(tmp_file, POOL_FILE)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def load_pool() -> dict[str, Any]:
+    """Load the pool state without locking (read-only snapshot)."""
+    if not POOL_FILE.exists():
+        return _empty_pool()
+    try:
+        with open(POOL_FILE, encoding="utf-8") as f:
+            return cast(dict[str, Any], json.load(f))
+    except (OSError, json.JSONDecodeError):
+        return _empty_pool()
+
+
+def _prune_demand(entry: dict[str, Any], now: datetime) -> None:
+    """Drop demand timestamps that fell out of the demand window."""
+    cutoff = now - timedelta(hours=DEMAND_WINDOW_HOURS)
+    kept = []
+    for ts in entry.get("demand", []):
+        try:
+            if datetime.fromisoformat(ts.replace("Z", "+00:00")) >= cutoff:
+                kept.append(ts)
+        except ValueError:
+            continue
+    entry["demand"] = kept
+
+
+def target_pool_size(entry: dict[str, Any], min_size: int = 0) -> int:
+    """Compute the adaptive standby target for a role.
+
+    Args:
+        entry: Role entry from the pool state (demand already pruned)
+        min_size: Floor for the target (e.g. to bootstrap a role)
+
+    Returns:
+        Number of standbys to keep for the role
+    """
+    recent = len(entry.get("demand", []))
+    expected = math.ceil(recent * REFILL_HORIZON_HOURS / DEMAND_WINDOW_HOURS)
+    return min(MAX_STANDBY_PER_ROLE, max(min_size, expected))
+
+
+def record_spawn_demand(
+    role: str, plugins: list[str] | None = None, agent: str | None = None
+) -> None:
+    """Record one spawn for a role so pool sizing tracks demand.
+
+    The role's standby profile follows the most recent spawn, so future
+    standbys carry the same plugins and main agent.
+    """
+    with locked_pool() as pool:
+        entry = _role_entry(pool, role)
+        entry["demand"].append(iso_now())
+        _prune_demand(entry, datetime.now(timezone.utc))
+        if plugins is not None:
+            entry["profile"] = {"plugins": sorted(plugins), "agent": agent}
+
+
+def _matches(
+    standby: dict[str, Any], plugins: list[str] | None, agent: str | None
+) -> bool:
+    """Check that a standby was built with the requested plugins and agent."""
+    if plugins is not None and sorted(plugins) != sorted(standby.get("plugins", [])):
+        return False
+    return agent is None or standby.get("agent") == agent
+
+
+def has_standby(
+    role: str, plugins: list[str] | None = None, agent: str | None = None
+) -> bool:
+    """Return True if a matching standby is currently pooled for the role."""
+    entry = load_pool().get("roles", {}).get(role, {})
+    return any(_matches(s, plugins, agent) for s in entry.get("standbys", []))
+
+
+def claim_standby(
+    role: str,
+    project: str | None = None,
+    plugins: list[str] | None = None,
+    agent: str | None = None,
+    refill: bool = True,
+) -> dict[str, Any] | None:
+    """Claim a standby for a role, assign it and wake it.
+
+    Args:
+        role: Role of the agent to claim
+        project: Project ID to assign the agent to
+        plugins: Required plugin set (None accepts the role profile)
+        agent: Required main agent (None accepts any)
+        refill: Start a background refill after claiming
+
+    Returns:
+        Claim result with 'session_name' and 'agent_dir', or None if no
+        matching standby is available
+    """
+    with locked_pool() as pool:
+        entry = _role_entry(pool, role)
+        standby = next(
+            (s for s in entry["standbys"] if _matches(s, plugins, agent)), None
+        )
+        if standby is None:
+            return None
+        entry["standbys"].remove(standby)
+        entry["demand"].append(iso_now())
+        _prune_demand(entry, datetime.now(timezone.utc))
+
+    name = standby["name"]
+    if project:
+        task = f"Work on {project}"
+        tags = f"project:{project},role:{role}"
+    else:
+        task = f"Agent with role {role}"
+        tags = f"role:{role}"
+
+    result: dict[str, Any] = {
+        "status": "success",
+        "session_name": name,
+        "role": role,
+        "project": project,
+        "plugins": standby.get("plugins", []),
+        "agent": standby.get("agent"),
+        "agent_dir": str(Path.home() / "agents" / name),
+        "standby_created_at": standby.get("created_at"),
+        "timestamp": iso_now(),
+    }
+
+    code, stdout, stderr = run_aimaestro_command(
+        ["update", name, "--task", task, "--tags", tags]
+    )
+    if code != 0:
+        result["assign_warning"] = stderr or stdout
+
+    code, stdout, stderr = run_aimaestro_command(["wake", name])
+    if code != 0:
+        # A standby that cannot be woken is discarded, not returned to the pool
+        result["status"] = "error"
+        result["error"] = stderr or stdout or "Wake failed"
+        code, stdout, stderr = run_aimaestro_command(["delete", name, "--confirm"])
+        if code != 0:
+            result["delete_warning"] = stderr or stdout or "Delete failed"
+
+    if refill:
+        refill_in_background()
+
+    return result
+
+
+def _spawn_standby(role: str, profile: dict[str, Any]) -> dict[str, Any]:
+    """Spawn one hibernated standby via ecos_spawn_agent.py --standby."""
+    name = f"standby-{role}-{uuid.uuid4().hex[:8]}"
+    cmd = [sys.executable, str(SPAWN_SCRIPT), role, name, "--standby"]
+    if profile.get("plugins"):
+        cmd.extend(["--plugins", ",".join(profile["plugins"])])
+    if profile.get("agent"):
+        cmd.extend(["--agent", profile["agent"]])
+
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+    except subprocess.TimeoutExpired:
+        return {"name": name, "success": False, "error": "Spawn timed out"}
+
+    if proc.returncode != 0:
+        return {
+            "name": name,
+            "success": False,
+            "error": (proc.stderr or proc.stdout).strip(),
+        }
+    return {
+        "name": name,
+        "success": True,
+        "plugins": profile.get("plugins", []),
+        "agent": profile.get("agent"),
+        "created_at": iso_now(),
+    }
+
+
+def _resource_headroom() -> tuple[bool, list[str], int]:
+    """Return (can_spawn, reasons, agent_slots_left) from the resource monitor."""
+    cpu = get_cpu_usage()
+    memory = get_memory_usage()
+    disk = get_disk_usage()
+    processes = get_claude_processes()
+    can_spawn, reasons = can_spawn_agent(cpu, memory, disk, processes)
+    slots = MAX_CONCURRENT_AGENTS - int(processes.get("count", 0))
+    return can_spawn, reasons, slots
+
+
+def refill_pool(roles: list[str] | None = None, min_size: int = 0) -> dict[str, Any]:
+    """Spawn standbys until every role reaches its adaptive target.
+
+    Args:
+        roles: Roles to refill (default: roles with recorded demand, or all
+               ROLE_CONSTRAINTS roles when min_size > 0)
+        min_size: Minimum standbys per refilled role
+
+    Returns:
+        Refill summary with spawned/failed standbys and skip reasons
+    """
+    summary: dict[str, Any] = {
+        "spawned": [],
+        "failed": [],
+        "skipped": [],
+        "timestamp": iso_now(),
+    }
+
+    with locked_pool() as pool:
+        now = datetime.now(timezone.utc)
+        if roles is None:
+            roles = list(ROLE_CONSTRAINTS) if min_size > 0 else list(pool["roles"])
+        plan: list[tuple[str, dict[str, Any], int]] = []
+        for role in roles:
+            entry = _role_entry(pool, role)
+            _prune_demand(entry, now)
+            missing = target_pool_size(entry, min_size) - len(entry["standbys"])
+            if missing > 0:
+                plan.append((role, dict(entry["profile"]), missing))
+        pooled = sum(len(e["standbys"]) for e in pool["roles"].values())
+
+    for role, profile, missing in plan:
+        for _ in range(missing):
+            can_spawn, reasons, slots = _resource_headroom()
+            if not can_spawn:
+                summary["skipped"].append({"role": role, "reasons": reasons})
+                return summary
+            if pooled >= slots:
+                summary["skipped"].append(
+                    {
+                        "role": role,
+                        "reasons": [
+                            f"Pool would exceed MAX_CONCURRENT_AGENTS headroom: "
+                            f"{pooled} pooled, {slots} slots left"
+                        ],
+                    }
+                )
+                return summary
+
+            spawned = _spawn_standby(role, profile)
+            if not spawned.pop("success"):
+                summary["failed"].append({"role": role, **spawned})
+                break
+
+            with locked_pool() as pool:
+                _role_entry(pool, role)["standbys"].append(spawned)
+            pooled += 1
+            summary["spawned"].append({"role": role, "name": spawned["name"]})
+
+    return summary
+
+
+def refill_in_background(role: str | None = None, min_size: int = 0) -> None:
+    """Start a detached refill so the caller does not wait for spawns.
+
+    Args:
+        role: Refill only this role (default: all roles)
+        min_size: Minimum standbys per role
+    """
+    cmd = [sys.executable, str(Path(__file__).resolve()), "refill"]
+    if role:
+        cmd.extend(["--role", role])
+    if min_size:
+        cmd.extend(["--min", str(min_size)])
+    try:
+        subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError as e:
+        print(f"Warning: Failed to start background refill: {e}", file=sys.stderr)
+
+
+def drain_pool(role: str | None = None) -> dict[str, Any]:
+    """Terminate pooled standbys (all roles, or a single role)."""
+    with locked_pool() as pool:
+        drained: list[str] = []
+        for name, entry in pool["roles"].items():
+            if role is None or name == role:
+                drained.extend(s["name"] for s in entry["standbys"])
+                entry["standbys"] = []
+
+    failed = []
+    for name in drained:
+        code, stdout, stderr = run_aimaestro_command(["delete", name, "--confirm"])
+        if code != 0:
+            failed.append({"name": name, "error": stderr or stdout})
+
+    return {
+        "drained": drained,
+        "failed": failed,
+        "timestamp": iso_now(),
+    }
+
+
+def pool_status() -> dict[str, Any]:
+    """Summarize standbys, recent demand and targets per role."""
+    pool = load_pool()
+    now = datetime.now(timezone.utc)
+    roles: dict[str, Any] = {}
+    for role, entry in pool.get("roles", {}).items():
+        _prune_demand(entry, now)
+        roles[role] = {
+            "standbys": [s["name"] for s in entry.get("standbys", [])],
+            "recent_demand": len(entry["demand"]),
+            "target": target_pool_size(entry),
+            "profile": entry.get("profile"),
+        }
+    return {
+        "roles": roles,
+        "total_standbys": sum(len(r["standbys"]) for r in roles.values()),
+        "max_concurrent_agents": MAX_CONCURRENT_AGENTS,
+        "last_updated": pool.get("last_updated"),
+        "timestamp": iso_now(),
+    }
+
+
+def cmd_status(args: argparse.Namespace) -> int:
+    """Handle 'status' command."""
+    print(json.dumps(pool_status(), indent=2))
+    return 0
+
+
+def cmd_refill(args: argparse.Namespace) -> int:
+    """Handle 'refill' command."""
+    if args.background:
+        refill_in_background(args.role, args.min)
+        print(json.dumps({"status": "started", "timestamp": iso_now()}, indent=2))
+        return 0
+
+    # Only one refill at a time; concurrent triggers are no-ops
+    ECOS_STATE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(REFILL_LOCK_FILE, "a", encoding="utf-8") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            print(json.dumps({"status": "already_running", "timestamp": iso_now()}))
+            return 0
+        roles = [args.role] if args.role else None
+        result = refill_pool(roles, args.min)
+
+    print(json.dumps(result, indent=2))
+    return 0 if not result["failed"] else 1
+
+
+def cmd_claim(args: argparse.Namespace) -> int:
+    """Handle 'claim' command."""
+    plugins = (
+        [p.strip() for p in args.plugins.split(",") if p.strip()]
+        if args.plugins is not None
+        else None
+    )
+    result = claim_standby(
+        args.role, args.project, plugins, args.agent, refill=not args.no_refill
+    )
+    if result is None:
+        print(
+            json.dumps(
+                {
+                    "status": "empty",
+                    "message": f"No standby available for role '{args.role}'",
+                    "timestamp": iso_now(),
+                },
+                indent=2,
+            )
+        )
+        return 1
+    print(json.dumps(result, indent=2))
+    return 0 if result["status"] == "success" else 1
+
+
+def cmd_drain(args: argparse.Namespace) -> int:
+    """Handle 'drain' command."""
+    result = drain_pool(args.role)
+    print(json.dumps(result, indent=2))
+    return 0 if not result["failed"] else 1
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Warm standby agent pool for instant spawning and replacement.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Commands:
+    status  Show standbys, recent demand and targets per role
+    refill  Spawn hibernated standbys up to each role's target
+    claim   Assign and wake a standby for a role
+    drain   Terminate pooled standbys
+
+Examples:
+    # Bootstrap one standby per team role
+    python ecos_standby_pool.py refill --min 1
+
+    # Claim a programmer for a project
+    python ecos_standby_pool.py claim --role programmer --project svgbbox
+
+    # Remove all standbys
+    python ecos_standby_pool.py drain
+        """,
+    )
+
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    status_parser = subparsers.add_parser("status", help="Show pool status")
+    status_parser.set_defaults(func=cmd_status)
+
+    refill_parser = subparsers.add_parser("refill", help="Refill the standby pool")
+    refill_parser.add_argument("--role", help="Refill only this role")
+    refill_parser.add_argument(
+        "--min", type=int, default=0, help="Minimum standbys per role (default: 0)"
+    )
+    refill_parser.add_argument(
+        "--background", action="store_true", help="Refill in a detached process"
+    )
+    refill_parser.set_defaults(func=cmd_refill)
+
+    claim_parser = subparsers.add_parser("claim", help="Claim a standby agent")
+    claim_parser.add_argument("--role", required=True, help="Role to claim")
+    claim_parser.add_argument("--project", help="Project ID to assign")
+    claim_parser.add_argument(
+        "--plugins", default=None, help="Required comma-separated plugin set"
+    )
+    claim_parser.add_argument("--agent", default=None, help="Required main agent")
+    claim_parser.add_argument(
+        "--no-refill", action="store_true", help="Do not refill after claiming"
+    )
+    claim_parser.set_defaults(func=cmd_claim)
+
+    drain_parser = subparsers.add_parser("drain", help="Terminate pooled standbys")
+    drain_parser.add_argument("--role", help="Drain only this role")
+    drain_parser.set_defaults(func=cmd_drain)
+
+    return parser.parse_args()
+
+
+def main() -> int:
+    """Main entry point."""
+    args = parse_args()
+    return cast(int, args.func(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+ecos_state_index.py - Section/block index for the chief-of-staff state file.
+
+The state file (.claude/chief-of-staff-state.local.md) is markdown with
+"## Section" headers (Agents, Projects, ...) containing "### name" blocks
+of "- **Key**: Value" fields. Instead of every lookup running its own
+DOTALL regex over the whole file, one line-by-line pass maps:
+
+    section (lower-cased title)        -> Span(start, body_start, end)
+    (section, block name lower-cased)  -> Span(start, body_start, end)
+
+Spans follow the semantics of the regexes they replace: a body ends just
+before the newline that precedes the next header (or at end of file), and
+names match case-insensitively (first occurrence wins).
+
+Indexes are cached per content string (repeated lookups on the same
+content are dict lookups) and per file by (mtime_ns, size). Edits go
+through StateIndex.replace(), which splices the content and shifts the
+following spans instead of re-parsing, unless the edit touches headers.
+
+Dependencies: Python 3.8+ stdlib only
+"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import NamedTuple
+
+# "- **Key**: Value" field lines inside a block
+FIELD_RE = re.compile(r"- \*\*([^*]+)\*\*:\s*(.+)")
+
+# Cached indexes per content string and per file
+_MAX_CACHED_CONTENTS = 8
+_content_cache: dict[int, StateIndex] = {}
+_file_cache: dict[str, tuple[tuple[int, int], StateIndex]] = {}
+
+
+class Span(NamedTuple):
+    """Location of a section or block: header start, body start, body end."""
+
+    name: str
+    start: int
+    body_start: int
+    end: int
+
+
+def _is_header(line: str) -> bool:
+    """Return True if a line is a section (##) or block (###) header."""
+    return line.startswith("## ") or line.startswith("### ")
+
+
+class StateIndex:
+    """Section and block spans of one state file content."""
+
+    def __init__(
+        self,
+        content: str,
+        sections: dict[str, Span],
+        blocks: dict[str, dict[str, Span]],
+    ):
+        self.content = content
+        self.sections = sections
+        self.blocks = blocks
+
+    def section(self, name: str) -> Span | None:
+        """Return the span of a section by (case-insensitive) title."""
+        return self.sections.get(name.strip().lower())
+
+    def section_body(self, name: str) -> str | None:
+        """Return the body text of a section, or None if it is missing."""
+        span = self.section(name)
+        return None if span is None else self.content[span.body_start : span.end]
+
+    def block(self, section: str, name: str) -> Span | None:
+        """Return the span of a block inside a section (case-insensitive)."""
+        return self.blocks.get(section.strip().lower(), {}).get(name.strip().lower())
+
+    def block_body(self, section: str, name: str) -> str | None:
+        """Return the body text of a block, or None if it is missing."""
+        span = self.block(section, name)
+        return None if span is None else self.content[span.body_start : span.end]
+
+    def iter_blocks(self, section: str) -> list[tuple[str, str]]:
+        """Return (name, body) of every block of a section, in file order."""
+        spans = self.blocks.get(section.strip().lower(), {}).values()
+        return [
+            (span.name, self.content[span.body_start : span.end])
+            for span in sorted(spans, key=lambda s: s.start)
+        ]
+
+    def replace(self, start: int, end: int, text: str) -> StateIndex:
+        """Replace content[start:end] with text and return the new index.
+
+        Spans after the edit are shifted by the length difference. The
+        content is re-indexed from scratch only if the edit adds, removes
+        or touches a header line.
+        """
+        new_content = self.content[:start] + text + self.content[end:]
+        delta = len(text) - (end - start)
+        spans = list(self.sections.values()) + [
+            span for blocks in self.blocks.values() for span in blocks.values()
+        ]
+        touches_header = any(
+            start <= s.start < end
+            or start < s.body_start < end
+            or start < s.end < end
+            for s in spans
+        ) or any(_is_header(line) for line in text.split("\n"))
+        if touches_header:
+            index = build_state_index(new_content)
+        else:
+
+            def shift(span: Span) -> Span:
+                # Text inserted exactly at a body start (start == end)
+                # lands inside that body, so the body start stays put
+                body_start = span.body_start
+                if body_start > end or (body_start == end and start < end):
+                    body_start += delta
+                return Span(
+                    span.name,
+                    span.start + delta if span.start >= end else span.start,
+                    body_start,
+                    span.end + delta if span.end >= end else span.end,
+                )
+
+            index = StateIndex(
+                new_content,
+                {key: shift(s) for key, s in self.sections.items()},
+                {
+                    sec: {key: shift(s) for key, s in blocks.items()}
+                    for sec, blocks in self.blocks.items()
+                },
+            )
+        _remember(index)
+        return index
+
+
+def build_state_index(content: str) -> StateIndex:
+    """Index all sections and blocks of a state file in one pass."""
+    sections: dict[str, Span] = {}
+    blocks: dict[str, dict[str, Span]] = {}
+    # Open header being indexed: (name, start, body_start)
+    section: tuple[str, int, int] | None = None
+    block: tuple[str, int, int] | None = None
+
+    def close(
+        spans: dict[str, Span], header: tuple[str, int, int], pos: int
+    ) -> None:
+        name, start, body_start = header
+        # Bodies end before the newline that precedes the next header
+        end = pos - 1 if pos < len(content) and content[pos - 1] == "\n" else pos
+        spans.setdefault(
+            name.lower(), Span(name, start, body_start, max(body_start, end))
+        )
+
+    pos = 0
+    for line in content.splitlines(keepends=True):
+        is_section = line.startswith("## ")
+        is_block = line.startswith("### ") and section is not None
+        if is_section or is_block:
+            if block is not None and section is not None:
+                close(blocks.setdefault(section[0].lower(), {}), block, pos)
+                block = None
+            if is_section:
+                if section is not None:
+                    close(sections, section, pos)
+                section = (line[3:].strip(), pos, pos + len(line))
+            else:
+                block = (line[4:].strip(), pos, pos + len(line))
+        pos += len(line)
+
+    if block is not None and section is not None:
+        close(blocks.setdefault(section[0].lower(), {}), block, pos)
+    if section is not None:
+        close(sections, section, pos)
+
+    index = StateIndex(content, sections, blocks)
+    _remember(index)
+    return index
+
+
+def _remember(index: StateIndex) -> None:
+    """Add an index to the per-content cache (bounded, oldest evicted)."""
+    _content_cache[id(index.content)] = index
+    while len(_content_cache) > _MAX_CACHED_CONTENTS:
+        del _content_cache[next(iter(_content_cache))]
+
+
+def index_content(content: str) -> StateIndex:
+    """Return the index of a content string, building it at most once.
+
+    The cache holds a reference to the string, so an id() hit that is the
+    same object is always the same content.
+    """
+    index = _content_cache.get(id(content))
+    if index is not None and index.content is content:
+        return index
+    return build_state_index(content)
+
+
+def load_state_index(path: Path) -> StateIndex | None:
+    """Return the index of a state file, re-reading it only if it changed.
+
+    Returns:
+        The index, or None if the file cannot be read
+    """
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _file_cache.get(str(path))
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    try:
+        content = path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+    index = build_state_index(content)
+    _file_cache[str(path)] = (key, index)
+    return index
+
+
+def parse_block_fields(body: str) -> dict[str, str]:
+    """Parse "- **Key**: Value" lines of a block body.
+
+    Returns:
+        Lower-cased keys (spaces kept) mapped to stripped values; a
+        repeated key keeps its last value
+    """
+    fields: dict[str, str] = {}
+    for line in body.split("\n"):
+        line = line.strip()
+        if line.startswith("- **"):
+            match = FIELD_RE.match(line)
+            if match:
+                fields[match.group(1).strip().lower()] = match.group(2).strip()
+    return fields
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+ecos_state_rollup.py - Org-wide queries across many workspaces' ECOS state.
+
+Each workspace keeps its own .claude/chief-of-staff-state.local.md, so the
+per-workspace scripts (ecos_list_projects.py, ecos_staff_status.py) only
+see one project set. This script discovers state files under configured
+workspace roots, parses each one at most once per (mtime, size) and
+answers federated queries:
+
+    agents-per-project   Agents assigned to each project, across workspaces
+    stale-heartbeats     Agents expected to be alive whose heartbeat is old
+    no-orchestrator      Projects with no orchestrator agent assigned
+    files                State files found and whether they were re-parsed
+
+Roots come from --root and from ~/.ecos/workspace-roots.json
+({"roots": ["~/Code", ...], "max_depth": 3}). Roots are walked in parallel
+and changed files parsed in parallel; parsed results are kept in
+~/.ecos/state-rollup-cache.json so unchanged workspaces cost one stat().
+
+Dependencies: Python 3.8+ stdlib only
+
+Usage:
+    ecos_state_rollup.py agents-per-project [--root DIR ...]
+    ecos_state_rollup.py stale-heartbeats [--timeout SECONDS] [--root DIR ...]
+    ecos_state_rollup.py no-orchestrator [--root DIR ...]
+    ecos_state_rollup.py files [--root DIR ...]
+
+Exit codes:
+    0 - Success
+    1 - Error (no roots configured, unreadable config)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "shared"))
+
+from ecos_heartbeat_check import parse_agents_heartbeats, parse_timestamp  # noqa: E402
+from ecos_list_projects import parse_projects_from_state  # noqa: E402
+from ecos_staff_status import QUIET_STATUSES, parse_agents_from_state  # noqa: E402
+from thresholds import HEARTBEAT_TIMEOUT_SECONDS  # noqa: E402
+
+ECOS_STATE_DIR = Path.home() / ".ecos"
+ROOTS_CONFIG_FILE = ECOS_STATE_DIR / "workspace-roots.json"
+ROLLUP_CACHE_FILE = ECOS_STATE_DIR / "state-rollup-cache.json"
+
+STATE_FILE_RELPATH = Path(".claude") / "chief-of-staff-state.local.md"
+DEFAULT_MAX_DEPTH = 3
+MAX_WORKERS = 8
+
+# Directories never worth descending into while looking for workspaces
+SKIP_DIRS = frozenset(
+    {"node_modules", "__pycache__", "venv", ".venv", "dist", "build", "target"}
+)
+
+
+def load_roots_config() -> dict[str, Any]:
+    """Load configured workspace roots (empty config if none)."""
+    if not ROOTS_CONFIG_FILE.exists():
+        return {"roots": [], "max_depth": DEFAULT_MAX_DEPTH}
+    with open(ROOTS_CONFIG_FILE, encoding="utf-8") as f:
+        config: dict[str, Any] = json.load(f)
+    config.setdefault("roots", [])
+    config.setdefault("max_depth", DEFAULT_MAX_DEPTH)
+    return config
+
+
+def discover_state_files(root: Path, max_depth: int) -> list[Path]:
+    """Find workspace state files under a root, up to max_depth levels down.
+
+    Hidden directories and dependency/build directories are skipped; a
+    workspace's own subdirectories are not searched once its state file
+    is found.
+    """
+    found: list[Path] = []
+    stack = [(root, 0)]
+    while stack:
+        directory, depth = stack.pop()
+        state_file = directory / STATE_FILE_RELPATH
+        if state_file.is_file():
+            found.append(state_file)
+            continue
+        if depth >= max_depth:
+            continue
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if (
+                entry.is_dir(follow_symlinks=False)
+                and not entry.name.startswith(".")
+                and entry.name not in SKIP_DIRS
+            ):
+                stack.append((Path(entry.path), depth + 1))
+    return found
+
+
+def load_cache() -> dict[str, Any]:
+    """Load the parsed-file cache ({path: entry})."""
+    try:
+        with open(ROLLUP_CACHE_FILE, encoding="utf-8") as f:
+            cache: dict[str, Any] = json.load(f)
+        return cache
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_cache(cache: dict[str, Any]) -> None:
+    """Atomically write the parsed-file cache."""
+    ECOS_STATE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_file = ROLLUP_CACHE_FILE.with_name(
+        f".{ROLLUP_CACHE_FILE.name}.{uuid.uuid4().hex}.tmp"
+    )
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(tmp_file, ROLLUP_CACHE_FILE)
+
+
+def parse_state_file(path: Path) -> dict[str, Any]:
+    """Parse one workspace state file into cacheable agents and projects."""
+    content = path.read_text(encoding="utf-8")
+    heartbeats = {
+        a["name"]: a["heartbeat"] for a in parse_agents_heartbeats(content)
+    }
+    agents = parse_agents_from_state(content)
+    for agent in agents:
+        # The Active Agents table is refreshed more often than agent blocks
+        agent["table_heartbeat"] = heartbeats.get(agent["session"])
+    return {
+        "workspace": str(path.parent.parent),
+        "agents": agents,
+        "projects": [p["id"] for p in parse_projects_from_state(content)],
+    }
+
+
+def _refresh_entry(
+    path: Path, cached: dict[str, Any] | None
+) -> tuple[str, dict[str, Any] | None, bool]:
+    """Return (path, entry, reparsed) for a state file, reusing the cache."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return str(path), None, False
+    signature = [stat.st_mtime_ns, stat.st_size]
+    if cached is not None and cached.get("signature") == signature:
+        return str(path), cached, False
+    try:
+        entry = parse_state_file(path)
+    except (OSError, UnicodeDecodeError):
+        return str(path), None, False
+    entry["signature"] = signature
+    return str(path), entry, True
+
+
+def collect_states(roots: list[Path], max_depth: int) -> dict[str, Any]:
+    """Discover and parse all state files under the roots, in parallel.
+
+    Returns:
+        {"entries": {path: entry}, "reparsed": [paths]}
+    """
+    cache = load_cache()
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        discovered = pool.map(lambda r: discover_state_files(r, max_depth), roots)
+        paths = sorted({str(p) for found in discovered for p in found})
+        refreshed = list(
+            pool.map(lambda p: _refresh_entry(Path(p), cache.get(p)), paths)
+        )
+
+    entries = {path: entry for path, entry, _ in refreshed if entry is not None}
+    reparsed = [path for path, entry, changed in refreshed if changed]
+    # Cached files under these roots that are gone; other roots stay cached
+    root_prefixes = tuple(str(r.resolve()) + os.sep for r in roots)
+    vanished = [
+        p
+        for p in cache
+        if p not in entries and str(Path(p).resolve()).startswith(root_prefixes)
+    ]
+    if reparsed or vanished:
+        cache.update(entries)
+        for path in vanished:
+            del cache[path]
+        save_cache(cache)
+    return {"entries": entries, "reparsed": reparsed}
+
+
+def _heartbeat_age(agent: dict[str, Any], now: datetime) -> float | None:
+    """Seconds since the newest heartbeat recorded for an agent."""
+    stamps = [agent.get("heartbeat"), agent.get("table_heartbeat")]
+    parsed = [parse_timestamp(s) for s in stamps if s]
+    known = [p for p in parsed if p is not None]
+    return (now - max(known)).total_seconds() if known else None
+
+
+def query_agents_per_project(entries: dict[str, Any]) -> dict[str, Any]:
+    """Agents assigned to each project across all workspaces."""
+    projects: dict[str, dict[str, Any]] = {}
+    for entry in entries.values():
+        for project_id in entry["projects"]:
+            projects.setdefault(project_id, {"agents": [], "workspaces": []})
+            projects[project_id]["workspaces"].append(entry["workspace"])
+        for agent in entry["agents"]:
+            if not agent.get("project"):
+                continue
+            bucket = projects.setdefault(
+                agent["project"], {"agents": [], "workspaces": []}
+            )
+            bucket["agents"].append(
+                {
+                    "session": agent["session"],
+                    "role": agent["role"],
+                    "status": agent["status"],
+                    "workspace": entry["workspace"],
+                }
+            )
+    return {
+        "project_count": len(projects),
+        "projects": {
+            pid: {**info, "agent_count": len(info["agents"])}
+            for pid, info in sorted(projects.items())
+        },
+    }
+
+
+def query_stale_heartbeats(
+    entries: dict[str, Any], timeout: float = HEARTBEAT_TIMEOUT_SECONDS
+) -> dict[str, Any]:
+    """Agents expected to be alive whose newest heartbeat is too old."""
+    now = datetime.now()
+    stale = []
+    for entry in entries.values():
+        for agent in entry["agents"]:
+            if agent["status"].lower() in QUIET_STATUSES:
+                continue
+            age = _heartbeat_age(agent, now)
+            if age is None or age > timeout:
+                stale.append(
+                    {
+                        "session": agent["session"],
+                        "role": agent["role"],
+                        "project": agent["project"],
+                        "status": agent["status"],
+                        "seconds_since": None if age is None else int(age),
+                        "workspace": entry["workspace"],
+                    }
+                )
+    # Oldest first; agents that never sent a heartbeat lead the list
+    stale.sort(
+        key=lambda a: (a["seconds_since"] is not None, -(a["seconds_since"] or 0))
+    )
+    return {"timeout_seconds": timeout, "count": len(stale), "agents": stale}
+
+
+def query_no_orchestrator(entries: dict[str, Any]) -> dict[str, Any]:
+    """Projects that no orchestrator agent is assigned to."""
+    per_project = query_agents_per_project(entries)["projects"]
+    missing = [
+        {
+            "project": pid,
+            "agent_count": info["agent_count"],
+            "workspaces": info["workspaces"],
+        }
+        for pid, info in per_project.items()
+        if not any("orchestrator" in a["role"].lower() for a in info["agents"])
+    ]
+    return {"count": len(missing), "projects": missing}
+
+
+def main() -> int:
+    """Main entry point.
+
+    Returns:
+        Exit code: 0 for success, 1 for error
+    """
+    parser = argparse.ArgumentParser(
+        description="Org-wide queries across ECOS workspace state files"
+    )
+    parser.add_argument(
+        "query",
+        choices=[
+            "agents-per-project",
+            "stale-heartbeats",
+            "no-orchestrator",
+            "files",
+        ],
+        help="Query to run",
+    )
+    parser.add_argument(
+        "--root",
+        action="append",
+        default=[],
+        help="Workspace root to scan (repeatable; adds to the configured roots)",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=None,
+        help="Directory levels to search below each root "
+        f"(default: {DEFAULT_MAX_DEPTH})",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=HEARTBEAT_TIMEOUT_SECONDS,
+        help="stale-heartbeats: heartbeat age in seconds considered stale",
+    )
+
+    args = parser.parse_args()
+
+    try:
+        config = load_roots_config()
+    except (OSError, json.JSONDecodeError) as e:
+        result = {"success": False, "error": f"Bad {ROOTS_CONFIG_FILE}: {e}"}
+        print(json.dumps(result, indent=2))
+        return 1
+
+    roots = [Path(r).expanduser().resolve() for r in config["roots"] + args.root]
+    if not roots:
+        result = {
+            "success": False,
+            "error": "No workspace roots: pass --root or configure "
+            f"{ROOTS_CONFIG_FILE}",
+        }
+        print(json.dumps(result, indent=2))
+        return 1
+    max_depth = args.max_depth if args.max_depth is not None else config["max_depth"]
+
+    collected = collect_states(roots, max_depth)
+    entries = collected["entries"]
+
+    if args.query == "agents-per-project":
+        result = query_agents_per_project(entries)
+    elif args.query == "stale-heartbeats":
+        result = query_stale_heartbeats(entries, args.timeout)
+    elif args.query == "no-orchestrator":
+        result = query_no_orchestrator(entries)
+    else:
+        result = {
+            "files": sorted(entries),
+            "reparsed": collected["reparsed"],
+        }
+
+    output = {
+        "success": True,
+        "timestamp": datetime.now().isoformat(),
+        "query": args.query,
+        "roots": [str(r) for r in roots],
+        "state_files": len(entries),
+        **result,
+    }
+    print(json.dumps(output, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,18 +11,51 @@ Usage:
     python ecos_team_registry.py remove-agent --team <name> --agent-name <name>
     python ecos_team_registry.py update-status --team <name> --agent-name <name> --status <status>
     python ecos_team_registry.py list --team <name>
-    python ecos_team_registry.py publish --team <name> --repo-path <path>
+    python ecos_team_registry.py publish --team <name> --repo-path <path> [--notify] [--settle <seconds>]
     python ecos_team_registry.py validate --team <name>
+    python ecos_team_registry.py query [--agent <name>] [--role <role>] [--host <host>] [--status <status>] [--team <name>]
+    python ecos_team_registry.py reindex --registry-file <path> [<path> ...]
+    python ecos_team_registry.py apply-plan --plan <plan.json> [--dry-run]
+    python ecos_team_registry.py changes --registry-file <path> [--since <revision>]
+    python ecos_team_registry.py rebuild --registry-file <path>
+    python ecos_team_registry.py compact-journal --registry-file <path>
+
+Mutations (add-agent, remove-agent, update-status) run as locked
+transactions: each appends a diff to <registry>.journal.jsonl and then
+atomically replaces the registry file (see ecos_registry_store.py).
 """
 
 import argparse
+import hashlib
 import json
+import os
 import subprocess
 import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, cast
 
+from ecos_registry_index import (
+    index_remove_agent,
+    index_sync_team,
+    index_upsert_agent,
+    query_index,
+    rebuild_index,
+)
+from ecos_registry_store import (
+    changes_since,
+    compact_journal,
+    diff_registries,
+    load_registry,
+    rebuild_from_journal,
+    registry_transaction,
+    write_registry_snapshot,
+)
+
 # Organization-wide agents (not team-specific)
 ORGANIZATION_AGENTS = [
     {
@@ -78,6 +111,15 @@ ROLE_CONSTRAINTS: dict[str, RoleConstraint] = {
     "programmer": RoleConstraint(1, 20, "emasoft-programmer-agent"),
 }
 
+VALID_STATUSES = ["active", "hibernated", "offline", "terminated"]
+
+# Agent fields a composition plan may set on an agent
+PLAN_AGENT_FIELDS = ("role", "plugin", "host", "ai_maestro_address", "status")
+
+# Agent fields teammates rely on to reach each other; a change to any of
+# these is broadcast to the whole team on publish
+CONTACT_FIELDS = frozenset({"ai_maestro_address", "host", "role", "status"})
+
 # ECOS state directory
 ECOS_STATE_DIR = Path.home() / ".ecos"
 TEAMS_REGISTRY_FILE = ECOS_STATE_DIR / "all-teams.json"
@@ -171,6 +213,49 @@ def create_team_registry(
     return registry
 
 
+class TeamComposition:
+    """Agents of one team keyed by name, with incrementally kept role counts.
+
+    Built once from a registry; add/remove/update adjust the role counters
+    instead of re-scanning the agent list.
+    """
+
+    def __init__(self, agents: list[dict[str, Any]]):
+        self.agents: dict[str, dict[str, Any]] = {a["name"]: a for a in agents}
+        self.role_counts: Counter[str] = Counter(a["role"] for a in agents)
+
+    def add(self, agent: dict[str, Any]) -> None:
+        self.agents[agent["name"]] = agent
+        self.role_counts[agent["role"]] += 1
+
+    def remove(self, name: str) -> dict[str, Any]:
+        agent = self.agents.pop(name)
+        self.role_counts[agent["role"]] -= 1
+        return agent
+
+    def update(self, name: str, fields: dict[str, Any]) -> None:
+        agent = self.agents[name]
+        if "role" in fields and fields["role"] != agent["role"]:
+            self.role_counts[agent["role"]] -= 1
+            self.role_counts[fields["role"]] += 1
+        agent.update(fields)
+
+    def violations(self) -> list[str]:
+        """Check the composition against ROLE_CONSTRAINTS in one pass."""
+        errors = []
+        for role, constraints in ROLE_CONSTRAINTS.items():
+            count = self.role_counts.get(role, 0)
+            if count < constraints.min:
+                errors.append(
+                    f"Too few '{role}' agents: {count} < {constraints.min} (min)"
+                )
+            if count > constraints.max:
+                errors.append(
+                    f"Too many '{role}' agents: {count} > {constraints.max} (max)"
+                )
+        return errors
+
+
 def add_agent_to_registry(
     registry: dict[str, Any],
     agent_name: str,
@@ -178,8 +263,15 @@ def add_agent_to_registry(
     plugin: str,
     host: str,
     ai_maestro_address: str | None = None,
+    composition: TeamComposition | None = None,
 ) -> dict[str, Any]:
-    """Add an agent to the team registry."""
+    """Add an agent to the team registry.
+
+    Args:
+        composition: The registry's TeamComposition, kept in step with the
+            agent list; pass the same one to successive add/remove calls
+            so role counts and name checks never rescan the agents
+    """
 
     # Validate role
     if role not in ROLE_CONSTRAINTS:
@@ -194,8 +286,11 @@ def add_agent_to_registry(
             f"Role '{role}' requires plugin '{expected_plugin}', got '{plugin}'"
         )
 
+    if composition is None:
+        composition = TeamComposition(registry["agents"])
+
     # Check role count constraints
-    current_count = sum(1 for a in registry["agents"] if a["role"] == role)
+    current_count = composition.role_counts[role]
     max_count = ROLE_CONSTRAINTS[role].max
     if current_count >= max_count:
         raise ValueError(
@@ -203,8 +298,7 @@ def add_agent_to_registry(
         )
 
     # Check agent name uniqueness
-    existing_names = [a["name"] for a in registry["agents"]]
-    if agent_name in existing_names:
+    if agent_name in composition.agents:
         raise ValueError(f"Agent name '{agent_name}' already exists in team")
 
     # Default AI Maestro address to agent name
@@ -222,6 +316,7 @@ def add_agent_to_registry(
     }
 
     registry["agents"].append(agent_entry)
+    composition.add(agent_entry)
     registry["contacts_last_updated"] = get_timestamp()
     registry["contacts_updated_by"] = "ecos-chief-of-staff"
 
@@ -229,23 +324,26 @@ def add_agent_to_registry(
 
 
 def remove_agent_from_registry(
-    registry: dict[str, Any], agent_name: str
+    registry: dict[str, Any],
+    agent_name: str,
+    composition: TeamComposition | None = None,
 ) -> dict[str, Any]:
-    """Remove an agent from the team registry."""
+    """Remove an agent from the team registry.
 
-    # Find agent
-    agent_idx = None
-    for i, agent in enumerate(registry["agents"]):
-        if agent["name"] == agent_name:
-            agent_idx = i
-            break
+    Args:
+        composition: The registry's TeamComposition (see add_agent_to_registry)
+    """
+    if composition is None:
+        composition = TeamComposition(registry["agents"])
 
-    if agent_idx is None:
+    # Find agent
+    agent = composition.agents.get(agent_name)
+    if agent is None:
         raise ValueError(f"Agent '{agent_name}' not found in team")
 
     # Check role constraints
-    role = registry["agents"][agent_idx]["role"]
-    current_count = sum(1 for a in registry["agents"] if a["role"] == role)
+    role = agent["role"]
+    current_count = composition.role_counts[role]
     min_count = ROLE_CONSTRAINTS[role].min
 
     if current_count <= min_count:
@@ -254,7 +352,7 @@ def remove_agent_from_registry(
         )
 
     # Remove
-    registry["agents"].pop(agent_idx)
+    registry["agents"].remove(composition.remove(agent_name))
     registry["contacts_last_updated"] = get_timestamp()
     registry["contacts_updated_by"] = "ecos-chief-of-staff"
 
@@ -266,9 +364,8 @@ def update_agent_status(
 ) -> dict[str, Any]:
     """Update agent status in the registry."""
 
-    valid_statuses = ["active", "hibernated", "offline", "terminated"]
-    if new_status not in valid_statuses:
-        raise ValueError(f"Invalid status: {new_status}. Valid: {valid_statuses}")
+    if new_status not in VALID_STATUSES:
+        raise ValueError(f"Invalid status: {new_status}. Valid: {VALID_STATUSES}")
 
     # Find agent
     found = False
@@ -288,6 +385,182 @@ def update_agent_status(
     return registry
 
 
+def _normalize_plan_agent(spec: dict[str, Any]) -> dict[str, Any]:
+    """Validate one target agent of a plan and fill in defaults.
+
+    "status" and "ai_maestro_address" are only present when the spec gives
+    them, so that an existing agent keeps its current values; new agents
+    default to "active" and to their name as address.
+    """
+    name = spec.get("name")
+    role = spec.get("role")
+    if not name or not role:
+        raise ValueError(f"Plan agent needs 'name' and 'role': {spec}")
+    if role not in ROLE_CONSTRAINTS:
+        raise ValueError(
+            f"Invalid role for {name}: {role}. "
+            f"Valid roles: {list(ROLE_CONSTRAINTS.keys())}"
+        )
+    plugin = spec.get("plugin", ROLE_CONSTRAINTS[role].plugin)
+    if plugin != ROLE_CONSTRAINTS[role].plugin:
+        raise ValueError(
+            f"Role '{role}' requires plugin "
+            f"'{ROLE_CONSTRAINTS[role].plugin}', got '{plugin}'"
+        )
+    status = spec.get("status")
+    if status is not None and status not in VALID_STATUSES:
+        raise ValueError(
+            f"Invalid status for {name}: {status}. Valid: {VALID_STATUSES}"
+        )
+    if not spec.get("host"):
+        raise ValueError(f"Plan agent {name} needs 'host'")
+    agent = {
+        "name": name,
+        "role": role,
+        "plugin": plugin,
+        "host": spec["host"],
+    }
+    address = spec.get("address", spec.get("ai_maestro_address"))
+    if address is not None:
+        agent["ai_maestro_address"] = address
+    if status is not None:
+        agent["status"] = status
+    return agent
+
+
+def plan_team_changes(
+    registry: dict[str, Any], target_agents: list[dict[str, Any]]
+) -> dict[str, Any]:
+    """Compute the minimal add/remove/update diff from a registry to a target.
+
+    The target is the full desired agent list of the team. Intermediate
+    states are never checked; only the final composition must satisfy
+    ROLE_CONSTRAINTS.
+
+    Returns:
+        {add: [agents], remove: [names], update: {name: fields},
+         unchanged: int, errors: [str]}
+    """
+    errors: list[str] = []
+    target: dict[str, dict[str, Any]] = {}
+    for spec in target_agents:
+        try:
+            agent = _normalize_plan_agent(spec)
+        except ValueError as e:
+            errors.append(str(e))
+            continue
+        if agent["name"] in target:
+            errors.append(f"Agent '{agent['name']}' listed twice in plan")
+        target[agent["name"]] = agent
+
+    composition = TeamComposition([dict(a) for a in registry["agents"]])
+    plan: dict[str, Any] = {"add": [], "remove": [], "update": {}, "unchanged": 0}
+
+    for name in [n for n in composition.agents if n not in target]:
+        composition.remove(name)
+        plan["remove"].append(name)
+    for name, agent in target.items():
+        current = composition.agents.get(name)
+        if current is None:
+            agent.setdefault("ai_maestro_address", name)
+            agent.setdefault("status", "active")
+            composition.add(agent)
+            plan["add"].append(agent)
+            continue
+        fields = {
+            k: agent[k]
+            for k in PLAN_AGENT_FIELDS
+            if k in agent and current.get(k) != agent[k]
+        }
+        if fields:
+            composition.update(name, fields)
+            plan["update"][name] = fields
+        else:
+            plan["unchanged"] += 1
+
+    plan["errors"] = errors + composition.violations()
+    return plan
+
+
+def apply_team_plan(registry: dict[str, Any], plan: dict[str, Any]) -> None:
+    """Apply a diff from plan_team_changes to a registry in place."""
+    timestamp = get_timestamp()
+    removed = set(plan["remove"])
+    agents = [a for a in registry["agents"] if a["name"] not in removed]
+    for agent in agents:
+        fields = plan["update"].get(agent["name"])
+        if fields:
+            if "status" in fields:
+                agent["status_updated_at"] = timestamp
+            agent.update(fields)
+    for agent in plan["add"]:
+        agents.append({**agent, "assigned_at": timestamp})
+    registry["agents"] = agents
+    registry["contacts_last_updated"] = timestamp
+    registry["contacts_updated_by"] = "ecos-chief-of-staff"
+
+
+def apply_composition_plan(
+    plan_teams: list[dict[str, Any]], dry_run: bool = False
+) -> dict[str, Any]:
+    """Bring one or more teams to a target composition, all or nothing.
+
+    Every registry is locked (in path order, so concurrent plans cannot
+    deadlock) and every team's final state is validated before any team
+    is written. If one team's plan is invalid, no registry changes. A dry
+    run only reads the registries (snapshot writes are atomic renames) and
+    writes nothing, not even a lock file or journal.
+
+    Args:
+        plan_teams: [{"registry_file": path, "agents": [target agents]}]
+        dry_run: Compute and validate the diffs without writing
+
+    Returns:
+        {success, dry_run, teams: {team: {add, remove, update, unchanged,
+        errors, revision}}}
+    """
+    files = [str(Path(t["registry_file"]).resolve()) for t in plan_teams]
+    if len(set(files)) != len(files):
+        raise ValueError("A registry file appears more than once in the plan")
+    targets = dict(zip(files, (t["agents"] for t in plan_teams)))
+
+    results: dict[str, Any] = {}
+    with ExitStack() as stack:
+        registries = {
+            f: (
+                load_registry(f)
+                if dry_run
+                else stack.enter_context(registry_transaction(f, "apply-plan"))
+            )
+            for f in sorted(targets)
+        }
+        plans = {
+            f: plan_team_changes(registries[f], targets[f]) for f in sorted(targets)
+        }
+        for f, plan in plans.items():
+            results[registries[f]["team"]["name"]] = {
+                "registry_file": f,
+                "add": [a["name"] for a in plan["add"]],
+                "remove": plan["remove"],
+                "update": plan["update"],
+                "unchanged": plan["unchanged"],
+                "errors": plan["errors"],
+            }
+        success = not any(plan["errors"] for plan in plans.values())
+        if not success or dry_run:
+            # Leaving the transactions (if any) unchanged writes nothing
+            return {"success": success, "dry_run": dry_run, "teams": results}
+        for f, plan in plans.items():
+            if plan["add"] or plan["remove"] or plan["update"]:
+                apply_team_plan(registries[f], plan)
+
+    for f, registry in registries.items():
+        team = registry["team"]["name"]
+        results[team]["revision"] = registry.get("revision")
+        index_sync_team(team, registry["agents"], f)
+    return {"success": True, "dry_run": False, "teams": results}
+
+
 def validate_registry(registry: dict[str, Any]) -> list[str]:
     """Validate a team registry for completeness and constraints."""
     errors: list[str] = []
@@ -336,38 +609,143 @@ def validate_registry(registry: dict[str, Any]) -> list[str]:
     return errors
 
 
-def publish_registry_to_repo(registry: dict[str, Any], repo_path: str) -> str:
-    """Publish team registry to the git repository."""
+def serialize_registry(registry: dict[str, Any]) -> str:
+    """Serialize a registry exactly as it is published."""
+    return json.dumps(registry, indent=2) + "\n"
+
+
+def summarize_registry_diff(diff: dict[str, Any]) -> str:
+    """One-line summary of a registry diff (added/removed/changed agents)."""
+    parts = []
+    if diff["agents_added"]:
+        parts.append("added " + ", ".join(a["name"] for a in diff["agents_added"]))
+    if diff["agents_removed"]:
+        parts.append("removed " + ", ".join(diff["agents_removed"]))
+    if diff["agents_changed"]:
+        parts.append("changed " + ", ".join(sorted(diff["agents_changed"])))
+    return "; ".join(parts) or "metadata only"
+
+
+def wait_for_quiet_registry(
+    registry_file: str, registry: dict[str, Any], settle_seconds: float
+) -> dict[str, Any]:
+    """Wait until a registry stops changing, then return its latest state.
+
+    Polls the journal revision; returns once it has been stable for
+    settle_seconds so a burst of mutations is published as one commit.
+    """
+    revision = registry.get("revision", 0)
+    quiet_since = time.monotonic()
+    while time.monotonic() - quiet_since < settle_seconds:
+        time.sleep(min(1.0, settle_seconds))
+        latest = load_registry(registry_file)
+        if latest.get("revision", 0) != revision:
+            registry, revision = latest, latest.get("revision", 0)
+            quiet_since = time.monotonic()
+    return registry
+
+
+def _is_committed(repo_path: str, registry_file: Path) -> bool:
+    """Return True if the registry file matches HEAD (no pending changes)."""
+    proc = subprocess.run(
+        ["git", "status", "--porcelain", "--", str(registry_file.resolve())],
+        cwd=repo_path,
+        capture_output=True,
+        text=True,
+    )
+    return proc.returncode == 0 and not proc.stdout.strip()
+
+
+def publish_registry_to_repo(
+    registry: dict[str, Any], repo_path: str
+) -> dict[str, Any]:
+    """Publish team registry to the git repository.
+
+    The published file is compared with the new content by SHA-256 first:
+    if nothing changed, nothing is written or committed. Otherwise all
+    mutations since the last publish land in a single commit whose message
+    lists the agent-level diff.
+
+    Returns:
+        {published, committed, registry_file, content_hash, diff, message}
+        where diff is the structured change against the previous publish
+    """
 
     repo_path_obj = Path(repo_path)
     emasoft_dir = repo_path_obj / ".emasoft"
     emasoft_dir.mkdir(parents=True, exist_ok=True)
 
     registry_file = emasoft_dir / "team-registry.json"
-
-    with open(registry_file, "w", encoding="utf-8") as f:
-        json.dump(registry, f, indent=2)
+    content = serialize_registry(registry)
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    previous: dict[str, Any] = {}
+    if registry_file.exists():
+        previous_content = registry_file.read_bytes()
+        if hashlib.sha256(
+            previous_content
+        ).hexdigest() == content_hash and _is_committed(repo_path, registry_file):
+            return {
+                "published": False,
+                "committed": False,
+                "registry_file": str(registry_file),
+                "content_hash": content_hash,
+                "diff": diff_registries(registry, registry),
+                "message": f"{registry_file} already up to date, nothing to commit",
+            }
+        try:
+            previous = json.loads(previous_content)
+        except json.JSONDecodeError:
+            previous = {}
+
+    diff = diff_registries(previous, registry)
+    tmp_file = registry_file.with_name(f".{registry_file.name}.tmp")
+    tmp_file.write_text(content, encoding="utf-8")
+    os.replace(tmp_file, registry_file)
+
+    result: dict[str, Any] = {
+        "published": True,
+        "committed": False,
+        "registry_file": str(registry_file),
+        "content_hash": content_hash,
+        "diff": diff,
+    }
 
     # Git add and commit
     try:
         subprocess.run(
-            ["git", "add", str(registry_file)],
+            ["git", "add", str(registry_file.relative_to(repo_path_obj))],
             cwd=repo_path,
             check=True,
             capture_output=True,
         )
 
         team_name = registry["team"]["name"]
+        revisions = (
+            f" (revision {previous.get('revision', 0)}"
+            f" -> {registry.get('revision', 0)})"
+        )
         subprocess.run(
-            ["git", "commit", "-m", f"[ECOS] Update team registry for {team_name}"],
+            [
+                "git",
+                "commit",
+                "-m",
+                f"[ECOS] Update team registry for {team_name}",
+                "-m",
+                summarize_registry_diff(diff) + revisions,
+            ],
             cwd=repo_path,
             check=True,
             capture_output=True,
         )
 
-        return f"Published to {registry_file} and committed"
+        result["committed"] = True
+        result["message"] = f"Published to {registry_file} and committed"
     except subprocess.CalledProcessError as e:
-        return f"Saved to {registry_file} but git commit failed: {e.stderr.decode()}"
+        result["message"] = (
+            f"Saved to {registry_file} but git commit failed: {e.stderr.decode()}"
+        )
+    return result
 
 
 def list_team_agents(registry: dict[str, Any]) -> str:
@@ -411,41 +789,86 @@ def list_team_agents(registry: dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
+def _send_registry_update(
+    recipient: str, subject: str, message_text: str
+) -> str | None:
+    """Send one registry update via AMP; return an error string on failure."""
+    try:
+        subprocess.run(
+            [
+                "amp-send",
+                recipient,
+                subject,
+                message_text,
+                "--priority",
+                "normal",
+                "--type",
+                "registry-update",
+            ],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+    except Exception as e:
+        return str(e)
+    return None
+
+
 def notify_team_of_registry_update(
-    registry: dict[str, Any], changes: list[dict[str, str]]
-) -> None:
-    """Send AMP CLI notifications to all team agents about registry update."""
+    registry: dict[str, Any], diff: dict[str, Any], max_parallel: int = 8
+) -> list[str]:
+    """Send the registry diff to the agents it affects, in parallel.
+
+    Agents that were added, removed or changed are always notified. Other
+    active agents are notified only if the diff touches contact fields
+    (address, host, role, status), since only those change whom they talk
+    to. Bookkeeping-only changes (timestamps) notify nobody but the agents
+    concerned.
+
+    Returns:
+        Names of the agents notified
+    """
+
+    directly_affected = {a["name"] for a in diff["agents_added"]}
+    directly_affected.update(diff["agents_removed"])
+    directly_affected.update(diff["agents_changed"])
+    contacts_changed = bool(diff["agents_added"] or diff["agents_removed"]) or any(
+        CONTACT_FIELDS.intersection(fields)
+        for fields in diff["agents_changed"].values()
+    )
 
+    recipients: dict[str, str] = {}
     for agent in registry["agents"]:
         if agent["status"] != "active":
             continue
+        if agent["name"] in directly_affected or contacts_changed:
+            recipients[agent["name"]] = agent["ai_maestro_address"]
+    # Removed agents are no longer in the registry but must learn about it
+    for name in diff["agents_removed"]:
+        recipients.setdefault(name, name)
+
+    if not recipients:
+        return []
+
+    subject = "[REGISTRY UPDATE] Team contacts updated"
+    message_text = (
+        f"Team registry has been updated. Please pull latest changes. "
+        f"Team: {registry['team']['name']}. "
+        f"Summary: {summarize_registry_diff(diff)}. "
+        f"Diff: {json.dumps(diff)}"
+    )
 
-        subject = "[REGISTRY UPDATE] Team contacts updated"
-        message_text = (
-            f"Team registry has been updated. Please pull latest changes. "
-            f"Team: {registry['team']['name']}. "
-            f"Changes: {json.dumps(changes)}"
-        )
-        recipient = agent["ai_maestro_address"]
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as pool:
+        futures = {
+            name: pool.submit(_send_registry_update, address, subject, message_text)
+            for name, address in recipients.items()
+        }
+    for name, future in futures.items():
+        error = future.result()
+        if error:
+            print(f"Warning: Failed to notify {name}: {error}", file=sys.stderr)
 
-        try:
-            subprocess.run(
-                [
-                    "amp-send",
-                    recipient,
-                    subject,
-                    message_text,
-                    "--priority",
-                    "normal",
-                    "--type",
-                    "registry-update",
-                ],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-        except Exception as e:
-            print(f"Warning: Failed to notify {agent['name']}: {e}", file=sys.stderr)
+    return sorted(recipients)
 
 
 def main() -> int:
@@ -474,9 +897,27 @@ Examples:
     # Validate
     python ecos_team_registry.py validate --team svgbbox-library-team
 
-    # Publish to repo
+    # Publish to repo (no commit if unchanged; notifies only affected agents)
     python ecos_team_registry.py publish --team svgbbox-library-team \\
-        --repo-path /path/to/repo
+        --repo-path /path/to/repo --notify --settle 5
+
+    # Organisation-wide lookups (global index in ~/.ecos/agent-index.json)
+    python ecos_team_registry.py query --agent svgbbox-programmer-001
+    python ecos_team_registry.py query --role programmer --host macbook-dev-01
+    python ecos_team_registry.py query --status active
+
+    # Index existing registries
+    python ecos_team_registry.py reindex --registry-file a.json b.json
+
+    # Reorganise teams in one atomic step; plan.json:
+    #   {"teams": [{"registry_file": "reg.json", "agents": [
+    #       {"name": "svgbbox-orchestrator", "role": "orchestrator", "host": "h1"},
+    #       {"name": "svgbbox-impl-01", "role": "programmer", "host": "h1",
+    #        "status": "hibernated"}]}]}
+    python ecos_team_registry.py apply-plan --plan plan.json --dry-run
+
+    # Incremental readers: journaled changes after revision 12
+    python ecos_team_registry.py changes --registry-file reg.json --since 12
         """,
     )
 
@@ -543,7 +984,68 @@ Examples:
         "--repo-path", required=True, help="Path to git repository"
     )
     publish_parser.add_argument(
-        "--notify", action="store_true", help="Notify team agents"
+        "--notify", action="store_true", help="Notify affected team agents"
+    )
+    publish_parser.add_argument(
+        "--settle",
+        type=float,
+        default=0,
+        help="Wait until the registry is unchanged for this many seconds, "
+        "so a burst of mutations lands in one commit",
+    )
+
+    # Query command
+    query_parser = subparsers.add_parser(
+        "query", help="Query agents across all teams (global index)"
+    )
+    query_parser.add_argument("--agent", help="Exact agent name")
+    query_parser.add_argument("--role", help="Filter by role")
+    query_parser.add_argument("--host", help="Filter by host")
+    query_parser.add_argument("--status", help="Filter by status")
+    query_parser.add_argument("--team", help="Filter by team name")
+
+    # Reindex command
+    reindex_parser = subparsers.add_parser(
+        "reindex", help="Rebuild global index entries from registry files"
+    )
+    reindex_parser.add_argument(
+        "--registry-file", required=True, nargs="+", help="Registry file path(s)"
+    )
+
+    # Apply plan command
+    plan_parser = subparsers.add_parser(
+        "apply-plan", help="Bring teams to a target composition atomically"
+    )
+    plan_parser.add_argument(
+        "--plan", required=True, help="Plan JSON file ('-' for stdin)"
+    )
+    plan_parser.add_argument(
+        "--dry-run", action="store_true", help="Show the diff without applying it"
+    )
+
+    # Journal commands
+    changes_parser = subparsers.add_parser(
+        "changes", help="Show journaled registry changes since a revision"
+    )
+    changes_parser.add_argument(
+        "--registry-file", required=True, help="Path to registry file"
+    )
+    changes_parser.add_argument(
+        "--since", type=int, default=0, help="Revision already seen (default: 0)"
+    )
+
+    rebuild_parser = subparsers.add_parser(
+        "rebuild", help="Rebuild a registry file from its change journal"
+    )
+    rebuild_parser.add_argument(
+        "--registry-file", required=True, help="Path to registry file"
+    )
+
+    compact_parser = subparsers.add_parser(
+        "compact-journal", help="Fold the change journal into a single snapshot"
+    )
+    compact_parser.add_argument(
+        "--registry-file", required=True, help="Path to registry file"
     )
 
     args = parser.parse_args()
@@ -552,48 +1054,39 @@ Examples:
         if args.command == "create":
             registry = create_team_registry(args.team, args.repo, args.project_board)
             output = args.output or f"{args.team}-registry.json"
-            with open(output, "w", encoding="utf-8") as f:
-                json.dump(registry, f, indent=2)
+            write_registry_snapshot(output, registry, op="create")
             print(f"Created team registry: {output}")
             return 0
 
         elif args.command == "add-agent":
-            with open(args.registry_file, encoding="utf-8") as f:
-                registry = json.load(f)
-
-            registry = add_agent_to_registry(
-                registry,
-                args.agent_name,
-                args.role,
-                args.plugin,
-                args.host,
-                args.address,
+            with registry_transaction(args.registry_file, "add-agent") as registry:
+                add_agent_to_registry(
+                    registry,
+                    args.agent_name,
+                    args.role,
+                    args.plugin,
+                    args.host,
+                    args.address,
+                )
+            # Index only what the transaction committed
+            index_upsert_agent(
+                registry["team"]["name"], registry["agents"][-1], args.registry_file
             )
-
-            with open(args.registry_file, "w", encoding="utf-8") as f:
-                json.dump(registry, f, indent=2)
             print(f"Added agent {args.agent_name} to team")
             return 0
 
         elif args.command == "remove-agent":
-            with open(args.registry_file, encoding="utf-8") as f:
-                registry = json.load(f)
-
-            registry = remove_agent_from_registry(registry, args.agent_name)
-
-            with open(args.registry_file, "w", encoding="utf-8") as f:
-                json.dump(registry, f, indent=2)
+            with registry_transaction(args.registry_file, "remove-agent") as registry:
+                remove_agent_from_registry(registry, args.agent_name)
+            index_remove_agent(args.agent_name)
             print(f"Removed agent {args.agent_name} from team")
             return 0
 
         elif args.command == "update-status":
-            with open(args.registry_file, encoding="utf-8") as f:
-                registry = json.load(f)
-
-            registry = update_agent_status(registry, args.agent_name, args.status)
-
-            with open(args.registry_file, "w", encoding="utf-8") as f:
-                json.dump(registry, f, indent=2)
+            with registry_transaction(args.registry_file, "update-status") as registry:
+                update_agent_status(registry, args.agent_name, args.status)
+            updated = next(a for a in registry["agents"] if a["name"] == args.agent_name)
+            index_upsert_agent(registry["team"]["name"], updated, args.registry_file)
             print(f"Updated {args.agent_name} status to {args.status}")
             return 0
 
@@ -618,18 +1111,63 @@ Examples:
                 return 0
 
         elif args.command == "publish":
-            with open(args.registry_file, encoding="utf-8") as f:
-                registry = json.load(f)
+            registry = load_registry(args.registry_file)
+            if args.settle > 0:
+                registry = wait_for_quiet_registry(
+                    args.registry_file, registry, args.settle
+                )
 
             result = publish_registry_to_repo(registry, args.repo_path)
-            print(result)
+            print(result["message"])
+            if result["published"]:
+                print(f"Changes: {summarize_registry_diff(result['diff'])}")
 
-            if args.notify:
-                notify_team_of_registry_update(
-                    registry, [{"action": "registry_published"}]
-                )
-                print("Notified team agents")
+            if args.notify and result["published"]:
+                notified = notify_team_of_registry_update(registry, result["diff"])
+                print(f"Notified {len(notified)} affected agent(s)")
+
+            return 0
+
+        elif args.command == "query":
+            result = query_index(
+                agent=args.agent,
+                role=args.role,
+                host=args.host,
+                status=args.status,
+                team=args.team,
+            )
+            print(json.dumps(result, indent=2))
+            return 0
+
+        elif args.command == "reindex":
+            print(json.dumps(rebuild_index(args.registry_file), indent=2))
+            return 0
+
+        elif args.command == "apply-plan":
+            if args.plan == "-":
+                plan = json.load(sys.stdin)
+            else:
+                with open(args.plan, encoding="utf-8") as f:
+                    plan = json.load(f)
+            result = apply_composition_plan(plan["teams"], dry_run=args.dry_run)
+            print(json.dumps(result, indent=2))
+            return 0 if result["success"] else 1
+
+        elif args.command == "changes":
+            print(json.dumps(changes_since(args.registry_file, args.since), indent=2))
+            return 0
+
+        elif args.command == "rebuild":
+            registry = rebuild_from_journal(args.registry_file)
+            print(
+                f"Rebuilt {args.registry_file} from journal "
+                f"(revision {registry['revision']}, {len(registry['agents'])} agents)"
+            )
+            return 0
 
+        elif args.command == "compact-journal":
+            removed = compact_journal(args.registry_file)
+            print(f"Compacted journal of {args.registry_file} ({removed} entries folded)")
             return 0
 
     except Exception as e: